@@ -0,0 +1,281 @@
+"""
+engine.batch  –  struct-of-arrays twin of `EngineSimulator`.
+
+Every attribute that is a scalar on `EngineSimulator` is a NumPy array
+here, one element ("lane") per configuration, and `step()` advances all
+lanes at once.  The maths mirrors the scalar simulator line for line so a
+lane gives the same hp / knock / mpg / rpm as its scalar counterpart.
+
+All lanes share one engine (torque curve, idle, redline); gear ratios are
+stored per lane so gearbox sweeps fit in a single batch.
+"""
+
+from pathlib import Path
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
+
+from engine.curve_cache import curve_for, load_curve
+from engine.engine_registry import scan_engines
+from engine.simulator import KNOCK_LEVELS, EngineSimulator, Gearbox
+
+
+# highest knock score still reported as LOW / MED
+KNOCK_LIMITS: Tuple[float, float] = (6.0, 12.0)
+
+
+# ───────────────────────────────────────── vectorised physics ──
+def afr_efficiency(afr: np.ndarray) -> np.ndarray:
+    """Power factor for the mixture: 1.05 within 12.0–13.6 AFR, else 0.9."""
+    return np.where((12 <= afr) & (afr <= 13.6), 1.05, 0.9)
+
+
+def calc_power(torque: np.ndarray, rpm: np.ndarray, boost: np.ndarray,
+               afr: np.ndarray, timing: np.ndarray,
+               throttle: np.ndarray) -> np.ndarray:
+    """Array form of `EngineSimulator._calc_power` (torque already looked up)."""
+    base_hp    = torque * rpm / 5252.0
+    ve         = 1 + boost / 14.7
+    afr_eff    = afr_efficiency(afr)
+    timing_eff = 1 + (timing - 10) / 100
+    thr_eff    = throttle / 100.0
+    hp = base_hp * ve * afr_eff * timing_eff * thr_eff
+    return np.where(rpm <= 0, 0.0, hp)
+
+
+def knock_score(timing: np.ndarray, boost: np.ndarray,
+                afr: np.ndarray) -> np.ndarray:
+    """The continuous score `_calc_knock` thresholds (MED > 6, HIGH > 12)."""
+    return (np.where(timing > 20, timing - 20, 0.0)
+            + np.where(boost > 12, (boost - 12) * 1.5, 0.0)
+            + np.where(afr < 12.5, (12.5 - afr) * 3, 0.0))
+
+
+def knock_code(score: np.ndarray) -> np.ndarray:
+    """Knock score → index into KNOCK_LEVELS."""
+    med, high = KNOCK_LIMITS
+    return np.where(score > high, 2, np.where(score > med, 1, 0)).astype(np.int8)
+
+
+def calc_knock(timing: np.ndarray, boost: np.ndarray,
+               afr: np.ndarray) -> np.ndarray:
+    """Array form of `EngineSimulator._calc_knock` → index into KNOCK_LEVELS."""
+    return knock_code(knock_score(timing, boost, afr))
+
+
+def mpg_under_load(afr: np.ndarray, throttle: np.ndarray) -> np.ndarray:
+    """The throttle >= 1 % branch of `calc_mpg` (bilinear in afr, throttle)."""
+    return (afr / 14.7) * (1 - throttle / 100) * 40
+
+
+def calc_mpg(afr: np.ndarray, throttle: np.ndarray) -> np.ndarray:
+    """Array form of `EngineSimulator._calc_mpg`."""
+    return np.where(throttle < 1, 40.0, mpg_under_load(afr, throttle))
+
+
+# ───────────────────────────────────────── batch simulator ──
+_LANE_ARRAYS: Tuple[str, ...] = ("throttle", "timing", "boost_cmd", "afr",
+                                 "gear_idx", "engine_on", "rpm", "rpm_target",
+                                 "boost", "ratios")
+
+
+class BatchEngineSimulator:
+    """
+    Vectorised `EngineSimulator`: `size` independent lanes, one engine.
+
+    Inputs (write these like the UI writes the scalar attributes):
+        throttle, timing, boost_cmd, afr, gear_idx, engine_on
+    State:
+        rpm, rpm_target, boost
+    `gear_idx` indexes `gear_order` (same tuple as `Gearbox.order`).
+    """
+
+    def __init__(self, size: int, engine: str | None = None,
+                 gearbox: Gearbox | None = None,
+                 source: Path | None = None) -> None:
+        gearbox = gearbox or Gearbox()
+        self.gear_order     = tuple(gearbox.order)
+        self._gear_ratios   = np.array([gearbox.ratio(g)
+                                        for g in self.gear_order])
+        self.reset(size)
+
+        # engine data ---------------------------------------------------
+        self._engines = scan_engines(source)
+        self.load_engine(engine if engine is not None
+                         else next(iter(self._engines), None))
+
+    def reset(self, size: int | None = None):
+        """(Re)allocate every lane with default inputs; keeps the engine."""
+        if size is not None:
+            self.size = int(size)
+
+        # UI inputs -----------------------------------------------------
+        self.throttle  = np.zeros(self.size)
+        self.timing    = np.full(self.size, 10.0)
+        self.boost_cmd = np.full(self.size, 5.0)
+        self.afr       = np.full(self.size, 13.5)
+        self.gear_idx  = np.zeros(self.size, dtype=np.intp)
+        self.engine_on = np.zeros(self.size, dtype=bool)
+
+        # dynamics ------------------------------------------------------
+        self.rpm        = np.zeros(self.size)
+        self.rpm_target = np.zeros(self.size)
+        self.boost      = np.zeros(self.size)
+        self.ratios     = np.tile(self._gear_ratios, (self.size, 1))
+        self._lanes     = np.arange(self.size)
+
+    @classmethod
+    def from_simulators(cls, sims: Sequence[EngineSimulator]
+                        ) -> "BatchEngineSimulator":
+        """Pack scalar simulators into lanes; all must run the same engine."""
+        batch = cls.__new__(cls)
+        first = sims[0]
+        keys  = {s.engine_key for s in sims}
+        if len(keys) > 1:
+            raise ValueError("Batch lanes share one engine; got "
+                             f"{sorted(map(str, keys))}.")
+        batch.size       = len(sims)
+        batch.engine_key = first.engine_key
+        batch.gear_order = tuple(first._gearbox.order)
+        batch._gear_ratios = np.array([first._gearbox.ratio(g)
+                                       for g in batch.gear_order])
+        batch._engines   = first._engines
+        batch._lanes     = np.arange(batch.size)
+        batch.redline, batch.idle_rpm = first.redline, first.idle_rpm
+        batch._torque_model = first._torque_model
+
+        batch.throttle   = np.array([s.throttle for s in sims], dtype=float)
+        batch.timing     = np.array([s.timing for s in sims], dtype=float)
+        batch.boost_cmd  = np.array([s.boost_cmd for s in sims], dtype=float)
+        batch.afr        = np.array([s.afr for s in sims], dtype=float)
+        batch.gear_idx   = np.array([batch._gear_index(s.gear) for s in sims],
+                                    dtype=np.intp)
+        batch.engine_on  = np.array([s.engine_on for s in sims], dtype=bool)
+        batch.rpm        = np.array([s._rpm for s in sims], dtype=float)
+        batch.rpm_target = np.array([s._rpm_target for s in sims], dtype=float)
+        batch.boost      = np.array([s._boost for s in sims], dtype=float)
+        batch.ratios     = np.array(
+            [[s._gearbox.ratio(g) for g in batch.gear_order] for s in sims],
+            dtype=float)
+        return batch
+
+    def keep(self, mask: np.ndarray):
+        """Drop every lane where `mask` is False (compacts all lane arrays)."""
+        for name in _LANE_ARRAYS:
+            setattr(self, name, getattr(self, name)[mask])
+        self.size   = len(self.rpm)
+        self._lanes = np.arange(self.size)
+
+    # ───────────────── engine selection ──
+    def load_engine(self, key: str | None):
+        if key and key in self._engines:
+            meta = self._engines[key]
+            self.engine_key = key
+            self.redline  = meta.get("redline", 7500)
+            self.idle_rpm = meta.get("idle", 900)
+            self._torque_model = curve_for(meta)
+        else:
+            self.engine_key = None
+            self.redline  = 7500
+            self.idle_rpm = 900
+            self._torque_model = load_curve(None)
+
+    # ───────────────── gears ──
+    def _gear_index(self, gear: str) -> int:
+        try:
+            return self.gear_order.index(gear)
+        except ValueError:
+            return 0
+
+    def set_gear(self, gear: str, mask: np.ndarray | None = None):
+        """Put lanes straight into `gear` (no shift glide)."""
+        idx = self._gear_index(gear)
+        if mask is None:
+            self.gear_idx[:] = idx
+        else:
+            self.gear_idx[mask] = idx
+
+    def gears(self) -> Tuple[str, ...]:
+        return tuple(self.gear_order[i] for i in self.gear_idx)
+
+    # ───────────────── main tick ──
+    def step(self, dt: float = 0.2
+             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Advance every lane by `dt`.
+        Returns (hp, knock_code, mpg, rpm) arrays; knock_code indexes
+        KNOCK_LEVELS.  Lanes with engine_on False read 0 / LOW / 0 / 0.
+        """
+        on = self.engine_on
+        self._update_rpm(dt, on)
+        self._update_boost(dt, on)
+
+        torque = self._torque_model.torque_at_many(self.rpm)
+        hp    = calc_power(torque, self.rpm, self.boost, self.afr,
+                           self.timing, self.throttle)
+        knock = calc_knock(self.timing, self.boost, self.afr)
+        mpg   = calc_mpg(self.afr, self.throttle)
+
+        if not on.all():
+            hp    = np.where(on, hp, 0.0)
+            knock = np.where(on, knock, 0).astype(np.int8)
+            mpg   = np.where(on, mpg, 0.0)
+        return hp, knock, mpg, self.rpm.copy()
+
+    # ───────────────── rpm dynamics ──
+    def _update_rpm(self, dt: float, on: np.ndarray):
+        ratio = self.ratios[self._lanes, self.gear_idx]
+        thr   = self.throttle / 100.0
+
+        # throttle acceleration ONLY if in gear (ratio>0), else coast-down
+        drive = (thr > 0.01) & (ratio > 0)
+        accel = 4500 * thr * (ratio / 3.8)
+        decay = np.where(ratio == 0, 800.0, 1200.0)
+        rpm   = np.where(drive, self.rpm + accel * dt,
+                         np.maximum(self.rpm - decay * dt, self.idle_rpm))
+
+        # glide toward shift target
+        step    = 4000 * dt
+        target  = self.rpm_target
+        gliding = target != 0
+        delta   = target - rpm
+        arrive  = gliding & (np.abs(delta) <= step)
+        rpm = np.where(arrive, target,
+                       np.where(gliding,
+                                rpm + np.where(delta > 0, step, -step), rpm))
+        target = np.where(arrive, 0.0, target)
+
+        rpm = np.minimum(rpm, self.redline)
+        self.rpm        = np.where(on, rpm, 0.0)
+        self.rpm_target = np.where(on, target, self.rpm_target)
+
+    def _update_boost(self, dt: float, on: np.ndarray):
+        lag   = 0.5 * (dt / 0.2)
+        cmd   = self.boost_cmd
+        boost = self.boost
+        new   = np.where(boost < cmd, np.minimum(cmd, boost + lag),
+                         np.where(boost > cmd,
+                                  np.maximum(cmd, boost - lag), boost))
+        self.boost = np.where(on, new, boost)
+
+    # ───────────────── shifts ──
+    def upshift(self, mask: np.ndarray | None = None):   self._shift(+1, mask)
+    def downshift(self, mask: np.ndarray | None = None): self._shift(-1, mask)
+
+    def _shift(self, step: int, mask: np.ndarray | None = None):
+        if mask is None:
+            mask = np.ones(self.size, dtype=bool)
+        old_idx = self.gear_idx
+        new_idx = np.clip(old_idx + step, 0, len(self.gear_order) - 1)
+        old = self.ratios[self._lanes, old_idx]
+        new = self.ratios[self._lanes, new_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            target = np.where((old > 0) & (new > 0),
+                              self.rpm * (new / old), 0.0)
+        self.gear_idx   = np.where(mask, new_idx, old_idx)
+        self.rpm_target = np.where(mask, target, self.rpm_target)
+
+
+def knock_labels(codes: Iterable[int]) -> Tuple[str, ...]:
+    """Map knock codes from `BatchEngineSimulator.step` back to strings."""
+    return tuple(KNOCK_LEVELS[int(c)] for c in codes)
@@ -1,18 +1,35 @@
 import json
+import os
+import threading
 from pathlib import Path
 from typing import Dict, Any
 
 PRESET_FOLDER = Path(__file__).resolve().parent.parent / "assets" / "maps"
 PRESET_FOLDER.mkdir(parents=True, exist_ok=True)
 
+
+def write_json_atomic(data: Any, dest: Path, indent: int | None = 2) -> None:
+    """Write JSON to a temp file next to `dest`, then rename it into place."""
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with tmp.open("w") as fp:
+            json.dump(data, fp, indent=indent)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
 class ConfigLoader:
     """Static helper to read/write tuning JSON files."""
 
     @staticmethod
     def save(config: Dict[str, Any], dest: Path) -> None:
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        with dest.open("w") as fp:
-            json.dump(config, fp, indent=2)
+        # readers never see a half-written file
+        write_json_atomic(config, dest)
 
     @staticmethod
     def load(src: Path) -> Dict[str, Any]:
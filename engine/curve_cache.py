@@ -0,0 +1,130 @@
+"""
+engine.curve_cache  –  process-wide LRU cache of compiled torque curves.
+
+`TorqueModel` arrays are read-only once compiled, so every simulator that
+runs the same engine can share one instance.  Entries are keyed by the
+resolved CSV path plus its mtime / size (an edited file is a new key and
+the stale entry is dropped) and the LUT step; curves from a binary engine
+pack are keyed by pack path, mtime and engine key.  Eviction is least-recently
+used against a byte budget summed from each model's `nbytes`.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from engine.engine_pack import open_pack
+from engine.torque_model import TorqueModel
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CurveCache:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.bytes     = 0
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+        self._models: "OrderedDict[Hashable, TorqueModel]" = OrderedDict()
+        self._by_path: Dict[str, Hashable] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(path: Path | None, lut_step: float | None
+             ) -> Tuple[Hashable, str | None]:
+        if path is not None:
+            try:
+                st = path.stat()
+            except OSError:
+                pass
+            else:
+                name = str(path.resolve())
+                return (name, st.st_mtime_ns, st.st_size, lut_step), name
+        # missing file → TorqueModel falls back to the built-in curve
+        return (None, lut_step), None
+
+    def get(self, path: Path | None, lut_step: float | None = None
+            ) -> TorqueModel:
+        """Shared `TorqueModel` for `path`, loading it on a miss."""
+        key, name = self._key(path, lut_step)
+        return self._get(key, name, lut_step,
+                         lambda: TorqueModel(path, lut_step=lut_step))
+
+    def get_packed(self, pack_path: Path, engine: str,
+                   lut_step: float | None = None) -> TorqueModel:
+        """Shared zero-copy `TorqueModel` for `engine` inside a binary pack."""
+        pack = open_pack(pack_path)
+        name = f"{pack.path.resolve()}#{engine}"
+        key  = (name, pack.mtime_ns, 0, lut_step)
+        return self._get(key, name, lut_step,
+                         lambda: pack.torque_model(engine, lut_step))
+
+    def _get(self, key: Hashable, name: str | None, lut_step: float | None,
+             build: Callable[[], TorqueModel]) -> TorqueModel:
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return model
+            self.misses += 1
+
+        model = build()                                  # parse outside lock
+
+        with self._lock:
+            if key in self._models:                      # lost a race
+                return self._models[key]
+            if name is not None:
+                stale = self._by_path.pop((name, lut_step), None)
+                if stale is not None and stale in self._models:
+                    self._drop(stale)
+                self._by_path[(name, lut_step)] = key
+            self._models[key] = model
+            self.bytes += model.nbytes
+            while self.bytes > self.max_bytes and len(self._models) > 1:
+                self._drop(next(iter(self._models)))
+                self.evictions += 1
+        return model
+
+    def _drop(self, key: Hashable):
+        self.bytes -= self._models.pop(key).nbytes
+
+    def invalidate(self, path: Path):
+        """Forget every cached model for `path` (any mtime / LUT step)."""
+        name = str(path.resolve())
+        with self._lock:
+            for key in [k for k in self._models if k[0] == name]:
+                self._drop(key)
+            for pk in [pk for pk in self._by_path if pk[0] == name]:
+                del self._by_path[pk]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._by_path.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._models), "bytes": self.bytes,
+                    "max_bytes": self.max_bytes, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+CURVE_CACHE = CurveCache()
+
+
+def load_curve(path: Path | None, lut_step: float | None = None
+               ) -> TorqueModel:
+    """Process-wide shared torque model for `path`."""
+    return CURVE_CACHE.get(path, lut_step)
+
+
+def curve_for(meta: Dict[str, Any], lut_step: float | None = None
+              ) -> TorqueModel:
+    """Shared torque model for a `scan_engines()` meta (folder or pack)."""
+    if meta.get("pack") is not None:
+        return CURVE_CACHE.get_packed(meta["pack"], meta["pack_key"], lut_step)
+    return CURVE_CACHE.get(meta["curve"], lut_step)
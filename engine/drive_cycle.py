@@ -0,0 +1,276 @@
+"""
+engine.drive_cycle  –  vehicle dynamics + drive-cycle following.
+
+Speed is integrated from engine torque through the `EngineSimulator`'s
+gearbox, a final drive and the tyres, against aerodynamic drag and rolling
+resistance.  A driver model picks throttle (or brakes) to follow a target
+speed trace and an auto-shift policy picks gears.
+
+Cycle CSV layout (speed in km/h; `speed` is accepted as an alias):
+
+    time,speed_kmh
+    0,0
+    20,50
+    80,50
+
+`DriveCycleSimulator.run()` integrates at a fixed `dt` while the vehicle is
+in a transient and, with `fast_forward`, jumps straight to the end of any
+constant-speed segment it is already settled on and can hold in the
+current gear without a shift (cruise or standstill), so long steady
+stretches cost one step instead of thousands.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+import csv
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+from engine.simulator import KNOCK_LEVELS, EngineSimulator
+
+G       = 9.81      # m/s²
+HP_TO_W = 745.7
+
+
+# ───────────────────────────────────────── configuration ──
+@dataclass
+class Vehicle:
+    mass:               float = 1500.0   # kg
+    cd:                 float = 0.32
+    frontal_area:       float = 2.2      # m²
+    crr:                float = 0.012
+    final_drive:        float = 3.73
+    tire_circumference: float = 2.1      # m
+    driveline_eff:      float = 0.90
+    max_brake:          float = 8.0      # m/s²
+    air_density:        float = 1.225    # kg/m³
+
+    def resistance(self, v: float) -> float:
+        """Drag + rolling resistance force in N at `v` m/s."""
+        if v <= 0:
+            return 0.0
+        drag = 0.5 * self.air_density * self.cd * self.frontal_area * v * v
+        return drag + self.crr * self.mass * G
+
+
+@dataclass
+class ShiftPolicy:
+    upshift_rpm:   float | None = None   # None → 90 % of redline
+    downshift_rpm: float = 1500.0
+    launch_gear:   str   = "1"
+    min_hold:      float = 1.0           # s between shifts
+
+
+@dataclass
+class DriveCycle:
+    time:      np.ndarray     # s
+    speed_kmh: np.ndarray
+
+    @property
+    def duration(self) -> float:
+        return float(self.time[-1])
+
+    def target(self, t: float) -> float:
+        return float(np.interp(t, self.time, self.speed_kmh))
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "DriveCycle":
+        with Path(path).open() as fp:
+            rows = list(csv.DictReader(fp))
+        if not rows:
+            raise ValueError(f"Drive cycle '{path}' has no rows.")
+        col = "speed_kmh" if "speed_kmh" in rows[0] else "speed"
+        return cls(np.array([float(r["time"]) for r in rows]),
+                   np.array([float(r[col]) for r in rows]))
+
+
+@dataclass
+class DriveResult:
+    time:      List[float] = field(default_factory=list)
+    speed_kmh: List[float] = field(default_factory=list)
+    target:    List[float] = field(default_factory=list)
+    rpm:       List[float] = field(default_factory=list)
+    gear:      List[str]   = field(default_factory=list)
+    throttle:  List[float] = field(default_factory=list)
+    hp:        List[float] = field(default_factory=list)
+    knock:     List[str]   = field(default_factory=list)
+    mpg:       List[float] = field(default_factory=list)
+    distance_km: float = 0.0
+    steps:       int   = 0       # integration steps actually taken
+
+    def append(self, t, state, target):
+        for name, value in (("time", t), ("target", target), *state):
+            getattr(self, name).append(value)
+
+    def arrays(self) -> dict:
+        out = {name: np.asarray(getattr(self, name))
+               for name in ("time", "speed_kmh", "target", "rpm", "throttle",
+                            "hp", "mpg")}
+        out["knock"] = np.array([KNOCK_LEVELS.index(k) for k in self.knock],
+                                dtype=np.int8)
+        return out
+
+
+# ───────────────────────────────────────── simulator ──
+class DriveCycleSimulator:
+    def __init__(self, sim: EngineSimulator, vehicle: Vehicle | None = None,
+                 policy: ShiftPolicy | None = None,
+                 response: float = 1.0) -> None:
+        self.sim      = sim
+        self.vehicle  = vehicle or Vehicle()
+        self.policy   = policy or ShiftPolicy()
+        self.response = response     # s to close a speed error (driver model)
+        self.speed    = 0.0          # m/s
+        self.distance = 0.0          # m
+        self._since_shift = math.inf
+        self._hp = 0.0
+        sim.engine_on = True
+        sim.gear      = self.policy.launch_gear
+
+    # ───────────────── drivetrain ──
+    @property
+    def speed_kmh(self) -> float:
+        return self.speed * 3.6
+
+    def _engine_rpm(self) -> float:
+        ratio = self.sim._gearbox.table[self.sim._gear_idx]
+        wheel_rpm = self.speed / self.vehicle.tire_circumference * 60
+        rpm = wheel_rpm * ratio * self.vehicle.final_drive
+        # below idle the clutch slips and the engine holds idle
+        return min(max(rpm, self.sim.idle_rpm), self.sim.redline)
+
+    def _wheel_force(self, rpm: float, throttle: float) -> float:
+        """Tractive force in N for `throttle` % at `rpm`."""
+        ratio = self.sim._gearbox.table[self.sim._gear_idx]
+        if ratio <= 0 or rpm <= 0 or throttle <= 0:
+            return 0.0
+        watts  = self.sim.power_at(rpm, throttle=throttle) * HP_TO_W
+        torque = watts / (rpm * 2 * math.pi / 60)
+        radius = self.vehicle.tire_circumference / (2 * math.pi)
+        return (torque * ratio * self.vehicle.final_drive
+                * self.vehicle.driveline_eff / radius)
+
+    def _shift_step(self, rpm: float) -> int:
+        """+1 / -1 if the policy wants a gear change at `rpm`, else 0."""
+        sim, pol = self.sim, self.policy
+        order = sim._gearbox.order
+        idx   = sim._gear_idx
+        if rpm >= (pol.upshift_rpm or 0.9 * sim.redline) and idx < len(order) - 1:
+            return +1
+        if (rpm <= pol.downshift_rpm and sim.gear != pol.launch_gear
+                and order.index(pol.launch_gear) < idx):
+            return -1
+        return 0
+
+    def _auto_shift(self, rpm: float, target_kmh: float):
+        sim, pol = self.sim, self.policy
+        if target_kmh <= 0 and self.speed < 0.5:
+            sim.gear = pol.launch_gear
+            return
+        if self._since_shift < pol.min_hold:
+            return
+        step = self._shift_step(rpm)
+        if step:
+            sim.gear = sim._gearbox.next_gear(sim.gear, step)
+            self._since_shift = 0.0
+
+    # ───────────────── one step ──
+    def step(self, dt: float, target_kmh: float):
+        """Advance `dt` s while following `target_kmh`; returns state pairs."""
+        sim, veh = self.sim, self.vehicle
+        rpm = self._engine_rpm()
+        self._auto_shift(rpm, target_kmh)
+        rpm = self._engine_rpm()
+        self._since_shift += dt
+
+        # driver: force needed to reach the target within `response`
+        resist = veh.resistance(self.speed)
+        want_a = (target_kmh / 3.6 - self.speed) / max(self.response, dt)
+        need   = veh.mass * want_a + resist
+        full   = self._wheel_force(rpm, 100.0)
+        if need > 0 and full > 0:
+            sim.throttle = min(100.0, 100.0 * need / full)
+            brake = 0.0
+        else:
+            sim.throttle = 0.0
+            brake = min(0.0, max(need, -veh.max_brake * veh.mass))
+
+        sim._rpm = rpm
+        sim._update_boost(dt)
+        drive = self._wheel_force(rpm, sim.throttle)
+        accel = (drive - resist + brake) / veh.mass
+        self.speed     = max(0.0, self.speed + accel * dt)
+        self.distance += self.speed * dt
+
+        self._hp = sim._calc_power()
+        return self._state()
+
+    def _state(self) -> Tuple[Tuple[str, object], ...]:
+        sim = self.sim
+        return (("speed_kmh", self.speed_kmh), ("rpm", sim._rpm),
+                ("gear", sim.gear), ("throttle", sim.throttle),
+                ("hp", self._hp), ("knock", sim._calc_knock()),
+                ("mpg", sim._calc_mpg()))
+
+    def _settled(self, target_kmh: float, tolerance_kmh: float) -> bool:
+        return abs(self.speed_kmh - target_kmh) <= tolerance_kmh
+
+    def _cruise(self, span: float, target_kmh: float):
+        """
+        Hold `target_kmh` for `span` s in one step (steady state).  Returns
+        None, with nothing changed, if the current gear cannot hold that
+        speed or the shift policy would change gear there – the caller
+        integrates normally instead.
+        """
+        sim  = self.sim
+        held = self.speed
+        self.speed = target_kmh / 3.6
+        rpm  = self._engine_rpm()
+        full = self._wheel_force(rpm, 100.0)
+        need = self.vehicle.resistance(self.speed)
+        if need > full or (self.speed > 0 and self._shift_step(rpm)):
+            self.speed = held
+            return None
+        sim._rpm     = rpm
+        sim.throttle = min(100.0, 100.0 * need / full) \
+            if need > 0 and full > 0 else 0.0
+        sim._update_boost(span)
+        self._hp = sim._calc_power()
+        self.distance += self.speed * span
+        self._since_shift += span
+        return self._state()
+
+    # ───────────────── whole cycle ──
+    def run(self, cycle: DriveCycle, dt: float = 0.1,
+            fast_forward: bool = True,
+            tolerance_kmh: float = 0.5) -> DriveResult:
+        out  = DriveResult()
+        t    = float(cycle.time[0])
+        end  = cycle.duration
+        knots = cycle.time
+        out.append(t, self._state(), cycle.target(t))
+
+        while t < end - 1e-9:
+            seg = int(np.searchsorted(knots, t, side="right")) - 1
+            seg_end = float(knots[min(seg + 1, len(knots) - 1)])
+            steady  = cycle.speed_kmh[seg] == cycle.speed_kmh[min(seg + 1,
+                                                                  len(knots) - 1)]
+            target  = cycle.target(t)
+
+            state = None
+            if (fast_forward and steady and seg_end - t > dt
+                    and self._settled(target, tolerance_kmh)):
+                state = self._cruise(seg_end - t, target)
+            if state is not None:
+                t = seg_end
+            else:
+                h = min(dt, end - t)
+                state = self.step(h, cycle.target(t + h))
+                t += h
+            out.steps += 1
+            out.append(t, state, cycle.target(t))
+
+        out.distance_km = self.distance / 1000
+        return out
@@ -0,0 +1,148 @@
+"""
+engine.engine_pack  –  single-file binary engine pack (`*.etpk`).
+
+Layout (little-endian):
+
+    header   magic b"ETPK" | u16 version | u16 reserved | u32 count | u32 pad
+    index    count × entry:
+               key 32s | name 96s (utf-8, NUL padded; longer keys are
+               rejected, longer names truncated) | f8 idle | u32 redline
+               u32 points | u64 offset
+    blocks   per engine: float64 rpm[points] then float64 torque[points]
+
+Blocks are 8-byte aligned, so `EnginePack` memory-maps the file and hands
+out zero-copy float64 views of each curve.  An idle of NaN means the source
+meta.json had no "idle" key.  Curves are parsed strictly: a malformed CSV
+fails the write (naming the engine) instead of packing the default curve.
+"""
+
+from pathlib import Path
+import math
+import mmap
+import struct
+from typing import Any, Dict, Tuple
+
+from engine.curve_loader import CurveFormatError
+from engine.torque_model import TorqueModel
+
+PACK_SUFFIX = ".etpk"
+MAGIC       = b"ETPK"
+VERSION     = 2
+
+_HEADER = struct.Struct("<4sHHII")
+_ENTRY  = struct.Struct("<32s96sdIIQ")
+
+
+def is_pack(path: Path) -> bool:
+    if not path.is_file():
+        return False
+    with path.open("rb") as fp:
+        return fp.read(len(MAGIC)) == MAGIC
+
+
+def write_pack(dest: Path, engines: Dict[str, Dict[str, Any]]) -> int:
+    """Write `{key: meta}` (as from scan_engines) to `dest`; returns count."""
+    keys   = {key: _key(key) for key in engines}
+    curves = {key: _curve(key, meta) for key, meta in engines.items()}
+    offset = _HEADER.size + _ENTRY.size * len(engines)
+
+    entries, blocks = [], []
+    for key, meta in engines.items():
+        model = curves[key]
+        n     = len(model.rpms)
+        entries.append(_ENTRY.pack(
+            keys[key], _fixed(meta.get("name", key), 96),
+            float(meta.get("idle", math.nan)), int(meta.get("redline", 7500)),
+            n, offset))
+        blocks.append(model.rpms.tobytes() + model.torques.tobytes())
+        offset += 16 * n
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_suffix(dest.suffix + ".tmp")
+    with tmp.open("wb") as fp:
+        fp.write(_HEADER.pack(MAGIC, VERSION, 0, len(engines), 0))
+        fp.writelines(entries)
+        fp.writelines(blocks)
+    tmp.replace(dest)
+    return len(engines)
+
+
+def _key(key: str) -> bytes:
+    # keys name folders and must survive a round trip – never truncate
+    raw = key.encode("utf-8")
+    if len(raw) > 32:
+        raise ValueError(f"Engine key '{key}' is longer than 32 bytes.")
+    return raw
+
+
+def _curve(key: str, meta: Dict[str, Any]) -> TorqueModel:
+    # a pack is a release artifact: never ship the fallback curve silently
+    try:
+        return TorqueModel(meta["curve"], strict=True)
+    except (CurveFormatError, OSError, UnicodeDecodeError) as err:
+        raise ValueError(f"Engine '{key}': bad torque curve: {err}") from err
+
+
+def _fixed(text: str, size: int) -> bytes:
+    raw = text.encode("utf-8")
+    if len(raw) > size:
+        raw = raw[:size].decode("utf-8", "ignore").encode("utf-8")
+    return raw
+
+
+class EnginePack:
+    """Read-only, memory-mapped view of an engine pack."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as fp:
+            self._mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mtime_ns = path.stat().st_mtime_ns
+
+        magic, version, _, count, _ = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{path}' is not a v{VERSION} engine pack.")
+
+        self._index: Dict[str, Tuple[Dict[str, Any], int, int]] = {}
+        for i in range(count):
+            key, name, idle, redline, n, offset = _ENTRY.unpack_from(
+                self._mm, _HEADER.size + i * _ENTRY.size)
+            key  = key.rstrip(b"\0").decode("utf-8")
+            meta: Dict[str, Any] = {"name": name.rstrip(b"\0").decode("utf-8"),
+                                    "redline": redline}
+            if not math.isnan(idle):
+                meta["idle"] = idle
+            self._index[key] = (meta, offset, n)
+
+    def keys(self):
+        return self._index.keys()
+
+    def meta(self, key: str) -> Dict[str, Any]:
+        meta = dict(self._index[key][0])
+        meta.update(folder=None, curve=None, pack=self.path, pack_key=key,
+                    display=meta["name"] or key)
+        return meta
+
+    def buffers(self, key: str) -> Tuple[memoryview, memoryview]:
+        """Zero-copy (rpm, torque) float64 views into the mapped file."""
+        _, offset, n = self._index[key]
+        view = memoryview(self._mm)
+        return (view[offset:offset + 8 * n].cast("d"),
+                view[offset + 8 * n:offset + 16 * n].cast("d"))
+
+    def torque_model(self, key: str, lut_step: float | None = None
+                     ) -> TorqueModel:
+        return TorqueModel.from_buffers(*self.buffers(key), lut_step=lut_step)
+
+
+_OPEN: Dict[str, EnginePack] = {}
+
+
+def open_pack(path: Path) -> EnginePack:
+    """Shared `EnginePack` for `path`, re-opened when the file changes."""
+    name = str(path.resolve())
+    pack = _OPEN.get(name)
+    if pack is None or pack.mtime_ns != path.stat().st_mtime_ns:
+        # the old mapping stays alive as long as models still view it
+        pack = _OPEN[name] = EnginePack(path)
+    return pack
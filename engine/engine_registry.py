@@ -1,41 +1,212 @@
 """
 Adds `add_engine()` helper so the UI can create new engine folders at runtime.
+
+`scan_engines()` is backed by a persisted index (`.registry_index.json` in the
+engine root).  Each folder is stamped with its mtime plus the mtime/size of
+`meta.json` and `torque_curve.csv`; an unchanged stamp means the cached meta
+is used without opening any file.  A changed stamp re-hashes `meta.json` and
+only re-parses it when the content hash differs.  Torque curves are never
+read here – `EngineSimulator.load_engine` loads them on first use.
+
+`export_pack()` / `import_pack()` convert between the loose-folder authoring
+layout and a single memory-mapped binary pack (see `engine.engine_pack`),
+which `scan_engines()` also accepts as a source.
 """
 
 from pathlib import Path
+import hashlib
 import json
+import os
 import shutil
 import re
-from typing import Dict, Any
+import threading
+from typing import Dict, Any, List
+
+from engine.engine_pack import open_pack, write_pack
 
 ENGINE_ROOT = Path(__file__).resolve().parent.parent / "assets" / "engines"
+INDEX_NAME  = ".registry_index.json"
+_INDEX_VERSION = 1
+
+
+class _EngineIndex:
+    """
+    In-memory + on-disk index of one engine root folder.  Shared per root
+    and touched from the UI, engine-load and watcher threads: `lock` (an
+    RLock) guards `entries`, and callers that combine update/refresh with
+    `meta()` hold it across both.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root    = root
+        self.path    = root / INDEX_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock    = threading.RLock()
+        self._dirty  = False
+        self._read()
+
+    # ───────────────── persistence ──
+    def _read(self):
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == _INDEX_VERSION:
+            self.entries = data.get("engines", {})
+
+    def save(self):
+        with self.lock:
+            if not self._dirty:
+                return
+            tmp = self.path.with_suffix(".tmp")
+            try:
+                tmp.write_text(json.dumps({"version": _INDEX_VERSION,
+                                           "engines": self.entries}))
+                os.replace(tmp, self.path)
+                self._dirty = False
+            except OSError:
+                pass    # read-only install – the in-memory index still works
+
+    # ───────────────── refresh ──
+    @staticmethod
+    def _stamp(folder: Path) -> List[int] | None:
+        try:
+            f = folder.stat()
+            m = (folder / "meta.json").stat()
+            c = (folder / "torque_curve.csv").stat()
+        except OSError:
+            return None
+        return [f.st_mtime_ns, m.st_mtime_ns, m.st_size,
+                c.st_mtime_ns, c.st_size]
+
+    def update(self, name: str) -> bool:
+        """Re-index one folder; returns True if it is a valid engine."""
+        with self.lock:
+            folder = self.root / name
+            stamp  = self._stamp(folder) if folder.is_dir() else None
+            entry  = self.entries.get(name)
+            if stamp is None:
+                if entry is not None:
+                    del self.entries[name]
+                    self._dirty = True
+                return False
+            if entry is not None and entry["stamp"] == stamp:
+                return entry["meta"] is not None
+
+            raw    = (folder / "meta.json").read_bytes()
+            digest = hashlib.sha1(raw).hexdigest()
+            if entry is None or entry["hash"] != digest:
+                try:
+                    meta = json.loads(raw)
+                except ValueError:
+                    meta = None     # remember it is broken until it changes
+                entry = {"hash": digest, "meta": meta}
+            entry["stamp"] = stamp
+            self.entries[name] = entry
+            self._dirty = True
+            return entry["meta"] is not None
+
+    def refresh(self) -> List[str]:
+        """Re-validate every folder, return valid keys in directory order."""
+        with self.lock:
+            keys: List[str] = []
+            seen = set()
+            with os.scandir(self.root) as it:
+                for d in it:
+                    if not d.is_dir():
+                        continue
+                    seen.add(d.name)
+                    if self.update(d.name):
+                        keys.append(d.name)
+            for gone in set(self.entries) - seen:
+                del self.entries[gone]
+                self._dirty = True
+            self.save()
+            return keys
+
+    def meta(self, name: str) -> Dict[str, Any]:
+        with self.lock:
+            folder = self.root / name
+            meta   = dict(self.entries[name]["meta"])
+            meta["folder"]  = folder
+            meta["curve"]   = folder / "torque_curve.csv"
+            # guarantee display key
+            meta["display"] = meta.get("name", name)
+            return meta
+
+
+_INDEXES: Dict[Path, _EngineIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _index(root: Path) -> _EngineIndex:
+    with _INDEXES_LOCK:
+        idx = _INDEXES.get(root)
+        if idx is None:
+            idx = _INDEXES[root] = _EngineIndex(root)
+        return idx
 
 
-def scan_engines() -> Dict[str, Dict[str, Any]]:
+def scan_engines(source: Path | None = None) -> Dict[str, Dict[str, Any]]:
     """
     Return {key : meta_dict} and guarantee each meta dict has:
         folder, curve, name, display, idle, redline
+    `source` is an engine root folder (default ENGINE_ROOT) or a binary
+    engine pack; pack metas carry `pack` / `pack_key` instead of a curve path.
     """
+    root = source or ENGINE_ROOT
     engines: Dict[str, Dict[str, Any]] = {}
-    if not ENGINE_ROOT.exists():
+    if not root.exists():
         return engines
 
-    for folder in ENGINE_ROOT.iterdir():
-        meta_file = folder / "meta.json"
-        curve_csv = folder / "torque_curve.csv"
-        if folder.is_dir() and meta_file.exists() and curve_csv.exists():
-            try:
-                meta = json.loads(meta_file.read_text())
-            except json.JSONDecodeError:
-                continue
-            meta["folder"]  = folder
-            meta["curve"]   = curve_csv
-            # guarantee display key
-            meta["display"] = meta.get("name", folder.name)
-            engines[folder.name] = meta
+    if root.is_file():
+        pack = open_pack(root)
+        return {key: pack.meta(key) for key in pack.keys()}
+
+    idx = _index(root)
+    with idx.lock:
+        for key in idx.refresh():
+            engines[key] = idx.meta(key)
     return engines
 
 
+def export_pack(dest: Path, source: Path | None = None) -> int:
+    """Pack every loose engine under `source` into one binary file."""
+    return write_pack(dest, scan_engines(source))
+
+
+def import_pack(src: Path, dest_root: Path | None = None,
+                overwrite: bool = False) -> List[str]:
+    """
+    Unpack a binary engine pack into loose authoring folders.
+    Existing folders are skipped unless `overwrite`; returns written keys.
+    """
+    dest_root = dest_root or ENGINE_ROOT
+    pack      = open_pack(src)
+    written: List[str] = []
+    for key in pack.keys():
+        dest = dest_root / key
+        if dest.exists() and not overwrite:
+            continue
+        dest.mkdir(parents=True, exist_ok=True)
+
+        meta = {k: v for k, v in pack.meta(key).items()
+                if k in ("name", "idle", "redline")}
+        meta["curve"] = "torque_curve.csv"
+        rpms, torques = pack.buffers(key)
+        # repr() is the shortest text that parses back to the same float
+        rows = "".join(f"{r!r},{t!r}\n" for r, t in zip(rpms, torques))
+        (dest / "torque_curve.csv").write_text("RPM,Torque\n" + rows)
+        (dest / "meta.json").write_text(json.dumps(meta, indent=2))
+        written.append(key)
+
+    idx = _index(dest_root)
+    with idx.lock:
+        for key in written:
+            idx.update(key)
+        idx.save()
+    return written
+
 
 def _slugify(text: str) -> str:
     return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
@@ -65,4 +236,10 @@ def add_engine(name: str, idle: int, redline: int, csv_src: Path) -> str:
         "curve": "torque_curve.csv"
     }
     (dest / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    # incremental index update – no full rescan needed
+    idx = _index(ENGINE_ROOT)
+    with idx.lock:
+        idx.update(key)
+        idx.save()
     return key
@@ -0,0 +1,173 @@
+"""
+engine.kernel  –  fused per-tick physics loop for long single-engine traces.
+
+`_simulate` folds `_update_rpm`, `_update_boost`, `_calc_power`,
+`_calc_knock` and `_calc_mpg` (plus the torque-curve bisect and shift
+glide) into one loop over primitive arrays.  With numba installed it is
+JIT-compiled (`backend="numba"`); otherwise the very same function runs as
+plain Python over lists (`backend="python"`).  Either way the results match
+`engine.runner.run_trace` within floating-point tolerance.
+"""
+
+import numpy as np
+
+from engine.runner import InputTrace, RunResult
+from engine.simulator import EngineSimulator
+
+try:
+    import numba
+except ImportError:          # optional dependency
+    numba = None
+
+HAVE_NUMBA = numba is not None
+_JITTED = None
+
+
+def _simulate(throttle, gear, timing, boost_cmd, afr, ratios,
+              xs, ys, ks, idle, redline, dt, rpm, boost, target, gear0,
+              out_hp, out_knock, out_mpg, out_rpm, out_boost):
+    """
+    One tick per input element.  `gear` holds gear indices; a change from
+    the previous tick shifts (rpm glide target) like `EngineSimulator._shift`.
+    Returns the final (rpm, boost, rpm_target).
+    """
+    n_pts  = len(xs)
+    cur    = gear0
+    step_g = 4000 * dt
+    lag    = 0.5 * (dt / 0.2)
+    for i in range(len(throttle)):
+        # shift ---------------------------------------------------------
+        g = gear[i]
+        if g != cur:
+            old = ratios[cur]
+            new = ratios[g]
+            target = rpm * (new / old) if old > 0 and new > 0 else 0.0
+            cur = g
+
+        # _update_rpm ---------------------------------------------------
+        ratio = ratios[cur]
+        thr   = throttle[i] / 100.0
+        if thr > 0.01 and ratio > 0:
+            rpm += 4500 * thr * (ratio / 3.8) * dt
+        else:
+            decay = 800 if ratio == 0 else 1200
+            rpm = max(rpm - decay * dt, idle)
+        if target != 0.0:
+            delta = target - rpm
+            if abs(delta) <= step_g:
+                rpm = target
+                target = 0.0
+            else:
+                rpm += step_g if delta > 0 else -step_g
+        rpm = min(rpm, redline)
+
+        # _update_boost -------------------------------------------------
+        cmd = boost_cmd[i]
+        if boost < cmd:
+            boost = min(cmd, boost + lag)
+        elif boost > cmd:
+            boost = max(cmd, boost - lag)
+
+        # _calc_power (torque_at inlined) -------------------------------
+        a = afr[i]
+        if rpm <= 0:
+            hp = 0.0
+        else:
+            if rpm <= xs[0]:
+                tq = ys[0]
+            elif rpm >= xs[n_pts - 1]:
+                tq = ys[n_pts - 1]
+            else:
+                lo, hi = 0, n_pts          # bisect_right
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    if rpm < xs[mid]:
+                        hi = mid
+                    else:
+                        lo = mid + 1
+                j  = lo - 1
+                tq = ys[j] + (rpm - xs[j]) * ks[j]
+            afr_eff = 1.05 if 12 <= a <= 13.6 else 0.9
+            hp = (tq * rpm / 5252.0 * (1 + boost / 14.7) * afr_eff
+                  * (1 + (timing[i] - 10) / 100) * thr)
+
+        # _calc_knock / _calc_mpg ---------------------------------------
+        s = 0.0
+        if timing[i] > 20:
+            s += timing[i] - 20
+        if boost > 12:
+            s += (boost - 12) * 1.5
+        if a < 12.5:
+            s += (12.5 - a) * 3
+
+        out_hp[i]    = hp
+        out_knock[i] = 2 if s > 12 else 1 if s > 6 else 0
+        out_mpg[i]   = 40.0 if throttle[i] < 1 else (a / 14.7) * (1 - thr) * 40
+        out_rpm[i]   = rpm
+        out_boost[i] = boost
+    return rpm, boost, target
+
+
+def _jitted():
+    global _JITTED
+    if _JITTED is None:
+        _JITTED = numba.njit(cache=True, nogil=True)(_simulate)
+    return _JITTED
+
+
+def run_trace_kernel(sim: EngineSimulator, trace: InputTrace, dt: float = 0.01,
+                     start_rpm: float | None = None,
+                     backend: str = "auto") -> RunResult:
+    """
+    Kernel equivalent of `engine.runner.run_trace`.  `backend` is "auto"
+    (numba when installed), "numba" or "python".  `sim` supplies the engine,
+    gearbox and untraced inputs, and is left in the final state.
+    """
+    if backend == "auto":
+        backend = "numba" if HAVE_NUMBA else "python"
+    if backend == "numba" and not HAVE_NUMBA:
+        raise RuntimeError("numba is not installed.")
+
+    n     = int(round(trace.duration / dt))
+    order = tuple(sim._gearbox.order)
+    rows  = trace.sample(n, dt)
+
+    def per_tick(col, default):
+        return (np.full(n, float(default)) if col is None
+                else np.asarray(col, dtype=np.float64)[rows])
+
+    gear_of_row = np.array([order.index(g) if g in order else 0
+                            for g in trace.gear], dtype=np.int64)
+    gear0   = order.index(trace.gear[0]) if trace.gear[0] in order else 0
+    inputs  = (per_tick(trace.throttle, 0.0), gear_of_row[rows],
+               per_tick(trace.timing, sim.timing),
+               per_tick(trace.boost_cmd, sim.boost_cmd),
+               per_tick(trace.afr, sim.afr))
+    ratios  = np.array([sim._gearbox.ratio(g) for g in order])
+    model   = sim._torque_model
+    curve   = (np.ascontiguousarray(model.rpms), np.ascontiguousarray(model.torques),
+               np.ascontiguousarray(model.slopes))
+    rpm0    = float(sim.idle_rpm if start_rpm is None else start_rpm)
+    state   = (float(sim.idle_rpm), float(sim.redline), float(dt),
+               rpm0, float(sim._boost), float(sim._rpm_target), gear0)
+
+    out = RunResult(time=np.arange(1, n + 1) * dt, rpm=np.empty(n),
+                    hp=np.empty(n), knock=np.empty(n, dtype=np.int8),
+                    mpg=np.empty(n), boost=np.empty(n),
+                    gear=gear_of_row[rows].astype(np.int8), gear_order=order)
+
+    if backend == "numba":
+        final = _jitted()(*inputs, ratios, *curve, *state,
+                          out.hp, out.knock, out.mpg, out.rpm, out.boost)
+    else:
+        # lists keep the interpreted loop off NumPy scalar boxing
+        bufs  = [[0.0] * n for _ in range(5)]
+        final = _simulate(*(a.tolist() for a in inputs), ratios.tolist(),
+                          *(c.tolist() for c in curve), *state, *bufs)
+        out.hp[:], out.knock[:], out.mpg[:], out.rpm[:], out.boost[:] = bufs
+
+    sim.engine_on = True
+    sim._rpm, sim._boost, sim._rpm_target = (float(v) for v in final)
+    if n:
+        sim.gear = order[out.gear[-1]]
+    return out
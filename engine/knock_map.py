@@ -0,0 +1,234 @@
+"""
+engine.knock_map  –  precomputed knock-risk boundaries with a sparse index.
+
+One knock model serves the simulator, the batch tools and the UI: the
+`engine.batch.knock_score` of (boost, timing, afr) against `KNOCK_LIMITS`.
+The score has no rpm or engine term, so one map covers every engine.
+
+`KnockMap` evaluates the score on a node grid once and keeps only where it
+crosses each limit: for every grid line along each axis, the sorted
+positions at which the line enters or leaves the MED / HIGH region
+(linearly interpolated between nodes; the default axes put every kink of
+the score on a node, so the crossings are exact along the line).  That is
+a few thousand floats instead of the full grid, and a query is one
+`searchsorted` per neighbouring line – O(log n).
+
+Off-grid points take the worst of the four grid lines around them, so
+answers are conservative to one grid step in the other two axes.  Points
+outside the axes get the exact score instead (`level` / `safe` /
+`is_safe`); `margin` has no grid to measure along there and returns NaN.
+All queries broadcast over numpy arrays.
+"""
+
+from bisect import bisect_left
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+
+from engine.batch import KNOCK_LIMITS, calc_knock, knock_score
+from engine.op_surface import Axis
+from engine.simulator import KNOCK_LEVELS
+
+AXES: Tuple[str, ...] = ("boost", "timing", "afr")
+_SNAP = 1e-9        # node coordinates this close to a node are on it
+
+
+def default_axes() -> Dict[str, Axis]:
+    return {"boost":  Axis(0.0, 30.0, 61),
+            "timing": Axis(0.0, 40.0, 81),
+            "afr":    Axis(10.0, 16.0, 61)}
+
+
+class _LineIndex:
+    """Limit crossings along one axis: sorted keys line*(n+1) + 0.5 + u."""
+
+    def __init__(self, scores: np.ndarray, k: int, limit: float) -> None:
+        lines = np.moveaxis(scores, k, -1)
+        self.n = n = lines.shape[-1]
+        lines = lines.reshape(-1, n)
+        risky = lines > limit
+
+        line, j = np.nonzero(risky[:, 1:] != risky[:, :-1])
+        s0, s1  = lines[line, j], lines[line, j + 1]
+        u       = j + (limit - s0) / (s1 - s0)
+        start   = np.flatnonzero(risky[:, 0])    # risky from the first node
+
+        keys     = np.concatenate([line * (n + 1) + 0.5 + u,
+                                   start * (n + 1.0)])
+        entering = np.concatenate([~risky[line, j], np.ones(start.size, bool)])
+        order    = np.argsort(keys, kind="stable")
+        self.keys, self.entering = keys[order], entering[order]
+        self._keys, self._entering = self.keys.tolist(), self.entering.tolist()
+
+    def query(self, line: np.ndarray, u: np.ndarray
+              ) -> Tuple[np.ndarray, np.ndarray]:
+        """(risky, distance in nodes to the nearest crossing, inf if none)."""
+        keys, base = self.keys, line * (self.n + 1)
+        q = base + 0.5 + u
+        if not keys.size:                        # never reaches the limit
+            return np.zeros(q.shape, bool), np.full(q.shape, np.inf)
+        i    = np.searchsorted(keys, q, side="left")
+        prev = np.maximum(i - 1, 0)
+        nxt  = np.minimum(i, keys.size - 1)
+
+        has_prev = (i > 0) & (keys[prev] >= base)
+        risky    = has_prev & self.entering[prev]
+        # a start-of-line marker (…+0) is state, not a boundary
+        d_prev = np.where(has_prev & (keys[prev] > base), q - keys[prev], np.inf)
+        d_next = np.where((i < keys.size) & (keys[nxt] < base + self.n + 1),
+                          keys[nxt] - q, np.inf)
+        return risky, np.minimum(d_prev, d_next)
+
+    def risky_at(self, line: int, u: float) -> bool:
+        """Scalar `query(...)[0]` via bisect (no numpy call overhead)."""
+        base = line * (self.n + 1)
+        i = bisect_left(self._keys, base + 0.5 + u)
+        return i > 0 and self._keys[i - 1] >= base and self._entering[i - 1]
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.entering.nbytes
+
+
+class KnockMap:
+    def __init__(self, axes: Dict[str, Axis] | None = None) -> None:
+        self.axes  = axes or default_axes()
+        self._axes = tuple(self.axes[a] for a in AXES)
+        b, t, a = np.meshgrid(*(ax.nodes() for ax in self._axes), indexing="ij")
+        scores  = knock_score(t, b, a)
+        # _index[level][axis]: crossings of the limit that level exceeds
+        self._index = {lvl: [_LineIndex(scores, k, limit)
+                             for k in range(len(AXES))]
+                       for lvl, limit in zip(KNOCK_LEVELS[1:], KNOCK_LIMITS)}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(ix.nbytes for per_axis in self._index.values()
+                   for ix in per_axis)
+
+    # ───────────────── lookup ──
+    def _coords(self, boost, timing, afr
+                ) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        """
+        (fractional node coordinates clipped to the axes, mask of the
+        points that were outside them).
+        """
+        coords = []
+        outside = np.zeros(np.broadcast(boost, timing, afr).shape, bool)
+        for v, ax in zip(np.broadcast_arrays(boost, timing, afr), self._axes):
+            c = (np.asarray(v, dtype=np.float64) - ax.lo) / ax.step
+            outside |= (c < -_SNAP) | (c > ax.n - 1 + _SNAP)
+            c = np.clip(c, 0, ax.n - 1)
+            r = np.round(c)
+            coords.append(np.where(np.abs(c - r) < _SNAP, r, c))
+        return tuple(coords), outside
+
+    def _query(self, coords, level: str, k: int
+               ) -> Tuple[np.ndarray, np.ndarray]:
+        """Worst (risky, signed margin in nodes) over the 4 lines around."""
+        ix = self._index[level][k]
+        others = [c for m, c in enumerate(coords) if m != k]
+        n_b    = self._axes[[m for m in range(len(AXES)) if m != k][1]].n
+        risky  = np.zeros(coords[k].shape, bool)
+        margin = np.full(coords[k].shape, np.inf)
+        for i0 in (np.floor(others[0]), np.ceil(others[0])):
+            for i1 in (np.floor(others[1]), np.ceil(others[1])):
+                line = i0.astype(np.int64) * n_b + i1.astype(np.int64)
+                r, d = ix.query(line, coords[k])
+                risky  |= r
+                margin  = np.minimum(margin, np.where(r, -d, d))
+        return risky, np.where(risky, np.minimum(margin, 0.0), margin)
+
+    def level(self, boost, timing, afr) -> np.ndarray:
+        """Knock code (index into KNOCK_LEVELS) of each setpoint."""
+        coords, outside = self._coords(boost, timing, afr)
+        code = np.zeros(coords[0].shape, dtype=np.int8)
+        for c, lvl in enumerate(KNOCK_LEVELS[1:], 1):
+            code[self._query(coords, lvl, 1)[0]] = c
+        if outside.any():
+            b, t, a = np.broadcast_arrays(boost, timing, afr)
+            code[outside] = calc_knock(t[outside], b[outside], a[outside])
+        return code
+
+    def safe(self, boost, timing, afr, max_knock: str = "LOW") -> np.ndarray:
+        """True where knock stays at or below `max_knock`."""
+        if max_knock == KNOCK_LEVELS[-1]:
+            return np.ones(np.broadcast(boost, timing, afr).shape, bool)
+        top   = KNOCK_LEVELS.index(max_knock)
+        coords, outside = self._coords(boost, timing, afr)
+        safe  = np.logical_not(self._query(coords, KNOCK_LEVELS[top + 1], 1)[0],
+                               out=np.empty(outside.shape, bool))
+        if outside.any():
+            b, t, a = np.broadcast_arrays(boost, timing, afr)
+            safe[outside] = calc_knock(t[outside], b[outside], a[outside]) <= top
+        return safe
+
+    def is_safe(self, boost: float, timing: float, afr: float,
+                max_knock: str = "LOW") -> bool:
+        """Scalar `safe()` for per-tick callers."""
+        if max_knock == KNOCK_LEVELS[-1]:
+            return True
+        top    = KNOCK_LEVELS.index(max_knock)
+        coords = self._scalar_coords(boost, timing, afr)
+        if coords is None:                      # off the map: exact score
+            return int(calc_knock(timing, boost, afr)) <= top
+        ix = self._index[KNOCK_LEVELS[top + 1]][1]
+        (b, t, a), n_afr = coords, self._axes[2].n
+        for ib in {math.floor(b), math.ceil(b)}:
+            for ia in {math.floor(a), math.ceil(a)}:
+                if ix.risky_at(ib * n_afr + ia, t):
+                    return False
+        return True
+
+    def _scalar_coords(self, *values: float) -> Tuple[float, ...] | None:
+        """Node coordinates, or None if the point is outside the axes."""
+        coords = []
+        for v, ax in zip(values, self._axes):
+            c = (v - ax.lo) / ax.step
+            if not -_SNAP <= c <= ax.n - 1 + _SNAP:
+                return None
+            c = min(max(c, 0.0), ax.n - 1.0)
+            r = round(c)
+            coords.append(r if abs(c - r) < _SNAP else c)
+        return tuple(coords)
+
+    def margin(self, boost, timing, afr, axis: str = "timing",
+               max_knock: str = "LOW") -> np.ndarray:
+        """
+        Distance along `axis` (its units) from each setpoint to the nearest
+        boundary of the region above `max_knock`: positive while safe,
+        negative by how far to move back; ±inf if the whole line is on one
+        side, NaN outside the axes.
+        """
+        if max_knock == KNOCK_LEVELS[-1]:
+            return np.full(np.broadcast(boost, timing, afr).shape, np.inf)
+        above = KNOCK_LEVELS[KNOCK_LEVELS.index(max_knock) + 1]
+        k = AXES.index(axis)
+        coords, outside = self._coords(boost, timing, afr)
+        _, nodes = self._query(coords, above, k)
+        return np.where(outside, np.nan, nodes * self._axes[k].step)
+
+    def envelope(self, x: str = "timing", y: str = "boost",
+                 max_knock: str = "LOW", **fixed: float
+                 ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (x nodes, y nodes, safe[y, x]) over the grid, with the remaining
+        axis held at `fixed` (e.g. `afr=12.8`).
+        """
+        (z,) = set(AXES) - {x, y}
+        xs, ys = self.axes[x].nodes(), self.axes[y].nodes()
+        point = {x: xs[None, :], y: ys[:, None], z: fixed[z]}
+        return xs, ys, self.safe(point["boost"], point["timing"], point["afr"],
+                                 max_knock)
+
+
+_DEFAULT: KnockMap | None = None
+
+
+def knock_map() -> KnockMap:
+    """Shared map on the default axes (built on first use, ~ms)."""
+    global _DEFAULT
+    if _DEFAULT is None:
+        _DEFAULT = KnockMap()
+    return _DEFAULT
@@ -0,0 +1,272 @@
+"""
+engine.op_surface  –  memoised steady-state operating-point surface.
+
+`OperatingSurface` grids hp, knock score and mpg over five axes
+(rpm, boost, timing, afr, throttle) for one engine and answers queries by
+multilinear interpolation, so "hp / knock / mpg at this operating point",
+tuning-map heatmaps and best-timing searches are array lookups instead of
+fresh `_calc_power` / `_calc_knock` / `_calc_mpg` calls.
+
+The grid is split into tiles that overlap their neighbours by one node, so
+every interpolation cell lies inside a single tile.  Tiles are computed on
+first touch with the vectorised maths from `engine.batch` and written to
+`<cache_dir>/<curve hash>/`, keyed by a hash of the torque curve and the
+axes, so the next process (or the next engine with an identical curve)
+loads them instead of recomputing.
+
+The surface assumes settled boost (boost = boost_cmd).  Accuracy is the
+grid resolution: hp is linear in boost, timing and throttle and the default
+axes put every knock-score kink on a node.  The AFR-efficiency steps (12.0
+and 13.6) and the closed-throttle mpg step (throttle < 1 %) are jumps no
+interpolation grid can hold, so the tiles store power at unit AFR
+efficiency and the under-load mpg, and both steps are applied per query;
+only the curvature of the torque curve between rpm nodes is smoothed.
+
+Tiles are cached per user (`$ENGINE_TUNER_CACHE`, else the platform cache
+folder), never inside the shipped assets.
+"""
+
+from dataclasses import dataclass
+import hashlib
+from itertools import product
+from pathlib import Path
+import math
+import os
+from typing import Dict, Tuple
+
+import numpy as np
+
+from engine.batch import (KNOCK_LIMITS, afr_efficiency, calc_mpg, calc_power,
+                          knock_code, knock_score, mpg_under_load)
+from engine.simulator import KNOCK_LEVELS
+
+AXES: Tuple[str, ...]     = ("rpm", "boost", "timing", "afr", "throttle")
+CHANNELS: Tuple[str, ...] = ("hp", "knock", "mpg")   # knock = knock score
+_VERSION  = 3
+_CORNERS  = np.array(list(product((0, 1), repeat=len(AXES))))
+
+
+def user_cache_dir() -> Path:
+    """Per-user folder for generated surface tiles."""
+    if os.environ.get("ENGINE_TUNER_CACHE"):
+        return Path(os.environ["ENGINE_TUNER_CACHE"]) / "surfaces"
+    if os.name == "nt":
+        base = Path(os.environ.get("LOCALAPPDATA",
+                                   Path.home() / "AppData" / "Local"))
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "engine_tuner" / "surfaces"
+
+
+CACHE_DIR = user_cache_dir()
+
+
+@dataclass(frozen=True)
+class Axis:
+    lo: float
+    hi: float
+    n:  int     # number of nodes
+
+    @property
+    def step(self) -> float:
+        return (self.hi - self.lo) / (self.n - 1)
+
+    def nodes(self) -> np.ndarray:
+        return np.linspace(self.lo, self.hi, self.n)
+
+
+def default_axes(idle: float, redline: float) -> Dict[str, Axis]:
+    return {"rpm":      Axis(idle, redline, 33),
+            "boost":    Axis(0.0, 30.0, 16),
+            "timing":   Axis(0.0, 40.0, 21),
+            "afr":      Axis(10.0, 16.0, 13),
+            "throttle": Axis(0.0, 100.0, 11)}
+
+
+class OperatingSurface:
+    TILE = (8, 8, 8, 4, 4)      # cells per tile along each axis
+
+    def __init__(self, model, idle: float, redline: float,
+                 axes: Dict[str, Axis] | None = None,
+                 cache_dir: Path | None = CACHE_DIR) -> None:
+        self.model = model
+        self.axes  = axes or default_axes(idle, redline)
+        self._axes = tuple(self.axes[a] for a in AXES)
+        self._counts = tuple(math.ceil((a.n - 1) / t)
+                             for a, t in zip(self._axes, self.TILE))
+        self.key   = self._hash()
+        self.tiles_built = 0                        # computed, not loaded
+        self._tiles: Dict[Tuple[int, ...], np.ndarray] = {}
+        self._dir  = None if cache_dir is None else Path(cache_dir) / self.key
+
+    @classmethod
+    def for_simulator(cls, sim, **kwargs) -> "OperatingSurface":
+        return cls(sim._torque_model, sim.idle_rpm, sim.redline, **kwargs)
+
+    def _hash(self) -> str:
+        h = hashlib.sha1(f"v{_VERSION}".encode())
+        h.update(np.ascontiguousarray(self.model.rpms, dtype=np.float64).tobytes())
+        h.update(np.ascontiguousarray(self.model.torques, dtype=np.float64).tobytes())
+        h.update(repr(self._axes).encode())
+        return h.hexdigest()[:16]
+
+    # ───────────────── tiles ──
+    def _tile(self, key: Tuple[int, ...]) -> np.ndarray:
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = self._tiles[key] = self._load_or_build(key)
+        return tile
+
+    def _load_or_build(self, key: Tuple[int, ...]) -> np.ndarray:
+        path = None
+        if self._dir is not None:
+            path = self._dir / ("-".join(map(str, key)) + ".npy")
+            try:
+                return np.load(path)
+            except (OSError, ValueError):
+                pass
+
+        tile = self._build(key)
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                with tmp.open("wb") as fp:
+                    np.save(fp, tile)
+                os.replace(tmp, path)
+            except OSError as exc:
+                print(f"[OperatingSurface] Could not cache tile {key}: {exc}")
+        return tile
+
+    def _build(self, key: Tuple[int, ...]) -> np.ndarray:
+        """
+        (3, *nodes) array of hp / knock score / mpg for one tile; hp without
+        the AFR-efficiency factor and mpg without the closed-throttle step
+        (see the module docstring).
+        """
+        nodes = []
+        for axis, k, t in zip(self._axes, key, self.TILE):
+            first = k * t
+            nodes.append(axis.nodes()[first:first + t + 1])   # + shared edge
+        rpm, boost, timing, afr, thr = np.meshgrid(*nodes, indexing="ij")
+
+        torque = self.model.torque_at_many(rpm.ravel()).reshape(rpm.shape)
+        self.tiles_built += 1
+        return np.stack([calc_power(torque, rpm, boost, afr, timing, thr)
+                         / afr_efficiency(afr),
+                         knock_score(timing, boost, afr),
+                         mpg_under_load(afr, thr)])
+
+    def _locate(self, axis: Axis, t: int, x):
+        """Tile index, cell offset within the tile and fraction for `x`."""
+        pos  = np.clip((np.asarray(x, dtype=float) - axis.lo) / axis.step,
+                       0, axis.n - 1)
+        cell = np.minimum(pos.astype(np.intp), axis.n - 2)
+        return cell // t, cell % t, pos - cell
+
+    # ───────────────── queries ──
+    def sample(self, rpm: float, boost: float, timing: float, afr: float,
+               throttle: float) -> Tuple[float, str, float]:
+        """(hp, knock level, mpg) at one operating point."""
+        key, idx, frac = [], [], []
+        for axis, t, x in zip(self._axes, self.TILE,
+                              (rpm, boost, timing, afr, throttle)):
+            pos  = min(max((x - axis.lo) / axis.step, 0.0), axis.n - 1.0)
+            cell = min(int(pos), axis.n - 2)
+            key.append(cell // t)
+            idx.append(slice(cell % t, cell % t + 2))
+            frac.append(pos - cell)
+
+        v = self._tile(tuple(key))[(slice(None), *idx)]     # (3, 2, 2, 2, 2, 2)
+        for f in reversed(frac):                            # collapse last axis
+            v = v[..., 0] + (v[..., 1] - v[..., 0]) * f
+        hp, score, mpg = v.tolist()
+        hp *= 1.05 if 12 <= afr <= 13.6 else 0.9        # afr_efficiency
+        if throttle < 1:                                # closed-throttle step
+            mpg = float(calc_mpg(afr, throttle))
+        return hp, KNOCK_LEVELS[int(knock_code(score))], mpg
+
+    def sample_many(self, rpm, boost, timing, afr, throttle
+                    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Broadcast query: (hp, knock_code, mpg) arrays shaped like the
+        broadcast inputs; knock_code indexes KNOCK_LEVELS.
+        """
+        hp, score, mpg = self.values(rpm, boost, timing, afr, throttle)
+        return hp, knock_code(score), mpg
+
+    def values(self, rpm, boost, timing, afr, throttle) -> np.ndarray:
+        """(3, *shape) interpolated hp / knock score / mpg."""
+        pts   = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                      for v in (rpm, boost, timing, afr, throttle)))
+        shape = pts[0].shape
+        locs  = [self._locate(a, t, p.ravel())
+                 for a, t, p in zip(self._axes, self.TILE, pts)]
+        keys  = np.ravel_multi_index([k for k, _, _ in locs], self._counts)
+        out   = np.empty((len(CHANNELS), keys.size))
+        nd    = len(AXES)
+
+        uniq, group = np.unique(keys, return_inverse=True)
+        for g, key in enumerate(uniq):
+            sel  = slice(None) if uniq.size == 1 else np.flatnonzero(group == g)
+            tile = self._tile(tuple(int(k) for k in
+                                    np.unravel_index(key, self._counts)))
+            # gather each point's 2×2×2×2×2 cell as one flat take, then
+            # collapse it axis by axis
+            strides = np.array(tile.strides[1:]) // tile.itemsize
+            base = sum(o[sel] * st for (_, o, _), st in zip(locs, strides))
+            flat = np.asarray(base)[:, None] + _CORNERS @ strides
+            v = tile.reshape(len(CHANNELS), -1)[:, flat]
+            v = v.reshape(v.shape[:2] + (2,) * nd)          # (3, m, 2, …, 2)
+            for k in reversed(range(nd)):
+                f = locs[k][2][sel].reshape((-1,) + (1,) * k)
+                v = v[..., 0] + (v[..., 1] - v[..., 0]) * f
+            out[:, sel] = v
+        out[0] *= afr_efficiency(pts[3].ravel())
+        thr     = pts[4].ravel()
+        out[2]  = np.where(thr < 1, calc_mpg(pts[3].ravel(), thr), out[2])
+        return out.reshape((len(CHANNELS),) + shape)
+
+    def heatmap(self, x: str = "boost", y: str = "timing",
+                channel: str = "hp", **fixed: float
+                ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        `channel` over the grid nodes of axes `x` (columns) and `y` (rows)
+        with the other three axes held at `fixed` (default: mid-axis).
+        Returns (x_nodes, y_nodes, values[len(y), len(x)]).
+        """
+        xs, ys = self.axes[x].nodes(), self.axes[y].nodes()
+        point  = {name: fixed.get(name, (a.lo + a.hi) / 2)
+                  for name, a in self.axes.items()}
+        point[x], point[y] = xs[None, :], ys[:, None]
+        vals = self.values(*(point[a] for a in AXES))
+        return xs, ys, vals[CHANNELS.index(channel)]
+
+    def best_timing(self, rpm: float, boost: float, afr: float = 13.0,
+                    throttle: float = 100.0, max_knock: str = "LOW"
+                    ) -> Tuple[float, float]:
+        """
+        Timing that maximises hp at this point while knock stays at or below
+        `max_knock`; returns (timing, hp), or (nan, nan) if no timing is safe.
+        Both channels are piecewise linear in timing, so the optimum is a
+        grid node or the point where the knock score crosses the limit.
+        """
+        limit = (*KNOCK_LIMITS, math.inf)[KNOCK_LEVELS.index(max_knock)]
+        t = self.axes["timing"].nodes()
+        hp, score, _ = self.values(rpm, boost, t, afr, throttle)
+
+        s0, s1 = score[:-1] - limit, score[1:] - limit
+        cross  = np.flatnonzero(s0 * s1 < 0)
+        f      = s0[cross] / (s0[cross] - s1[cross])
+        cand_t = np.concatenate([t, t[cross] + f * (t[cross + 1] - t[cross])])
+        cand_h = np.concatenate([hp, hp[cross] + f * (hp[cross + 1] - hp[cross])])
+        safe   = np.concatenate([score <= limit, np.ones(cross.size, bool)])
+        if not safe.any():
+            return math.nan, math.nan
+        best = int(np.argmax(np.where(safe, cand_h, -np.inf)))
+        return float(cand_t[best]), float(cand_h[best])
+
+    def warm(self):
+        """Build (or load) every tile up front."""
+        for key in product(*(range(c) for c in self._counts)):
+            self._tile(key)
@@ -0,0 +1,149 @@
+"""
+engine.optimizer  –  gradient-free search for the best knock-safe tune.
+
+`TuneOptimizer` runs a cross-entropy search (a diagonal-covariance cousin of
+CMA-ES) over `timing`, `boost_cmd` and `afr`: every generation samples a
+population from a Gaussian, evaluates it as one batch of pulls through
+`engine.sweep` (in-process or on a process pool), and refits the Gaussian
+to the elite – the highest-hp candidates whose knock stayed within
+`max_knock` for the whole pull.
+
+Candidates are snapped to `RESOLUTION` before evaluation, so repeats within
+and across generations (and across `run()` calls) are served from the
+evaluation cache.  Pulls use `PullSpec.max_knock`, which drops a lane from
+the batch the moment it knocks, so bad candidates cost only the ticks it
+took to find out.
+
+Every clean evaluation feeds `front()`, the Pareto set of peak hp vs
+average mpg.  The default pull is at 90 % throttle because mpg is zero at
+WOT; hp ranking is the same at any fixed throttle.
+"""
+
+from dataclasses import dataclass, field, replace
+import math
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from engine.sweep import TUNABLES, Point, PullSpec, iter_sweep
+
+Row = Dict[str, float]
+
+BOUNDS: Dict[str, Tuple[float, float]] = {"timing":    (0.0, 35.0),
+                                          "boost_cmd": (0.0, 25.0),
+                                          "afr":       (11.0, 15.0)}
+RESOLUTION: Dict[str, float] = {"timing": 0.25, "boost_cmd": 0.25, "afr": 0.05}
+OPT_PULL = PullSpec(duration=6.0, dt=0.01, throttle=90.0)
+
+
+def pareto_front(rows: Sequence[Row],
+                 keys: Tuple[str, str] = ("peak_hp", "avg_mpg")) -> List[Row]:
+    """Rows not dominated on both `keys` (higher is better), by first key."""
+    a, b = keys
+    front: List[Row] = []
+    best_b = -math.inf
+    for row in sorted(rows, key=lambda r: (-r[a], -r[b])):
+        if row[b] > best_b:
+            front.append(row)
+            best_b = row[b]
+    return front
+
+
+@dataclass
+class OptimizeResult:
+    best:        Row | None              # highest clean peak_hp (None: none clean)
+    front:       List[Row]
+    history:     List[float] = field(default_factory=list)  # best hp / gen
+    evaluations: int = 0                 # pulls actually run
+    cache_hits:  int = 0
+    pruned:      int = 0                 # pulls cut short by knock
+
+
+class TuneOptimizer:
+    def __init__(self, engine: str, pull: PullSpec = OPT_PULL,
+                 max_knock: str = "LOW",
+                 bounds: Dict[str, Tuple[float, float]] | None = None,
+                 resolution: Dict[str, float] | None = None,
+                 workers: int | None = 0, chunk_size: int = 256) -> None:
+        self.engine     = engine
+        self.pull       = replace(pull, max_knock=max_knock)
+        self.bounds     = {**BOUNDS, **(bounds or {})}
+        self.resolution = {**RESOLUTION, **(resolution or {})}
+        self.workers    = workers
+        self.chunk_size = chunk_size
+        self.cache: Dict[Tuple[float, ...], Row] = {}
+        self.evaluations = self.cache_hits = self.pruned = 0
+
+    # ───────────────── evaluation ──
+    def _snap(self, point: Point) -> Tuple[float, ...]:
+        key = []
+        for name in TUNABLES:
+            lo, hi = self.bounds[name]
+            step   = self.resolution[name]
+            v = min(max(point[name], lo), hi)
+            key.append(round(round(v / step) * step, 6))
+        return tuple(key)
+
+    def evaluate(self, points: Sequence[Point]) -> List[Row]:
+        """Rows for `points` (snapped to the grid); runs only cache misses."""
+        keys = [self._snap(p) for p in points]
+        todo = list(dict.fromkeys(k for k in keys if k not in self.cache))
+        self.cache_hits += len(keys) - len(todo)
+
+        if todo:
+            snapped = [dict(zip(TUNABLES, k)) for k in todo]
+            for row in iter_sweep(self.engine, snapped, self.pull,
+                                  self.workers, self.chunk_size):
+                row.pop("index")
+                self.cache[self._snap(row)] = row
+                self.pruned += row["pruned"]
+            self.evaluations += len(todo)
+        return [self.cache[k] for k in keys]
+
+    # ───────────────── search ──
+    def run(self, population: int = 48, generations: int = 12,
+            elite_frac: float = 0.2, smoothing: float = 0.7,
+            seed: int | None = None) -> OptimizeResult:
+        rng  = np.random.default_rng(seed)
+        lo   = np.array([self.bounds[n][0] for n in TUNABLES])
+        hi   = np.array([self.bounds[n][1] for n in TUNABLES])
+        res  = np.array([self.resolution[n] for n in TUNABLES])
+        mean = (lo + hi) / 2
+        std  = (hi - lo) / 4
+        n_elite = max(2, int(population * elite_frac))
+        history: List[float] = []
+
+        for _ in range(generations):
+            samples = np.clip(rng.normal(mean, std, (population, len(TUNABLES))),
+                              lo, hi)
+            rows = self.evaluate([dict(zip(TUNABLES, s)) for s in samples])
+
+            # clean pulls by hp first, then knocking ones by how long they lasted
+            ranked = sorted(rows, key=lambda r: (r["pruned"],
+                                                 -r["peak_hp"] if not r["pruned"]
+                                                 else -r["pruned_at"]))
+            clean = [r["peak_hp"] for r in rows if not r["pruned"]]
+            history.append(max(clean) if clean else math.nan)
+
+            elite = np.array([[r[n] for n in TUNABLES] for r in ranked[:n_elite]])
+            mean  = smoothing * elite.mean(axis=0) + (1 - smoothing) * mean
+            std   = np.maximum(smoothing * elite.std(axis=0)
+                               + (1 - smoothing) * std, res)
+            if np.all(std <= 2 * res):
+                break
+
+        front = self.front()
+        return OptimizeResult(best=front[0] if front else None, front=front,
+                              history=history, evaluations=self.evaluations,
+                              cache_hits=self.cache_hits, pruned=self.pruned)
+
+    def front(self) -> List[Row]:
+        """Pareto front (peak hp vs avg mpg) over every clean evaluation."""
+        return pareto_front([r for r in self.cache.values() if not r["pruned"]])
+
+
+def optimize(engine: str, **kwargs) -> OptimizeResult:
+    """One-shot `TuneOptimizer(engine, ...).run(...)`."""
+    run_keys = ("population", "generations", "elite_frac", "smoothing", "seed")
+    run_args = {k: kwargs.pop(k) for k in run_keys if k in kwargs}
+    return TuneOptimizer(engine, **kwargs).run(**run_args)
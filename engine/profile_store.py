@@ -0,0 +1,248 @@
+"""
+engine.profile_store  –  named tuning profiles with non-blocking file I/O.
+
+Profiles are plain JSON files under `PRESET_FOLDER` (one `<key>.json` per
+profile, key = slugified name).  Every disk operation runs on a single
+`profile-io` worker thread and hands back a `concurrent.futures.Future`,
+so the Tk thread never waits on a slow home directory; one worker also
+keeps saves and loads of the same profile in submission order.
+
+Writes go through `write_json_atomic` (temp file + rename), so a crash
+mid-save leaves the previous version intact.  `.profile_index.json` keeps
+each profile's display name, mtime/size stamp and top-level scalar values,
+so `list()` only has to `scandir` the folder – a profile is re-read only
+when its stamp changed.  Recently used profiles stay in an in-memory LRU
+keyed by the same stamp; a profile enters it once its save has been
+written, and a `load()` is answered from memory only while the file's
+stamp still matches (one `stat`, on the worker thread), so edits made
+outside the store are picked up and a failed save is never served.
+
+The single `custom_profile.json` of earlier versions (assets/profiles/) is
+imported once, as "Custom Profile", the first time the default store opens
+its index; the old file is left in place.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+import copy
+import json
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Any, Dict, List, Tuple
+
+from engine.config_loader import PRESET_FOLDER, write_json_atomic
+
+Profile = Dict[str, Any]
+
+INDEX_NAME = ".profile_index.json"
+_INDEX_VERSION = 1
+LEGACY_PROFILE = PRESET_FOLDER.parent / "profiles" / "custom_profile.json"
+LEGACY_NAME    = "Custom Profile"
+
+
+def profile_key(name: str) -> str:
+    key = re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+    if not key:
+        raise ValueError(f"Invalid profile name '{name}'.")
+    return key
+
+
+class ProfileStore:
+    def __init__(self, root: Path | None = None, cache_size: int = 16,
+                 legacy: Path | None = None) -> None:
+        self.root       = root or PRESET_FOLDER
+        # pre-store single profile to import (default store only)
+        self.legacy     = legacy or (LEGACY_PROFILE if root is None else None)
+        self._legacy_done = False
+        self.index_path = self.root / INDEX_NAME
+        self.cache_size = cache_size
+        self.hits = self.misses = self.reads = 0
+        # key -> (stamp, profile)
+        self._cache: "OrderedDict[str, Tuple[List[int], Profile]]" = OrderedDict()
+        self._entries: Dict[str, Dict[str, Any]] | None = None  # io thread only
+        self._lock = threading.Lock()
+        self._io = ThreadPoolExecutor(max_workers=1,
+                                      thread_name_prefix="profile-io")
+
+    # ───────────────── public API (all non-blocking) ──
+    def save(self, name: str, profile: Profile) -> "Future[str]":
+        """Write `profile` as `name`; the future resolves to its key."""
+        key  = profile_key(name)
+        data = copy.deepcopy(profile)
+        return self._io.submit(self._save, key, name, data)
+
+    def load(self, name: str) -> "Future[Profile]":
+        """The profile called `name` (a private copy)."""
+        return self._io.submit(self._load, profile_key(name))
+
+    def delete(self, name: str) -> "Future[bool]":
+        key = profile_key(name)
+        with self._lock:
+            self._cache.pop(key, None)
+        return self._io.submit(self._delete, key)
+
+    def list(self) -> "Future[List[Dict[str, Any]]]":
+        """`[{"key", "name", **scalar fields}]` for every profile, by name."""
+        return self._io.submit(self._list)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses,
+                    "reads": self.reads, "cached": len(self._cache)}
+
+    def close(self) -> None:
+        """Finish queued writes and stop the worker."""
+        self._io.shutdown(wait=True)
+
+    # ───────────────── cache ──
+    def _remember(self, key: str, stamp: List[int], data: Profile) -> None:
+        with self._lock:
+            self._cache[key] = (stamp, data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # ───────────────── io thread ──
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _save(self, key: str, name: str, data: Profile) -> str:
+        path = self._path(key)
+        write_json_atomic(data, path)
+        st = path.stat()
+        self._remember(key, self._stamp(st), data)  # only what is on disk
+        entries = self._index()
+        entries[key] = self._entry(name, st, data)
+        self._write_index()
+        return key
+
+    def _load(self, key: str) -> Profile:
+        path  = self._path(key)
+        st    = path.stat()
+        stamp = self._stamp(st)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(cached[1])
+            self.misses += 1
+        data    = self._read(path)
+        entries = self._index()
+        entry   = entries.get(key)
+        if entry is None or entry["stamp"] != stamp:
+            entries[key] = self._entry(entry["name"] if entry else key,
+                                       st, data)
+            self._write_index()
+        self._remember(key, stamp, data)
+        return copy.deepcopy(data)
+
+    def _delete(self, key: str) -> bool:
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            return False
+        if self._index().pop(key, None) is not None:
+            self._write_index()
+        return True
+
+    def _list(self) -> List[Dict[str, Any]]:
+        entries = self._index()
+        seen, dirty = set(), False
+        with os.scandir(self.root) as it:
+            for d in it:
+                if d.name.startswith(".") or not d.name.endswith(".json") \
+                        or not d.is_file():
+                    continue
+                key   = d.name[:-5]
+                st    = d.stat()
+                entry = entries.get(key)
+                seen.add(key)
+                if entry is not None and entry["stamp"] == self._stamp(st):
+                    continue
+                # new or edited outside the store – read it once
+                try:
+                    data = self._read(Path(d.path))
+                except (OSError, ValueError):
+                    print(f"[ProfileStore] Warning: skipping unreadable "
+                          f"profile '{d.name}'.")
+                    seen.discard(key)
+                    continue
+                with self._lock:
+                    self._cache.pop(key, None)
+                entries[key] = self._entry(entry["name"] if entry else key,
+                                           st, data)
+                dirty = True
+        for gone in set(entries) - seen:
+            del entries[gone]
+            dirty = True
+        if dirty:
+            self._write_index()
+        return sorted(({**e["summary"], "key": k, "name": e["name"]}
+                       for k, e in entries.items()),
+                      key=lambda row: row["name"].lower())
+
+    def _read(self, path: Path) -> Profile:
+        with self._lock:
+            self.reads += 1
+        with path.open() as fp:
+            return json.load(fp)
+
+    # ───────────────── index ──
+    @staticmethod
+    def _stamp(st: os.stat_result) -> List[int]:
+        return [st.st_mtime_ns, st.st_size]
+
+    def _entry(self, name: str, st: os.stat_result,
+               data: Profile) -> Dict[str, Any]:
+        summary = {k: v for k, v in data.items()
+                   if isinstance(v, (str, int, float, bool))} \
+            if isinstance(data, dict) else {}
+        return {"name": name, "stamp": self._stamp(st), "summary": summary}
+
+    def _index(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                raw = json.loads(self.index_path.read_text())
+            except (OSError, ValueError):
+                raw = {}
+            if not isinstance(raw, dict):
+                raw = {}                    # valid JSON, but not our index
+            profiles = raw.get("profiles")
+            if raw.get("version") == _INDEX_VERSION and isinstance(profiles, dict):
+                self._entries = profiles
+                self._legacy_done = raw.get("legacy_imported", False)
+            if not self._legacy_done:
+                self._import_legacy()
+        return self._entries
+
+    def _import_legacy(self) -> None:
+        self._legacy_done = True
+        if self.legacy is None or not self.legacy.is_file():
+            return
+        key  = profile_key(LEGACY_NAME)
+        path = self._path(key)
+        if not path.exists():
+            try:
+                data = self._read(self.legacy)
+                write_json_atomic(data, path)
+            except (OSError, ValueError) as exc:
+                print(f"[ProfileStore] Warning: could not import "
+                      f"'{self.legacy}': {exc}")
+                return
+            self._entries[key] = self._entry(LEGACY_NAME, path.stat(), data)
+            print(f"[ProfileStore] Imported '{self.legacy}' as "
+                  f"'{LEGACY_NAME}'.")
+        self._write_index()
+
+    def _write_index(self) -> None:
+        try:
+            write_json_atomic({"version": _INDEX_VERSION,
+                               "legacy_imported": self._legacy_done,
+                               "profiles": self._entries},
+                              self.index_path, indent=None)
+        except OSError:
+            pass    # read-only install – the in-memory index still works
@@ -0,0 +1,262 @@
+"""
+engine.profiling  –  opt-in per-stage timing for the simulator and UI.
+
+Nothing is wrapped until `enable_profiling(sim)` is called: it swaps the
+instance's class for a cached subclass whose `step`, `_update_rpm`,
+`_update_boost`, `_calc_power`, `_calc_knock` and `_calc_mpg` time each call
+with `perf_counter_ns`, and puts a timing proxy in front of the torque
+model.  `disable_profiling(sim)` swaps the original class back, so a
+simulator that is not being profiled runs the plain, unwrapped methods.
+
+UI (or any other) callables are wrapped per instance with
+`instrument_methods()`.  All timings land in a `Profiler` (the shared
+`PROFILER` by default) which offers `snapshot()`, a one-line summary and a
+rate-limited `maybe_log()`.
+
+`StartupReport` covers application start-up: named milestones (e.g. time
+to first frame) plus a `-X importtime`-style per-module import breakdown.
+"""
+
+from functools import wraps
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+SIM_STAGES: Tuple[str, ...] = ("step", "_update_rpm", "_update_boost",
+                               "_calc_power", "_calc_knock", "_calc_mpg")
+TORQUE_STAGE = "torque_at"
+
+
+class StageStats:
+    __slots__ = ("calls", "total_ns", "last_ns", "max_ns")
+
+    def __init__(self) -> None:
+        self.calls = self.total_ns = self.last_ns = self.max_ns = 0
+
+    def add(self, ns: int):
+        self.calls    += 1
+        self.total_ns += ns
+        self.last_ns   = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.stages: Dict[str, StageStats] = {}
+        self._last_log = time.perf_counter()
+
+    def stage(self, name: str) -> StageStats:
+        stats = self.stages.get(name)
+        if stats is None:
+            stats = self.stages[name] = StageStats()
+        return stats
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        """Wrap `fn` so every call is added to stage `name`."""
+        stats, clock = self.stage(name), time.perf_counter_ns
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = clock()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                stats.add(clock() - t0)
+        return wrapper
+
+    def reset(self):
+        for stats in self.stages.values():
+            stats.__init__()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {name: {"calls":    s.calls,
+                       "total_ms": s.total_ns / 1e6,
+                       "mean_us":  s.total_ns / s.calls / 1e3 if s.calls else 0.0,
+                       "last_us":  s.last_ns / 1e3,
+                       "max_us":   s.max_ns / 1e3}
+                for name, s in self.stages.items()}
+
+    def lines(self) -> List[str]:
+        """Human-readable rows, slowest cumulative stage first."""
+        snap = sorted(self.snapshot().items(),
+                      key=lambda kv: kv[1]["total_ms"], reverse=True)
+        return [f"{name:22s} {s['calls']:>9.0f}× {s['mean_us']:8.2f} µs "
+                f"(max {s['max_us']:8.1f}) Σ {s['total_ms']:9.1f} ms"
+                for name, s in snap if s["calls"]]
+
+    def summary(self) -> str:
+        snap = self.snapshot()
+        return "  ".join(f"{name}={s['mean_us']:.2f}µs×{s['calls']:.0f}"
+                         for name, s in snap.items() if s["calls"])
+
+    def maybe_log(self, interval_s: float = 5.0,
+                  log: Callable[[str], Any] = print) -> bool:
+        """Emit `summary()` at most every `interval_s` seconds."""
+        now = time.perf_counter()
+        if now - self._last_log < interval_s:
+            return False
+        self._last_log = now
+        log(f"[Profiler] {self.summary()}")
+        return True
+
+
+PROFILER = Profiler()
+
+
+# ───────────────────────────────────────── simulator ──
+class _TimedTorqueModel:
+    """Proxy timing `torque_at`; everything else goes to the real model."""
+
+    def __init__(self, model, profiler: Profiler) -> None:
+        self.model     = model
+        self.torque_at = profiler.timed(TORQUE_STAGE, model.torque_at)
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+
+_CLASSES: Dict[Tuple[type, int], type] = {}
+
+
+def _instrumented_class(base: type, profiler: Profiler) -> type:
+    key = (base, id(profiler))
+    cls = _CLASSES.get(key)
+    if cls is not None:
+        return cls
+
+    def load_engine(self, key):
+        base.load_engine(self, key)
+        self._torque_model = _TimedTorqueModel(self._torque_model, profiler)
+
+    # plain functions in the class body bind like the originals
+    ns: Dict[str, Any] = {name: profiler.timed(name, getattr(base, name))
+                          for name in SIM_STAGES}
+    ns.update(__slots__=(), load_engine=load_engine, _profiled_base=base)
+    cls = _CLASSES[key] = type(f"Profiled{base.__name__}", (base,), ns)
+    return cls
+
+
+def enable_profiling(sim, profiler: Profiler = PROFILER):
+    """Start timing `sim`'s per-tick stages into `profiler`."""
+    if hasattr(type(sim), "_profiled_base"):
+        return
+    sim.__class__ = _instrumented_class(type(sim), profiler)
+    sim._torque_model = _TimedTorqueModel(sim._torque_model, profiler)
+
+
+def disable_profiling(sim):
+    """Restore the plain class and torque model (zero overhead again)."""
+    base = getattr(type(sim), "_profiled_base", None)
+    if base is None:
+        return
+    sim.__class__ = base
+    if isinstance(sim._torque_model, _TimedTorqueModel):
+        sim._torque_model = sim._torque_model.model
+
+
+# ───────────────────────────────────────── arbitrary objects ──
+def instrument_methods(obj, names: Iterable[str],
+                       profiler: Profiler = PROFILER,
+                       prefix: str = "") -> Callable[[], None]:
+    """
+    Time the bound methods `names` of `obj` (instance-level wrap, e.g. UI
+    callbacks).  Returns a function that removes the wrappers again.
+    """
+    wrapped = []
+    for name in names:
+        setattr(obj, name, profiler.timed(prefix + name, getattr(obj, name)))
+        wrapped.append(name)
+
+    def restore():
+        for name in wrapped:
+            obj.__dict__.pop(name, None)
+    return restore
+
+
+# ───────────────────────────────────────── start-up ──
+class _TimedLoader:
+    """Loader proxy timing `exec_module`; everything else is delegated."""
+
+    def __init__(self, loader, name: str, timer: "ImportTimer") -> None:
+        self._loader, self._name, self._timer = loader, name, timer
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        timer = self._timer
+        timer._stack.append(0)
+        t0 = time.perf_counter_ns()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            total = time.perf_counter_ns() - t0
+            nested = timer._stack.pop()
+            if timer._stack:
+                timer._stack[-1] += total
+            timer.records.append((self._name, total - nested, total,
+                                  len(timer._stack)))
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+
+class ImportTimer:
+    """
+    Meta-path hook recording (module, self_ns, cumulative_ns, depth) for
+    every module executed while installed – the data `-X importtime` prints.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[Tuple[str, int, int, int]] = []
+        self._stack: List[int] = []
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader, name, self)
+                return spec
+        return None
+
+
+class StartupReport:
+    """Milestones since construction plus the slowest imports."""
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self.imports = ImportTimer()
+        self.imports.install()
+
+    def mark(self, label: str) -> float:
+        """Record `label` now; returns seconds since start."""
+        elapsed = time.perf_counter() - self.t0
+        self.marks.append((label, elapsed))
+        return elapsed
+
+    def lines(self, top: int = 15) -> List[str]:
+        out = [f"{label:28s} {t * 1e3:9.1f} ms" for label, t in self.marks]
+        records = sorted(self.imports.records, key=lambda r: r[2], reverse=True)
+        if records:
+            out.append("import time:  self [us] | cumulative | module")
+            out += [f"{s // 1000:>23} | {c // 1000:>10} | {'  ' * d}{name}"
+                    for name, s, c, d in records[:top]]
+        return out
+
+    def emit(self, top: int = 15, log: Callable[[str], Any] = print):
+        self.imports.uninstall()
+        for line in self.lines(top):
+            log(f"[Startup] {line}")
@@ -0,0 +1,108 @@
+"""
+engine.realtime  –  fixed-rate simulation thread + snapshot double buffer.
+
+The physics runs on its own thread at a fixed tick rate (1 kHz by default)
+and publishes an immutable snapshot after every tick.  Readers (the Tk UI)
+poll `SnapshotBuffer.latest()` at display rate; they never block the tick
+loop and never see a half-written state.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Generic, List, TypeVar
+
+T = TypeVar("T")
+
+
+class SnapshotBuffer(Generic[T]):
+    """
+    Single-writer double buffer.  The writer fills the back slot, then flips
+    the front index; both are single reference stores, so readers need no
+    lock and always get the last complete snapshot.
+    """
+
+    def __init__(self, initial: T | None = None) -> None:
+        self._slots: List[T | None] = [initial, initial]
+        self._front = 0
+
+    def publish(self, snapshot: T):
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        self._front = back
+
+    def latest(self) -> T | None:
+        return self._slots[self._front]
+
+
+class SimulationThread:
+    """
+    Calls `tick(dt)` at `rate_hz` on a daemon thread and publishes each
+    return value into `buffer`.  If the loop falls more than `max_lag`
+    ticks behind schedule it re-syncs instead of bursting to catch up.
+    An exception from `tick` ends the loop and is kept in `error` for the
+    reader to report (it is cleared by the next `start()`).  A thread that
+    outlives `stop()`'s timeout is kept; `start()` waits for it to exit and
+    raises RuntimeError rather than run two loops at once.
+    """
+
+    def __init__(self, tick: Callable[[float], Any], rate_hz: float = 1000.0,
+                 buffer: SnapshotBuffer | None = None,
+                 max_lag: int = 50) -> None:
+        self.tick    = tick
+        self.dt      = 1.0 / rate_hz
+        self.buffer  = buffer or SnapshotBuffer()
+        self.max_lag = max_lag
+        self.ticks   = 0
+        self.overruns = 0
+        self.error: Exception | None = None
+        self._stop   = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, timeout: float | None = 1.0):
+        if self.running and not self._stop.is_set():
+            return
+        if self._thread is not None:
+            # a stop() that timed out: the old loop is still inside tick()
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                raise RuntimeError("SimulationThread: previous tick loop "
+                                   "has not exited yet")
+        self._stop.clear()
+        self.error   = None
+        self._thread = threading.Thread(target=self._run, name="sim-tick",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 1.0) -> bool:
+        """Ask the loop to end; True once it has (False if `timeout` hit)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+
+    def _run(self):
+        dt, publish = self.dt, self.buffer.publish
+        next_t = time.perf_counter()
+        while not self._stop.is_set():
+            try:
+                publish(self.tick(dt))
+            except Exception as exc:
+                self.error = exc
+                self._stop.set()
+                return
+            self.ticks += 1
+
+            next_t += dt
+            wait = next_t - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            elif -wait > self.max_lag * dt:
+                self.overruns += 1
+                next_t = time.perf_counter()
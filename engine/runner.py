@@ -0,0 +1,206 @@
+"""
+engine.runner  –  headless fixed-step driver for `EngineSimulator`.
+
+Replays a scripted input trace (throttle / gear / timing, optionally boost
+and AFR) through the simulator at a fixed `dt`, as fast as the CPU allows,
+and writes every tick into preallocated arrays.  No UI imports, so it is
+safe on display-less CI boxes and servers.
+
+Trace CSV layout (header required, boost_cmd / afr optional):
+
+    time,throttle,gear,timing,boost_cmd,afr
+    0.0,100,3,12,8,13.2
+    4.5,0,4,12,8,13.2
+
+Inputs are sample-and-hold: a row stays in effect until the next `time`.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+import csv
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from engine.simulator import KNOCK_LEVELS, EngineSimulator
+from engine.telemetry import TelemetryRecorder
+
+REQUIRED_COLUMNS: Tuple[str, ...] = ("time", "throttle", "gear", "timing")
+
+
+# ───────────────────────────────────────── input trace ──
+@dataclass
+class InputTrace:
+    time:      np.ndarray                 # s, break-points (ascending)
+    throttle:  np.ndarray                 # %
+    gear:      Tuple[str, ...]            # gear names, see Gearbox.order
+    timing:    np.ndarray                 # °BTDC
+    boost_cmd: np.ndarray | None = None   # PSI, None → leave simulator value
+    afr:       np.ndarray | None = None   # None → leave simulator value
+
+    @property
+    def duration(self) -> float:
+        return float(self.time[-1]) if len(self.time) else 0.0
+
+    @classmethod
+    def from_csv(cls, path: Path) -> "InputTrace":
+        with Path(path).open() as fp:
+            reader = csv.DictReader(fp)
+            rows   = list(reader)
+            header = [name.strip() for name in reader.fieldnames or ()]
+        missing = [c for c in REQUIRED_COLUMNS if c not in header]
+        if missing:
+            raise ValueError(f"Trace '{path}' is missing column(s) "
+                             f"{', '.join(missing)}.")
+        if not rows:
+            raise ValueError(f"Trace '{path}' has no rows.")
+        rows = [{k.strip(): (v or "").strip() for k, v in r.items() if k}
+                for r in rows]
+
+        def cell(i: int, name: str) -> str:
+            value = rows[i][name]
+            if not value:
+                # header is line 1, so row i is on line i + 2
+                raise ValueError(f"Trace '{path}' line {i + 2}: "
+                                 f"'{name}' is blank.")
+            return value
+
+        def column(name: str) -> np.ndarray | None:
+            if name not in REQUIRED_COLUMNS and (name not in header
+                                                 or not rows[0][name]):
+                return None             # optional column left out
+            out = np.empty(len(rows))
+            for i in range(len(rows)):
+                raw = cell(i, name)
+                try:
+                    out[i] = float(raw)
+                except ValueError:
+                    raise ValueError(f"Trace '{path}' line {i + 2}: '{name}' "
+                                     f"is not a number ({raw!r}).") from None
+            return out
+
+        time = column("time")
+        back = np.flatnonzero(np.diff(time) <= 0)
+        if back.size:
+            i = int(back[0]) + 1
+            raise ValueError(f"Trace '{path}' line {i + 2}: 'time' must be "
+                             f"strictly increasing ({time[i]:g} after "
+                             f"{time[i - 1]:g}).")
+        return cls(time=time, throttle=column("throttle"),
+                   gear=tuple(cell(i, "gear") for i in range(len(rows))),
+                   timing=column("timing"), boost_cmd=column("boost_cmd"),
+                   afr=column("afr"))
+
+    def sample(self, n: int, dt: float) -> np.ndarray:
+        """Row index in effect at each of `n` ticks (zero-order hold)."""
+        ticks = np.arange(n) * dt
+        idx   = np.searchsorted(self.time, ticks, side="right") - 1
+        return np.clip(idx, 0, len(self.time) - 1)
+
+
+def wot_pull(duration: float = 8.0, gear: str = "3", timing: float = 10.0,
+             boost_cmd: float | None = None,
+             afr: float | None = None) -> InputTrace:
+    """Wide-open-throttle pull held in one gear."""
+    def const(v):
+        return None if v is None else np.array([v, v], dtype=float)
+
+    return InputTrace(time=np.array([0.0, duration]),
+                      throttle=np.array([100.0, 100.0]),
+                      gear=(gear, gear), timing=const(timing),
+                      boost_cmd=const(boost_cmd), afr=const(afr))
+
+
+# ───────────────────────────────────────── results ──
+@dataclass
+class RunResult:
+    time:  np.ndarray
+    rpm:   np.ndarray
+    hp:    np.ndarray
+    knock: np.ndarray     # int8 index into KNOCK_LEVELS
+    mpg:   np.ndarray
+    boost: np.ndarray
+    gear:  np.ndarray     # int8 index into gear_order
+    gear_order: Tuple[str, ...]
+
+    def summary(self) -> Dict[str, float]:
+        counts = np.bincount(self.knock, minlength=len(KNOCK_LEVELS))
+        return {
+            "ticks":    float(len(self.time)),
+            "peak_hp":  float(self.hp.max()) if len(self.hp) else 0.0,
+            "peak_rpm": float(self.rpm.max()) if len(self.rpm) else 0.0,
+            "avg_mpg":  float(self.mpg.mean()) if len(self.mpg) else 0.0,
+            **{f"knock_{lvl.lower()}": float(c)
+               for lvl, c in zip(KNOCK_LEVELS, counts)},
+        }
+
+    def to_csv(self, dest: Path) -> None:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        with dest.open("w", newline="") as fp:
+            w = csv.writer(fp)
+            w.writerow(["time", "rpm", "hp", "knock", "mpg", "boost", "gear"])
+            for i in range(len(self.time)):
+                w.writerow([f"{self.time[i]:.6g}", f"{self.rpm[i]:.3f}",
+                            f"{self.hp[i]:.3f}", KNOCK_LEVELS[self.knock[i]],
+                            f"{self.mpg[i]:.3f}", f"{self.boost[i]:.3f}",
+                            self.gear_order[self.gear[i]]])
+
+
+# ───────────────────────────────────────── runner ──
+def run_trace(sim: EngineSimulator, trace: InputTrace, dt: float = 0.01,
+              start_rpm: float | None = None,
+              recorder: TelemetryRecorder | None = None,
+              t_offset: float = 0.0) -> RunResult:
+    """
+    Drive `sim` through `trace` at a fixed `dt` and return every tick.
+    The engine is switched on and starts at `start_rpm` (default idle).
+    Gear changes go through the simulator's shift logic (rpm glide).
+    Every tick is also streamed to `recorder` when one is given, stamped
+    `t_offset` + its time (so repeated runs can share one log).
+    """
+    n     = int(round(trace.duration / dt))
+    order = tuple(sim._gearbox.order)
+    knock_code = {lvl: i for i, lvl in enumerate(KNOCK_LEVELS)}
+
+    out = RunResult(time=np.arange(1, n + 1) * dt, rpm=np.empty(n),
+                    hp=np.empty(n), knock=np.empty(n, dtype=np.int8),
+                    mpg=np.empty(n), boost=np.empty(n),
+                    gear=np.empty(n, dtype=np.int8), gear_order=order)
+
+    sim.engine_on = True
+    sim._rpm      = sim.idle_rpm if start_rpm is None else start_rpm
+    sim.gear      = trace.gear[0]
+
+    rows = trace.sample(n, dt)
+    row  = -1
+    for i in range(n):
+        if rows[i] != row:
+            row = rows[i]
+            _apply_row(sim, trace, row, order)
+
+        hp, knock, mpg, rpm = sim.step(dt)
+        out.hp[i]    = hp
+        out.knock[i] = knock_code[knock]
+        out.mpg[i]   = mpg
+        out.rpm[i]   = rpm
+        out.boost[i] = sim._boost
+        out.gear[i]  = order.index(sim.gear)
+        if recorder is not None:
+            recorder.record(t_offset + out.time[i], sim, hp, knock, mpg, rpm)
+    return out
+
+
+def _apply_row(sim: EngineSimulator, trace: InputTrace, row: int,
+               order: Sequence[str]):
+    sim.throttle = float(trace.throttle[row])
+    sim.timing   = float(trace.timing[row])
+    if trace.boost_cmd is not None:
+        sim.boost_cmd = float(trace.boost_cmd[row])
+    if trace.afr is not None:
+        sim.afr = float(trace.afr[row])
+
+    gear = trace.gear[row]
+    if gear != sim.gear and gear in order and sim.gear in order:
+        sim._shift(order.index(gear) - order.index(sim.gear))
+    elif gear not in order:
+        sim.gear = "N"
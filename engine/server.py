@@ -0,0 +1,431 @@
+"""
+engine.server  –  local simulation service with request coalescing.
+
+A small asyncio HTTP/1.1 server (stdlib only; TCP or a Unix socket) that
+keeps every engine from `scan_engines()` warm and answers:
+
+    GET  /engines   {engine: {"idle": …, "redline": …}}
+    POST /point     {"engine", "rpm", "boost", "timing", "afr", "throttle"}
+                    → {"hp", "knock", "mpg"}   (settled boost, no dynamics)
+    POST /pull      {"engine", "timing", "boost_cmd", "afr",
+                     + optional PullSpec fields: "duration", "dt",
+                       "start_gear", "shift_rpm", "throttle", "max_knock"}
+                    → `engine.sweep.evaluate_points` row
+    GET  /metrics   request counts, batch sizes, latency percentiles, rate
+
+Concurrent requests of the same kind (same engine, and for pulls the same
+PullSpec) arriving within `window` seconds are answered from one vectorised
+batch.  Point batches are plain array maths on the event loop; pull batches
+run on a single worker thread, or on a process pool once a batch reaches
+`offload_at` pulls.
+
+    python -m engine.server --port 8765
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import replace
+import json
+import math
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+import numpy as np
+
+from engine.batch import calc_knock, calc_mpg, calc_power
+from engine.curve_cache import curve_for
+from engine.engine_registry import scan_engines
+from engine.simulator import KNOCK_LEVELS, Gearbox
+from engine.sweep import TUNABLES, PullSpec, _run_chunk
+
+POINT_FIELDS: Tuple[str, ...] = ("rpm", "boost", "timing", "afr", "throttle")
+GEARS:        Tuple[str, ...] = Gearbox().order      # what pull batches run
+MAX_BODY = 1 << 20
+
+
+class RequestError(ValueError):
+    """Bad request – reported to the client as HTTP 400."""
+
+
+# ───────────────────────────────────────── coalescing ──
+class _Coalescer:
+    """
+    Groups items by key; a group is flushed `window` s after its first item
+    (or as soon as it holds `max_batch` items) by `run(key, items)`, which
+    returns one result per item.
+    """
+
+    def __init__(self, run: Callable, window: float, max_batch: int) -> None:
+        self.run       = run
+        self.window    = window
+        self.max_batch = max_batch
+        self._pending: Dict[Hashable, List[Tuple[Any, asyncio.Future]]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: set = set()             # keep running flushes referenced
+
+    def submit(self, key: Hashable, item) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut  = loop.create_future()
+        group = self._pending.setdefault(key, [])
+        group.append((item, fut))
+        if len(group) >= self.max_batch:
+            self._flush(key)
+        elif key not in self._timers:
+            self._timers[key] = loop.call_later(self.window, self._flush, key)
+        return fut
+
+    def _flush(self, key: Hashable):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        group = self._pending.pop(key, [])
+        if group:
+            task = asyncio.ensure_future(self._resolve(key, group))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, key, group):
+        try:
+            results = await self.run(key, [item for item, _ in group])
+        except Exception as exc:
+            for _, fut in group:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        for (_, fut), result in zip(group, results):
+            if not fut.done():
+                fut.set_result(result)
+
+
+# ───────────────────────────────────────── metrics ──
+class ServerMetrics:
+    def __init__(self, keep: int = 10_000) -> None:
+        self.started   = time.perf_counter()
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.errors    = 0
+        self.batches: Dict[str, int]  = defaultdict(int)
+        self.batched: Dict[str, int]  = defaultdict(int)   # items in batches
+        self.offloaded = 0
+        self._latency: Dict[str, deque] = defaultdict(lambda: deque(maxlen=keep))
+
+    def request(self, route: str, seconds: float):
+        self.requests[route] += 1
+        self._latency[route].append(seconds)
+
+    def batch(self, kind: str, size: int):
+        self.batches[kind] += 1
+        self.batched[kind] += size
+
+    def snapshot(self) -> Dict[str, Any]:
+        uptime = time.perf_counter() - self.started
+        latency = {}
+        for route, samples in self._latency.items():
+            ms = np.asarray(samples) * 1e3
+            latency[route] = {"p50_ms": float(np.percentile(ms, 50)),
+                              "p95_ms": float(np.percentile(ms, 95)),
+                              "p99_ms": float(np.percentile(ms, 99)),
+                              "max_ms": float(ms.max())}
+        return {"uptime_s":    uptime,
+                "requests":    dict(self.requests),
+                "errors":      self.errors,
+                "req_per_s":   sum(self.requests.values()) / uptime if uptime else 0.0,
+                "batches":     dict(self.batches),
+                "mean_batch":  {k: self.batched[k] / n for k, n in self.batches.items()},
+                "offloaded":   self.offloaded,
+                "latency":     latency}
+
+
+# ───────────────────────────────────────── server ──
+class SimServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 unix_path: str | None = None, window: float = 0.005,
+                 max_batch: int = 4096, offload_at: int = 256,
+                 workers: int | None = None) -> None:
+        self.host, self.port, self.unix_path = host, port, unix_path
+        self.offload_at = offload_at
+        self.workers    = workers
+        self.metrics    = ServerMetrics()
+        self._engines   = scan_engines()
+        self._models    = {key: curve_for(meta)           # warm curves
+                           for key, meta in self._engines.items()}
+        self._points = _Coalescer(self._run_points, window, max_batch)
+        self._pulls  = _Coalescer(self._run_pulls, window, max_batch)
+        self._thread = ThreadPoolExecutor(1, thread_name_prefix="sim-pull")
+        self._pool: ProcessPoolExecutor | None = None
+        self._server: asyncio.AbstractServer | None = None
+
+    # ───────────────── lifecycle ──
+    async def start(self) -> "SimServer":
+        if self.unix_path:
+            self._server = await asyncio.start_unix_server(self._handle,
+                                                           self.unix_path)
+        else:
+            self._server = await asyncio.start_server(self._handle,
+                                                      self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._thread.shutdown(wait=False)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    # ───────────────── batch runners ──
+    async def _run_points(self, engine: str, items: List[Dict[str, float]]):
+        self.metrics.batch("point", len(items))
+        rpm, boost, timing, afr, thr = (np.array([p[f] for p in items])
+                                        for f in POINT_FIELDS)
+        torque = self._models[engine].torque_at_many(rpm)
+        hp    = calc_power(torque, rpm, boost, afr, timing, thr)
+        knock = calc_knock(timing, boost, afr)
+        mpg   = calc_mpg(afr, thr)
+        return [{"hp": float(h), "knock": KNOCK_LEVELS[k], "mpg": float(m)}
+                for h, k, m in zip(hp, knock, mpg)]
+
+    async def _run_pulls(self, key: Tuple[str, PullSpec],
+                         items: List[Dict[str, float]]):
+        engine, pull = key
+        self.metrics.batch("pull", len(items))
+        loop = asyncio.get_running_loop()
+        if len(items) >= self.offload_at:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(self.workers)
+            self.metrics.offloaded += 1
+            executor = self._pool
+        else:
+            executor = self._thread
+        _, _, rows = await loop.run_in_executor(executor, _run_chunk,
+                                                engine, 0, items, pull)
+        return rows
+
+    # ───────────────── routes ──
+    def _engine(self, body: Dict[str, Any]) -> str:
+        engine = body.get("engine", next(iter(self._engines), None))
+        if engine not in self._engines:
+            raise RequestError(f"Unknown engine '{engine}'.")
+        return engine
+
+    @staticmethod
+    def _number(name: str, value: Any) -> float:
+        # JSON numbers only: no bools, numeric strings, NaN or inf
+        if isinstance(value, bool) or not isinstance(value, (int, float)) \
+                or not math.isfinite(value):
+            raise RequestError(f"'{name}' must be a number.")
+        return float(value)
+
+    @classmethod
+    def _floats(cls, body: Dict[str, Any], names, defaults=None
+                ) -> Dict[str, float]:
+        return {name: cls._number(name, body.get(name, (defaults or {}).get(name)))
+                for name in names}
+
+    @classmethod
+    def _pull_spec(cls, body: Dict[str, Any]) -> PullSpec:
+        """A PullSpec from the optional body fields, type-checked up front."""
+        spec: Dict[str, Any] = {}
+        for name in ("duration", "dt", "shift_rpm", "throttle"):
+            value = body.get(name)
+            if value is None:
+                if name == "shift_rpm" and name in body:
+                    spec[name] = None
+                continue
+            spec[name] = cls._number(name, value)
+        pull = PullSpec(**spec)
+        if pull.duration <= 0 or pull.dt <= 0 or pull.dt > pull.duration:
+            raise RequestError("'dt' and 'duration' must satisfy "
+                               "0 < dt <= duration.")
+        if not 0 <= pull.throttle <= 100:
+            raise RequestError("'throttle' must be within 0-100 %.")
+        if pull.shift_rpm is not None and pull.shift_rpm <= 0:
+            raise RequestError("'shift_rpm' must be positive.")
+        gear = body.get("start_gear", pull.start_gear)
+        if isinstance(gear, bool) or not isinstance(gear, (str, int)) \
+                or str(gear) not in GEARS:
+            raise RequestError(f"'start_gear' must be one of {GEARS}.")
+        max_knock = body.get("max_knock")
+        if max_knock not in (None, *KNOCK_LEVELS):
+            raise RequestError(f"'max_knock' must be one of {KNOCK_LEVELS}.")
+        return replace(pull, start_gear=str(gear), max_knock=max_knock)
+
+    async def _route(self, method: str, path: str, body: Dict[str, Any]):
+        if path == "/engines" and method == "GET":
+            return {k: {"idle": m.get("idle"), "redline": m.get("redline")}
+                    for k, m in self._engines.items()}
+        if path == "/metrics" and method == "GET":
+            return self.metrics.snapshot()
+        if path == "/point" and method == "POST":
+            engine = self._engine(body)
+            return await self._points.submit(engine,
+                                             self._floats(body, POINT_FIELDS))
+        if path == "/pull" and method == "POST":
+            engine = self._engine(body)
+            point  = self._floats(body, TUNABLES,
+                                  {"timing": 10.0, "boost_cmd": 5.0, "afr": 13.5})
+            pull   = self._pull_spec(body)
+            return await self._pulls.submit((engine, pull), point)
+        if path in ("/engines", "/metrics", "/point", "/pull"):
+            return 405, {"error": f"{method} not allowed on {path}"}
+        return 404, {"error": f"No route {path}"}
+
+    # ───────────────── HTTP plumbing ──
+    async def _respond(self, method: str, path: str, raw: bytes
+                       ) -> Tuple[int, Any]:
+        try:
+            body = json.loads(raw) if raw else {}
+            if not isinstance(body, dict):
+                raise RequestError("Body must be a JSON object.")
+            payload = await self._route(method.upper(), path, body)
+            if isinstance(payload, tuple):
+                return payload
+            return 200, payload
+        except (RequestError, json.JSONDecodeError) as exc:
+            return 400, {"error": str(exc)}
+        except Exception as exc:              # keep serving
+            return 500, {"error": repr(exc)}
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter):
+        try:
+            while True:
+                head = await reader.readline()
+                if not head:
+                    break
+                t0 = time.perf_counter()
+                try:
+                    method, target, _ = head.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                path = target.split("?", 1)[0]
+                keep = headers.get("connection", "").lower() != "close"
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if not 0 <= length <= MAX_BODY:
+                    # the body is never buffered; the connection closes after
+                    # the reply (see _discard)
+                    status, payload = ((413, {"error": "Body too large."})
+                                       if length > MAX_BODY else
+                                       (400, {"error": "Bad Content-Length."}))
+                    keep = False
+                else:
+                    raw = await reader.readexactly(length) if length else b""
+                    status, payload = await self._respond(method, path, raw)
+                if status != 200:
+                    self.metrics.errors += 1
+
+                data = json.dumps(payload).encode()
+
+                writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                             f"Content-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if keep else 'close'}\r\n"
+                             f"\r\n".encode() + data)
+                await writer.drain()
+                self.metrics.request(path, time.perf_counter() - t0)
+                if not keep:
+                    if status in (400, 413):
+                        await self._discard(reader, writer)
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _discard(reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter, limit_s: float = 1.0):
+        """
+        Half-close and drop whatever the client is still sending, for at
+        most `limit_s` s – closing with unread input would reset the
+        connection and could lose the error reply on its way out.
+        """
+        if writer.can_write_eof():
+            writer.write_eof()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + limit_s
+        try:
+            while (left := deadline - loop.time()) > 0:
+                if not await asyncio.wait_for(reader.read(1 << 16), left):
+                    break
+        except asyncio.TimeoutError:
+            pass
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+
+
+# ───────────────────────────────────────── client ──
+async def fetch(method: str, path: str, payload: Dict[str, Any] | None = None,
+                host: str = "127.0.0.1", port: int = 8765,
+                unix_path: str | None = None) -> Tuple[int, Any]:
+    """One request on a fresh connection; returns (status, decoded JSON)."""
+    if unix_path:
+        reader, writer = await asyncio.open_unix_connection(unix_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    data = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+                 f"Content-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n"
+                 .encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    body = await reader.readexactly(length)
+    writer.close()
+    return status, json.loads(body)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Local engine simulation server.")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=8765)
+    p.add_argument("--unix", help="serve on this Unix socket instead of TCP")
+    p.add_argument("--window", type=float, default=0.005,
+                   help="coalescing window in s")
+    p.add_argument("--offload-at", type=int, default=256,
+                   help="pull batch size that goes to the process pool")
+    p.add_argument("--workers", type=int, default=None)
+    args = p.parse_args(argv)
+
+    server = SimServer(args.host, args.port, args.unix, args.window,
+                       offload_at=args.offload_at, workers=args.workers)
+    print(f"[SimServer] {len(server._engines)} engines warm, listening on "
+          f"{args.unix or f'{args.host}:{args.port}'}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,323 @@
+"""
+engine.session  –  record UI input sessions and replay them headlessly.
+
+`SessionRecorder` appends timestamped input events (boost slider, shift
+clicks, turbo map, gear ratios, drive start/stop) to a compact binary log:
+
+    b"ETSN" + version byte
+    u32 header length + JSON header   (engine, gear ratios, start values,
+                                       tick / frame rates of the recording)
+    records: <f8 t> <u1 kind> <f8 value>            17 bytes each
+
+String values (turbo map names, gear ratio sets as JSON) are interned: the
+first use writes a `label` record (value = id) followed by <u2 length> +
+UTF-8 bytes, later events carry just the id.  Records are buffered and flushed every
+`flush_every` events, so a session cut short by a crash or a kill still
+reads back up to its last flush.
+
+`replay()` feeds a session into an `EngineSimulator` the way `TunerWindow`
+does: the demo drive (`DriveCycleSimulator`) ticks on the UI's fixed step
+only while driving, shift clicks only move the dashboard gear while
+parked, and new gear ratios take effect at the next drive start.  Each event applies on the first tick at or after its timestamp,
+so a replay is deterministic.  It runs flat out or paced to wall-clock time and
+reports tick-time and frame-time percentiles:
+
+    python -m engine.session slow_session.etsn --realtime
+"""
+
+import argparse
+from dataclasses import dataclass, field
+import json
+from pathlib import Path
+import struct
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence
+
+import numpy as np
+
+from engine.drive_cycle import DriveCycleSimulator
+from engine.simulator import EngineSimulator
+
+MAGIC    = b"ETSN"
+_VERSION = 2
+_READS   = (1, 2)                    # v1 logs lack `gear_ratios` records
+KINDS: Sequence[str] = ("label", "boost", "shift", "turbo_map", "drive", "end",
+                        "gear_ratios")
+_CODE    = {kind: i for i, kind in enumerate(KINDS)}
+_RECORD  = struct.Struct("<dBd")
+_LEN     = struct.Struct("<H")
+_U32     = struct.Struct("<I")
+PERCENTILES = (50, 90, 99, 100)
+
+
+class Event(NamedTuple):
+    t:     float           # s since recording start
+    kind:  str
+    value: float | str | Dict[str, float]
+
+
+# ───────────────────────────────────────── recorder ──
+class SessionRecorder:
+    def __init__(self, dest: Path, header: Dict[str, Any] | None = None,
+                 flush_every: int = 64,
+                 clock: Callable[[], float] = time.perf_counter) -> None:
+        self.dest        = Path(dest)
+        self.flush_every = flush_every
+        self.count       = 0
+        self._clock      = clock
+        self._t0         = clock()
+        self._labels: Dict[str, int] = {}
+        self._buf        = bytearray()
+        self._pending    = 0
+
+        self.dest.parent.mkdir(parents=True, exist_ok=True)
+        meta = json.dumps({"version": _VERSION, **(header or {})}).encode()
+        self._fp = self.dest.open("wb")
+        self._fp.write(MAGIC + bytes([_VERSION]) + _U32.pack(len(meta)) + meta)
+        self._fp.flush()
+
+    # ───────────────── events ──
+    def record(self, kind: str, value: float | str = 0.0):
+        t = self._clock() - self._t0
+        if isinstance(value, str):
+            label = self._labels.get(value)
+            if label is None:
+                label = self._labels[value] = len(self._labels)
+                raw = value.encode()
+                self._buf += _RECORD.pack(t, _CODE["label"], label)
+                self._buf += _LEN.pack(len(raw)) + raw
+            value = label
+        self._buf += _RECORD.pack(t, _CODE[kind], float(value))
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def boost(self, psi: float):     self.record("boost", psi)
+    def shift(self, step: int):      self.record("shift", step)
+    def turbo_map(self, name: str):  self.record("turbo_map", name)
+    def drive(self, on: bool):       self.record("drive", 1.0 if on else 0.0)
+
+    def gear_ratios(self, ratios: Dict[Any, float]):
+        self.record("gear_ratios", json.dumps(
+            {str(g): float(r) for g, r in ratios.items()}, sort_keys=True))
+
+    # ───────────────── lifecycle ──
+    def flush(self):
+        if self._buf:
+            self._fp.write(self._buf)
+            self._fp.flush()
+            self._buf.clear()
+        self._pending = 0
+
+    def close(self):
+        if self._fp.closed:
+            return
+        self.record("end")
+        self.flush()
+        self._fp.close()
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ───────────────────────────────────────── reader ──
+@dataclass
+class Session:
+    header: Dict[str, Any]
+    events: List[Event]
+
+    @property
+    def duration(self) -> float:
+        return self.events[-1].t if self.events else 0.0
+
+    @classmethod
+    def load(cls, path: Path) -> "Session":
+        raw = Path(path).read_bytes()
+        if raw[:4] != MAGIC or len(raw) < 9:
+            raise ValueError(f"{path}: not a session log")
+        if raw[4] not in _READS:
+            raise ValueError(f"{path}: unsupported session version {raw[4]}")
+        (size,) = _U32.unpack_from(raw, 5)
+        pos     = 9 + size
+        header  = json.loads(raw[9:pos])
+
+        labels: Dict[int, str] = {}
+        events: List[Event] = []
+        end = len(raw)
+        # a trailing partial record (writer killed mid-flush) is dropped
+        while pos + _RECORD.size <= end:
+            t, code, value = _RECORD.unpack_from(raw, pos)
+            if code >= len(KINDS):
+                raise ValueError(f"{path}: unknown record kind {code} "
+                                 f"at byte {pos}")
+            pos += _RECORD.size
+            kind = KINDS[code]
+            if kind == "label":
+                if pos + _LEN.size > end:
+                    break
+                (n,) = _LEN.unpack_from(raw, pos)
+                if pos + _LEN.size + n > end:
+                    break
+                labels[int(value)] = raw[pos + _LEN.size:
+                                         pos + _LEN.size + n].decode()
+                pos += _LEN.size + n
+                continue
+            if kind == "turbo_map":
+                value = labels[int(value)]
+            elif kind == "gear_ratios":
+                value = json.loads(labels[int(value)])
+            events.append(Event(t, kind, value))
+        return cls(header, events)
+
+
+# ───────────────────────────────────────── replay ──
+@dataclass
+class ReplayReport:
+    events:     int
+    ticks:      int
+    frames:     int
+    sim_s:      float
+    wall_s:     float
+    tick_us:    Dict[str, float] = field(default_factory=dict)
+    frame_ms:   Dict[str, float] = field(default_factory=dict)
+    late_frames: int = 0                 # realtime: finished past deadline
+    final:      Dict[str, Any] = field(default_factory=dict)
+
+    def lines(self) -> List[str]:
+        def fmt(stats):
+            return "  ".join(f"{k} {v:8.3f}" for k, v in stats.items())
+        return [f"{self.events} events  {self.ticks} ticks  {self.frames} frames"
+                f"  {self.sim_s:.2f} s simulated in {self.wall_s:.3f} s",
+                f"tick  µs  {fmt(self.tick_us)}",
+                f"frame ms  {fmt(self.frame_ms)}",
+                f"late frames: {self.late_frames}"]
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    if not values.size:
+        return {}
+    return {("max" if p == 100 else f"p{p}"): float(v)
+            for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def replay(session: Session, sim: EngineSimulator | None = None,
+           dt: float | None = None, frame_dt: float | None = None,
+           realtime: bool = False, top_kmh: float | None = None
+           ) -> ReplayReport:
+    """
+    Re-run `session` on `sim` (a fresh `EngineSimulator` by default).
+    `dt` / `frame_dt` / `top_kmh` default to the values in the header.
+    """
+    head     = session.header
+    dt       = dt or head.get("dt", 0.001)
+    frame_dt = frame_dt or head.get("frame_dt", 1 / 60)
+    top_kmh  = top_kmh or head.get("top_kmh", 120.0)
+    sim      = sim or EngineSimulator()
+    if head.get("engine") in sim._engines:
+        sim.load_engine(head["engine"])
+    ratios = {str(g): float(r) for g, r in (head.get("gear_ratios") or {}).items()}
+    if ratios:
+        sim._gearbox.update(ratios)
+    sim.boost_cmd = head.get("boost", sim.boost_cmd)
+    turbo_map     = head.get("turbo_map")
+
+    events    = session.events
+    max_gear  = len(ratios) or 6
+    gear      = 1                      # TunerWindow.current_gear
+    n_ticks   = int(np.ceil(session.duration / dt))
+    per_frame = max(1, int(round(frame_dt / dt)))
+    n_frames  = -(-n_ticks // per_frame)
+    tick_ns   = np.zeros(n_ticks, dtype=np.int64)
+    frame_ns  = np.zeros(n_frames, dtype=np.int64)
+    ticked    = np.zeros(n_ticks, dtype=bool)
+    drawn     = np.zeros(n_frames, dtype=bool)
+    drive     = None
+    speed_kmh = 0.0
+    late      = 0
+    ei        = 0
+    clock     = time.perf_counter_ns
+
+    start = clock()
+    for f in range(n_frames):
+        if realtime:
+            wait = start + f * frame_dt * 1e9 - clock()
+            if wait > 0:
+                time.sleep(wait / 1e9)
+        frame_start = clock()
+        for k in range(f * per_frame, min((f + 1) * per_frame, n_ticks)):
+            t = k * dt
+            while ei < len(events) and events[ei].t <= t:
+                kind, value = events[ei].kind, events[ei].value
+                if kind == "boost":
+                    sim.boost_cmd = value
+                elif kind == "shift" and drive is None:
+                    # the UI's buttons only move its gear display, and are
+                    # disabled while driving
+                    gear = min(max(gear + (1 if value > 0 else -1), 1), max_gear)
+                elif kind == "turbo_map":
+                    turbo_map = value
+                elif kind == "gear_ratios":
+                    # the UI hands its ratios to the sim when a drive starts
+                    ratios   = value
+                    max_gear = len(ratios) or 6
+                    gear     = min(gear, max_gear)
+                elif kind == "drive" and value:
+                    if ratios:
+                        sim._gearbox.update(ratios)
+                    drive, speed_kmh = DriveCycleSimulator(sim), 0.0
+                elif kind == "drive":
+                    drive = None
+                ei += 1
+
+            if drive is None:
+                continue                 # parked: the UI runs no sim ticks
+            t0 = clock()
+            if drive.speed_kmh >= top_kmh:
+                drive.speed = 0.0
+            drive.step(dt, top_kmh + 5)
+            tick_ns[k] = clock() - t0
+            ticked[k]  = True
+            speed_kmh  = drive.speed_kmh
+            gear       = int(sim.gear) if sim.gear.isdigit() else 0
+        if not ticked[f * per_frame:(f + 1) * per_frame].any():
+            continue
+        done = clock()
+        frame_ns[f] = done - frame_start
+        drawn[f]    = True
+        if realtime and done - start > (f + 1) * frame_dt * 1e9:
+            late += 1
+    wall = (clock() - start) / 1e9
+
+    return ReplayReport(events=len(events), ticks=int(ticked.sum()),
+                        frames=int(drawn.sum()), sim_s=n_ticks * dt, wall_s=wall,
+                        tick_us=_percentiles(tick_ns[ticked] / 1e3),
+                        frame_ms=_percentiles(frame_ns[drawn] / 1e6),
+                        late_frames=late,
+                        final={"rpm": sim._rpm, "gear": gear,
+                               "boost_cmd": sim.boost_cmd,
+                               "turbo_map": turbo_map,
+                               "speed_kmh": speed_kmh})
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Replay a recorded UI session.")
+    p.add_argument("session", type=Path)
+    p.add_argument("--realtime", action="store_true",
+                   help="pace to wall-clock time (default: flat out)")
+    p.add_argument("--dt", type=float, help="tick in s (default: as recorded)")
+    p.add_argument("--repeat", type=int, default=1)
+    args = p.parse_args(argv)
+
+    session = Session.load(args.session)
+    for _ in range(args.repeat):
+        for line in replay(session, dt=args.dt, realtime=args.realtime).lines():
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
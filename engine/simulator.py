@@ -1,35 +1,67 @@
-from dataclasses import dataclass
+from array import array
 from pathlib import Path
 from typing import Dict, Tuple
 
-from engine.torque_model import TorqueModel
+import numpy as np
+
+from engine.curve_cache import curve_for, load_curve
 from engine.engine_registry import scan_engines
 
+# knock levels in severity order – batch / array code stores the index
+KNOCK_LEVELS: Tuple[str, ...] = ("LOW", "MED", "HIGH")
+
+# fixed layout of `EngineSimulator.snapshot()` / `restore()` state vectors
+STATE: Tuple[str, ...] = ("throttle", "timing", "boost_cmd", "afr", "gear",
+                          "engine_on", "rpm", "rpm_target", "boost")
+STATE_SIZE = len(STATE)
+
 
 # ───────────────────────────────────────── gearbox helper ──
-@dataclass
+DEFAULT_RATIOS: Dict[str, float] = {"N": 0.0,
+                                    "1": 3.8, "2": 2.3, "3": 1.52,
+                                    "4": 1.00, "5": 0.80, "6": 0.65}
+
+
 class Gearbox:
-    ratios: Dict[str, float] = None
-    order:  Tuple[str, ...]  = ("N", "1", "2", "3", "4", "5", "6")
+    """
+    Gear ratios compiled to `table`, indexed like `order`.  Gears are
+    addressed by index on the hot path; the string API (`ratio`,
+    `next_gear`, `ratios`) is kept for the UI and scripts.
+    """
+
+    __slots__ = ("order", "table", "_index")
 
-    def __post_init__(self):
-        if self.ratios is None:
-            self.ratios = {
-                "N": 0.0,
-                "1": 3.8, "2": 2.3, "3": 1.52,
-                "4": 1.00, "5": 0.80, "6": 0.65,
-            }
+    def __init__(self, ratios: Dict[str, float] | None = None,
+                 order: Tuple[str, ...] = ("N", "1", "2", "3", "4", "5", "6")
+                 ) -> None:
+        self.order  = tuple(order)
+        self._index = {g: i for i, g in enumerate(self.order)}
+        self.table  = array("d", [0.0] * len(self.order))
+        self.update(DEFAULT_RATIOS if ratios is None else ratios)
+
+    @property
+    def ratios(self) -> Dict[str, float]:
+        """Copy of the ratios by gear name (use `update()` to change them)."""
+        return dict(zip(self.order, self.table))
+
+    def update(self, ratios: Dict[str, float]):
+        for gear, ratio in ratios.items():
+            if gear in self._index:
+                self.table[self._index[gear]] = float(ratio)
+
+    def index(self, gear: str) -> int:
+        """Index of `gear` in `order`; unknown names map to 0 (neutral)."""
+        return self._index.get(gear, 0)
 
     def ratio(self, gear: str) -> float:
-        return self.ratios.get(gear, 0.0)
+        i = self._index.get(gear)
+        return 0.0 if i is None else self.table[i]
 
     def next_gear(self, cur: str, step: int) -> str:
-        try:
-            idx = self.order.index(cur)
-            idx = max(0, min(len(self.order) - 1, idx + step))
-            return self.order[idx]
-        except ValueError:
+        i = self._index.get(cur)
+        if i is None:
             return "N"
+        return self.order[max(0, min(len(self.order) - 1, i + step))]
 
 
 # ───────────────────────────────────────── simulator ──
@@ -38,9 +70,20 @@ class EngineSimulator:
     • Throttle has **no effect** in Neutral (N).
     • RPM drops realistically on up-shift (ratio math) & glides to idle on lift.
     • Red-line is enforced (set per-engine).
+
+    The mutable state is the nine floats of `STATE`; `snapshot()` /
+    `restore()` copy it to / from a preallocated buffer and `fork()` makes a
+    sibling simulator sharing engine data, for cheap what-if branching.
     """
 
-    def __init__(self) -> None:
+    __slots__ = ("throttle", "timing", "boost_cmd", "afr", "_gear_idx",
+                 "engine_on", "_rpm", "_rpm_target", "_boost", "_gearbox",
+                 "_engines", "engine_key", "redline", "idle_rpm",
+                 "_torque_model", "__weakref__")
+
+    def __init__(self, source: Path | None = None) -> None:
+        self._gearbox = Gearbox()
+
         # UI inputs -----------------------------------------------------
         self.throttle = 0.0
         self.timing   = 10.0
@@ -53,23 +96,63 @@ class EngineSimulator:
         self._rpm           = 0.0
         self._rpm_target    = 0.0
         self._boost         = 0.0
-        self._gearbox       = Gearbox()
 
         # engine data ---------------------------------------------------
-        self._engines = scan_engines()
+        # `source`: engine folder root or binary pack (default ENGINE_ROOT)
+        self._engines = scan_engines(source)
         self.load_engine(next(iter(self._engines), None))
 
+    @property
+    def gear(self) -> str:
+        return self._gearbox.order[self._gear_idx]
+
+    @gear.setter
+    def gear(self, name: str):
+        self._gear_idx = self._gearbox.index(name)
+
+    # ───────────────── state vector ──
+    def snapshot(self, out=None):
+        """Write the `STATE` vector into `out` (float buffer, e.g. a row of a
+        (n, STATE_SIZE) array); allocates one only if `out` is None."""
+        if out is None:
+            out = np.empty(STATE_SIZE)
+        out[:STATE_SIZE] = (self.throttle, self.timing, self.boost_cmd, self.afr,
+                            self._gear_idx, self.engine_on, self._rpm,
+                            self._rpm_target, self._boost)
+        return out
+
+    def restore(self, state):
+        """Load a `snapshot()` vector (same engine and gearbox assumed)."""
+        values = state[:STATE_SIZE]
+        if isinstance(values, np.ndarray):
+            values = values.tolist()            # plain floats, not np.float64
+        (self.throttle, self.timing, self.boost_cmd, self.afr, gear, on,
+         self._rpm, self._rpm_target, self._boost) = values
+        self._gear_idx = int(gear)
+        self.engine_on = bool(on)
+
+    def fork(self, state=None) -> "EngineSimulator":
+        """Sibling sharing engine data and gearbox, in this (or `state`'s) state."""
+        twin = object.__new__(type(self))
+        for name in ("_gearbox", "_engines", "engine_key", "redline",
+                     "idle_rpm", "_torque_model"):
+            setattr(twin, name, getattr(self, name))
+        twin.restore(self.snapshot() if state is None else state)
+        return twin
+
     # ───────────────── engine selection ──
     def load_engine(self, key: str | None):
         if key and key in self._engines:
             meta = self._engines[key]
+            self.engine_key = key
             self.redline  = meta.get("redline", 7500)
             self.idle_rpm = meta.get("idle", 900)
-            self._torque_model = TorqueModel(meta["curve"])
+            self._torque_model = curve_for(meta)
         else:
+            self.engine_key = None
             self.redline  = 7500
             self.idle_rpm = 900
-            self._torque_model = TorqueModel(None)
+            self._torque_model = load_curve(None)
 
     # ───────────────── main tick ──
     def step(self, dt: float = 0.2) -> Tuple[float, str, float, float]:
@@ -87,7 +170,7 @@ class EngineSimulator:
 
     # ───────────────── rpm dynamics ──
     def _update_rpm(self, dt: float):
-        ratio = self._gearbox.ratio(self.gear)
+        ratio = self._gearbox.table[self._gear_idx]
         thr   = self.throttle / 100.0
 
         # throttle acceleration ONLY if in gear (ratio>0)
@@ -121,17 +204,21 @@ class EngineSimulator:
     # ───────────────── power / knock / mpg ──
     def _calc_power(self) -> float:
         # Use *engine* RPM for torque lookup so torque ≠ f(gear)
-        engine_rpm = self._rpm
+        return self.power_at(self._rpm)
+
+    def power_at(self, engine_rpm: float, throttle: float | None = None,
+                 boost: float | None = None) -> float:
+        """hp at `engine_rpm` with the current tune (throttle/boost overridable)."""
         if engine_rpm <= 0:
             return 0.0
 
         engine_torque = self._torque_model.torque_at(engine_rpm)
         base_hp       = engine_torque * engine_rpm / 5252.0
 
-        ve         = 1 + self._boost / 14.7
+        ve         = 1 + (self._boost if boost is None else boost) / 14.7
         afr_eff    = 1.05 if 12 <= self.afr <= 13.6 else 0.9
         timing_eff = 1 + (self.timing - 10) / 100
-        thr_eff    = self.throttle / 100.0
+        thr_eff    = (self.throttle if throttle is None else throttle) / 100.0
         return base_hp * ve * afr_eff * timing_eff * thr_eff
 
 
@@ -150,7 +237,8 @@ class EngineSimulator:
     def downshift(self): self._shift(-1)
 
     def _shift(self, step: int):
-        old = self._gearbox.ratio(self.gear)
-        self.gear = self._gearbox.next_gear(self.gear, step)
-        new = self._gearbox.ratio(self.gear)
+        table = self._gearbox.table
+        old = table[self._gear_idx]
+        self._gear_idx = max(0, min(len(table) - 1, self._gear_idx + step))
+        new = table[self._gear_idx]
         self._rpm_target = self._rpm * (new/old) if old>0 and new>0 else 0.0
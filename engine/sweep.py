@@ -0,0 +1,257 @@
+"""
+engine.sweep  –  process-pool parameter sweeps for tune optimisation.
+
+A sweep point is a flat dict of tunables:
+
+    {"timing": 14.0, "boost_cmd": 9.0, "afr": 12.8, "ratio_3": 1.45}
+
+`ratio_<gear>` keys override `Gearbox.ratios` for that gear.  Points come
+from `grid()` or `random_sample()` (both lazy generators), are cut into
+chunks and each chunk runs as one `BatchEngineSimulator` wide-open-throttle
+pull inside a worker process.  Workers keep one batch simulator (and so one
+parsed torque curve) per engine for their whole life.
+
+`iter_sweep()` yields result rows as chunks finish; `run_sweep()` streams
+them into a CSV, so memory stays bounded by the number of in-flight chunks
+no matter how many points the sweep has.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import islice, product
+from pathlib import Path
+import csv
+import os
+import random
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+from engine.batch import BatchEngineSimulator
+from engine.engine_registry import scan_engines
+from engine.simulator import KNOCK_LEVELS, Gearbox
+
+Point = Dict[str, float]
+
+TUNABLES: Tuple[str, ...] = ("timing", "boost_cmd", "afr")
+
+
+# ───────────────────────────────────────── point generators ──
+def grid(timing: Sequence[float] = (10.0,),
+         boost_cmd: Sequence[float] = (5.0,),
+         afr: Sequence[float] = (13.5,),
+         ratios: Dict[str, Sequence[float]] | None = None
+         ) -> Iterator[Point]:
+    """Full cartesian product of the given values (lazy)."""
+    ratios = ratios or {}
+    gears  = list(ratios)
+    for t, b, a, *rs in product(timing, boost_cmd, afr,
+                                *(ratios[g] for g in gears)):
+        point = {"timing": float(t), "boost_cmd": float(b), "afr": float(a)}
+        point.update({f"ratio_{g}": float(r) for g, r in zip(gears, rs)})
+        yield point
+
+
+def random_sample(n: int,
+                  timing: Tuple[float, float] = (0.0, 30.0),
+                  boost_cmd: Tuple[float, float] = (0.0, 25.0),
+                  afr: Tuple[float, float] = (11.0, 15.0),
+                  ratios: Dict[str, Tuple[float, float]] | None = None,
+                  seed: int | None = None) -> Iterator[Point]:
+    """`n` uniform samples from the given (low, high) ranges (lazy)."""
+    rnd    = random.Random(seed)
+    ranges = {"timing": timing, "boost_cmd": boost_cmd, "afr": afr,
+              **{f"ratio_{g}": r for g, r in (ratios or {}).items()}}
+    for _ in range(n):
+        yield {k: rnd.uniform(lo, hi) for k, (lo, hi) in ranges.items()}
+
+
+# ───────────────────────────────────────── pull definition ──
+@dataclass(frozen=True)
+class PullSpec:
+    duration:   float = 8.0          # s
+    dt:         float = 0.01         # s
+    start_gear: str   = "1"
+    shift_rpm:  float | None = None  # None → engine redline
+    throttle:   float = 100.0        # %
+    max_knock:  str | None = None    # drop a lane once knock exceeds this
+
+
+def evaluate_points(batch: BatchEngineSimulator, points: Sequence[Point],
+                    pull: PullSpec = PullSpec()) -> List[Dict[str, float]]:
+    """
+    Run one WOT pull per point on `batch` (resized to fit) and return
+    peak hp, per-level knock tick counts and average mpg for each point.
+
+    With `pull.max_knock` set, a lane is removed from the batch on the
+    first tick its knock exceeds that level; its row then carries
+    `pruned=1` and `pruned_at` (s, else None), with stats covering the
+    ticks it ran.
+    """
+    n = len(points)
+    batch.reset(n)
+    batch.engine_on[:] = True
+    batch.throttle[:]  = pull.throttle
+    batch.rpm[:]       = batch.idle_rpm
+    batch.set_gear(pull.start_gear)
+    for name in TUNABLES:
+        getattr(batch, name)[:] = [p.get(name, getattr(batch, name)[0])
+                                   for p in points]
+    overrides = set().union(*points)
+    for col, gear in enumerate(batch.gear_order):
+        key = f"ratio_{gear}"
+        if key in overrides:            # points without it keep the default
+            default = batch._gear_ratios[col]
+            batch.ratios[:, col] = [p.get(key, default) for p in points]
+
+    shift_rpm = batch.redline if pull.shift_rpm is None else pull.shift_rpm
+    top       = len(batch.gear_order) - 1
+    limit     = (len(KNOCK_LEVELS) if pull.max_knock is None
+                 else KNOCK_LEVELS.index(pull.max_knock))
+    peak      = np.zeros(n)
+    mpg_sum   = np.zeros(n)
+    ticks     = np.zeros(n, dtype=np.int64)
+    pruned_at = np.full(n, np.nan)
+    hist      = np.zeros((n, len(KNOCK_LEVELS)), dtype=np.int64)
+    steps     = int(round(pull.duration / pull.dt))
+    lane      = np.arange(n)         # batch lane → point index
+
+    for k in range(steps):
+        hp, knock, mpg, rpm = batch.step(pull.dt)
+        peak[lane] = np.maximum(peak[lane], hp)
+        mpg_sum[lane] += mpg
+        ticks[lane]   += 1
+        hist[lane, knock] += 1
+
+        bad = knock > limit
+        if bad.any():
+            pruned_at[lane[bad]] = (k + 1) * pull.dt
+            batch.keep(~bad)
+            lane, rpm = lane[~bad], rpm[~bad]
+            if not lane.size:
+                break
+
+        shift = (rpm >= shift_rpm) & (batch.gear_idx < top) \
+            & (batch.rpm_target == 0)
+        if shift.any():
+            batch.upshift(shift)
+
+    avg_mpg = mpg_sum / np.maximum(ticks, 1)
+    rows = [{"peak_hp": float(peak[i]),
+             **{f"knock_{lvl.lower()}": int(hist[i, j])
+                for j, lvl in enumerate(KNOCK_LEVELS)},
+             "avg_mpg": float(avg_mpg[i])}
+            for i in range(n)]
+    if pull.max_knock is not None:
+        for row, t in zip(rows, pruned_at):
+            pruned = bool(t == t)                       # not NaN
+            row["pruned"]    = int(pruned)
+            row["pruned_at"] = float(t) if pruned else None
+    return rows
+
+
+# ───────────────────────────────────────── worker side ──
+# one batch simulator per engine and per worker process – the torque
+# curve is parsed the first time a chunk for that engine arrives
+_WORKER_SIMS: Dict[str, BatchEngineSimulator] = {}
+
+
+def _worker_batch(engine: str) -> BatchEngineSimulator:
+    batch = _WORKER_SIMS.get(engine)
+    if batch is None:
+        batch = _WORKER_SIMS[engine] = BatchEngineSimulator(0, engine)
+    return batch
+
+
+def _run_chunk(engine: str, start: int, points: List[Point],
+               pull: PullSpec) -> Tuple[int, List[Point],
+                                        List[Dict[str, float]]]:
+    return start, points, evaluate_points(_worker_batch(engine), points, pull)
+
+
+# ───────────────────────────────────────── driver ──
+def iter_sweep(engine: str, points: Iterable[Point],
+               pull: PullSpec = PullSpec(), workers: int | None = None,
+               chunk_size: int = 512) -> Iterator[Dict[str, Any]]:
+    """
+    Yield `{"index": i, **point, **result}` rows as chunks complete (not in
+    index order).  `workers=0` runs in-process, `None` uses all cores.
+    """
+    if engine not in scan_engines():
+        raise ValueError(f"Unknown engine '{engine}'.")
+
+    chunks = _chunked(iter(points), chunk_size)
+
+    if workers == 0:
+        for start, chunk in chunks:
+            yield from _rows(*_run_chunk(engine, start, chunk, pull))
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for start, chunk in islice(chunks, 2 * workers):
+            pending.add(pool.submit(_run_chunk, engine, start, chunk, pull))
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                yield from _rows(*fut.result())
+                nxt = next(chunks, None)
+                if nxt is not None:
+                    pending.add(pool.submit(_run_chunk, engine, *nxt, pull))
+
+
+def run_sweep(engine: str, points: Iterable[Point], dest: Path,
+              pull: PullSpec = PullSpec(), workers: int | None = None,
+              chunk_size: int = 512) -> int:
+    """
+    Stream a sweep into CSV file `dest`; returns the number of rows.
+
+    The header is fixed up front: index, TUNABLES, `ratio_<gear>` for every
+    gear a point overrides (in gear order), then the result fields; rows
+    without an override leave that cell blank.  A one-shot iterator can't
+    be scanned ahead, so it gets a column for every gear instead.
+    """
+    if not isinstance(points, Sequence):
+        points, ratios = iter(points), [f"ratio_{g}" for g in Gearbox().order]
+    else:
+        ratios = _ratio_columns(points)
+    fields = ["index", *TUNABLES, *ratios, "peak_hp",
+              *(f"knock_{lvl.lower()}" for lvl in KNOCK_LEVELS), "avg_mpg"]
+    if pull.max_knock is not None:
+        fields += ["pruned", "pruned_at"]
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with dest.open("w", newline="") as fp:
+        writer = csv.DictWriter(fp, fieldnames=fields, restval="")
+        writer.writeheader()
+        for row in iter_sweep(engine, points, pull, workers, chunk_size):
+            writer.writerow(row)
+            count += 1
+            if count % chunk_size == 0:
+                fp.flush()
+    return count
+
+
+def _ratio_columns(points: Sequence[Point]) -> List[str]:
+    keys  = {k for p in points for k in p if k.startswith("ratio_")}
+    order = [f"ratio_{g}" for g in Gearbox().order]
+    return [k for k in order if k in keys] + sorted(keys - set(order))
+
+
+def _chunked(it: Iterator[Point], size: int
+             ) -> Iterator[Tuple[int, List[Point]]]:
+    start = 0
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield start, chunk
+        start += len(chunk)
+
+
+def _rows(start: int, points: List[Point], results: List[Dict[str, float]]
+          ) -> Iterator[Dict[str, Any]]:
+    for i, (point, result) in enumerate(zip(points, results)):
+        yield {"index": start + i, **point, **result}
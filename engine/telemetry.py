@@ -0,0 +1,192 @@
+"""
+engine.telemetry  –  streaming per-tick recorder with a columnar log format.
+
+A log is a folder holding one raw little-endian file per channel plus a
+`manifest.json` (channel dtypes, row count, gear / knock code tables):
+
+    run.tlm/
+        manifest.json
+        time.bin  rpm.bin  hp.bin  knock.bin  mpg.bin
+        throttle.bin  gear.bin  timing.bin  boost_cmd.bin  boost.bin  afr.bin
+
+`TelemetryRecorder.record()` only writes into the current chunk of a fixed
+pool of preallocated buffers; full chunks go to a background writer thread
+which appends them to the channel files, so memory stays constant however
+long the run is.  If every buffer is still queued for writing, `record()`
+waits for the writer instead of growing the pool.
+
+`TelemetryLog` memory-maps the channel files and slices by time without
+loading the whole log.
+"""
+
+from pathlib import Path
+import json
+import os
+import queue
+import threading
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from engine.simulator import KNOCK_LEVELS, EngineSimulator
+
+CHANNELS: Dict[str, str] = {
+    "time":      "<f8",
+    "rpm":       "<f8",
+    "hp":        "<f8",
+    "knock":     "i1",      # index into KNOCK_LEVELS
+    "mpg":       "<f8",
+    "throttle":  "<f8",
+    "gear":      "i1",      # index into manifest gear_order
+    "timing":    "<f8",
+    "boost_cmd": "<f8",
+    "boost":     "<f8",
+    "afr":       "<f8",
+}
+MANIFEST = "manifest.json"
+_VERSION = 1
+_KNOCK_CODE = {lvl: i for i, lvl in enumerate(KNOCK_LEVELS)}
+
+
+# ───────────────────────────────────────── recorder ──
+class TelemetryRecorder:
+    def __init__(self, dest: Path, chunk_size: int = 4096,
+                 buffers: int = 4) -> None:
+        self.dest       = Path(dest)
+        self.chunk_size = chunk_size
+        self.count      = 0             # rows handed to the writer
+        self.gear_order: Tuple[str, ...] = ()
+
+        self.dest.mkdir(parents=True, exist_ok=True)
+        self._files = {name: (self.dest / f"{name}.bin").open("wb")
+                       for name in CHANNELS}
+
+        self._free: "queue.Queue[Dict[str, np.ndarray]]" = queue.Queue()
+        for _ in range(buffers):
+            self._free.put({name: np.empty(chunk_size, dtype=dtype)
+                            for name, dtype in CHANNELS.items()})
+        self._full: queue.Queue = queue.Queue()
+        self._chunk = self._free.get()
+        self._n     = 0
+        self._error: BaseException | None = None
+        self._closed = False
+
+        self._writer = threading.Thread(target=self._write_loop,
+                                        name="telemetry-writer", daemon=True)
+        self._writer.start()
+
+    # ───────────────── hot path ──
+    def record(self, t: float, sim: EngineSimulator, hp: float, knock: str,
+               mpg: float, rpm: float):
+        """Append one tick; inputs are read straight off `sim`."""
+        if not self.gear_order:
+            self.gear_order = tuple(sim._gearbox.order)
+        c, i = self._chunk, self._n
+        c["time"][i]      = t
+        c["rpm"][i]       = rpm
+        c["hp"][i]        = hp
+        c["knock"][i]     = _KNOCK_CODE[knock]
+        c["mpg"][i]       = mpg
+        c["throttle"][i]  = sim.throttle
+        c["gear"][i]      = self.gear_order.index(sim.gear) \
+            if sim.gear in self.gear_order else 0
+        c["timing"][i]    = sim.timing
+        c["boost_cmd"][i] = sim.boost_cmd
+        c["boost"][i]     = sim._boost
+        c["afr"][i]       = sim.afr
+        self._n = i + 1
+        if self._n == self.chunk_size:
+            self._hand_off()
+
+    def _hand_off(self):
+        if self._error is not None:
+            raise RuntimeError("telemetry writer failed") from self._error
+        self._full.put((self._chunk, self._n))
+        self.count += self._n
+        self._chunk = self._free.get()
+        self._n     = 0
+
+    # ───────────────── writer thread ──
+    def _write_loop(self):
+        written = 0
+        while True:
+            item = self._full.get()
+            if item is None:
+                break
+            chunk, n = item
+            try:
+                for name, fp in self._files.items():
+                    fp.write(chunk[name][:n].tobytes())
+                    fp.flush()
+                written += n
+                self._write_manifest(written)
+            except BaseException as err:     # surfaced on next record/close
+                self._error = err
+            finally:
+                self._free.put(chunk)
+
+    def _write_manifest(self, count: int):
+        manifest = {"version": _VERSION, "count": count,
+                    "channels": CHANNELS, "gear_order": list(self.gear_order),
+                    "knock_levels": list(KNOCK_LEVELS)}
+        tmp = self.dest / (MANIFEST + ".tmp")
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, self.dest / MANIFEST)
+
+    # ───────────────── lifecycle ──
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self._n:
+            self._hand_off()
+        self._full.put(None)
+        self._writer.join()
+        for fp in self._files.values():
+            fp.close()
+        self._write_manifest(self.count)
+        if self._error is not None:
+            raise RuntimeError("telemetry writer failed") from self._error
+
+    def __enter__(self) -> "TelemetryRecorder":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ───────────────────────────────────────── reader ──
+class TelemetryLog:
+    """Memory-mapped, read-only view of a recorded log."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        manifest  = json.loads((self.path / MANIFEST).read_text())
+        self.count: int = manifest["count"]
+        self.gear_order: Tuple[str, ...] = tuple(manifest["gear_order"])
+        self.knock_levels: Tuple[str, ...] = tuple(manifest["knock_levels"])
+        self._channels: Dict[str, np.ndarray] = {}
+        for name, dtype in manifest["channels"].items():
+            if self.count:
+                self._channels[name] = np.memmap(
+                    self.path / f"{name}.bin", dtype=dtype, mode="r",
+                    shape=(self.count,))
+            else:
+                self._channels[name] = np.empty(0, dtype=dtype)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def channels(self) -> Sequence[str]:
+        return tuple(self._channels)
+
+    def channel(self, name: str) -> np.ndarray:
+        return self._channels[name]
+
+    def slice(self, t0: float, t1: float) -> Dict[str, np.ndarray]:
+        """All channels for ticks with t0 <= time < t1 (views, no copy)."""
+        time = self._channels["time"]
+        lo = int(np.searchsorted(time, t0, side="left"))
+        hi = int(np.searchsorted(time, t1, side="left"))
+        return {name: arr[lo:hi] for name, arr in self._channels.items()}
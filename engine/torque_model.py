@@ -1,15 +1,29 @@
 """
 engine.torque_model  –  CSV-driven torque look-up with fallback.
 
-If the given CSV is missing or malformed we fall back to a simple
-"increasing then tapering" default curve so the simulator never crashes.
+If the given CSV is missing we use a simple "increasing then tapering"
+default curve.  A malformed CSV raises `CurveFormatError` with `strict=True`;
+otherwise the offending file and line are printed and the default curve is
+used, so the simulator never crashes.  Parsing is done by
+`engine.curve_loader` (chunked, channel selection, optional decimation).
+
+The curve is compiled once at load into contiguous float64 arrays with
+precomputed segment slopes, so a lookup is a bisect plus a multiply-add.
+Passing `lut_step` additionally resamples the curve onto a uniform RPM grid
+(e.g. 1 or 10 RPM) and a lookup becomes a single index plus multiply-add;
+the LUT is checked against exact interpolation to within `tolerance`.
 """
 
 from pathlib import Path
-import csv
+import math
+from array import array
 from bisect import bisect_right
 from typing import List, Tuple
 
+import numpy as np
+
+from engine.curve_loader import CurveFormatError, read_curve
+
 # ---------- a really simple built-in curve (RPM , Torque) ----------
 _DEFAULT_CURVE: List[Tuple[float, float]] = [
     (1000, 180), (2000, 230), (3000, 280), (4000, 320),
@@ -18,39 +32,138 @@ _DEFAULT_CURVE: List[Tuple[float, float]] = [
 
 
 class TorqueModel:
-    def __init__(self, csv_path: Path | None = None) -> None:
-        self.curve: List[Tuple[float, float]] = self._load(csv_path)
+    def __init__(self, csv_path: Path | None = None,
+                 lut_step: float | None = None,
+                 tolerance: float = 1e-9, channel: str | None = None,
+                 max_error: float | None = None, strict: bool = False) -> None:
+        """
+        `channel` names the torque column of a multi-channel export and
+        `max_error` (Nm) decimates the curve on load (see `curve_loader`).
+        """
+        xs, ys = self._load(csv_path, channel, max_error, strict)
+        self._init(xs, ys, lut_step, tolerance)
+
+    @classmethod
+    def from_buffers(cls, rpms, torques, lut_step: float | None = None,
+                     tolerance: float = 1e-9) -> "TorqueModel":
+        """
+        Wrap already-sorted float64 buffers (array('d'), memoryview cast to
+        'd', e.g. a slice of an mmap) without copying them.
+        """
+        model = cls.__new__(cls)
+        model._init(rpms, torques, lut_step, tolerance)
+        return model
+
+    def _init(self, xs, ys, lut_step: float | None, tolerance: float) -> None:
+        self._compile(xs, ys)
+        self.lut_step: float | None = None
+        if lut_step:
+            self._build_lut(float(lut_step), tolerance)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the compiled arrays (for cache accounting)."""
+        n = self.rpms.nbytes + self.torques.nbytes + self.slopes.nbytes
+        if self.lut_step is not None:
+            n += self._lut_yv.nbytes + self._lut_dv.nbytes
+        return n
+
+    @property
+    def curve(self) -> List[Tuple[float, float]]:
+        """The (RPM, torque) break-points, sorted by RPM."""
+        return list(zip(self._xs, self._ys))
+
+    # ───────────────────────── compile ──
+    def _compile(self, xs, ys) -> None:
+        # xs / ys are contiguous float64 buffers: bisect and indexing stay
+        # pure-Python fast and the NumPy views below share their memory.
+        self._xs, self._ys = xs, ys
+        self.rpms    = self._readonly(self._xs)
+        self.torques = self._readonly(self._ys)
+
+        dx, dy = np.diff(self.rpms), np.diff(self.torques)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ks = np.where(dx != 0, dy / dx, 0.0)
+        self._ks = array("d")
+        self._ks.frombytes(ks.tobytes())
+        self.slopes  = self._readonly(self._ks)
+
+    @staticmethod
+    def _readonly(buf) -> np.ndarray:
+        view = np.frombuffer(buf, dtype=np.float64) if len(buf) \
+            else np.empty(0, dtype=np.float64)
+        view.flags.writeable = False
+        return view
+
+    def _build_lut(self, step: float, tolerance: float) -> None:
+        x0, x1 = self._xs[0], self._xs[-1]
+        n      = max(2, math.ceil((x1 - x0) / step) + 1)
+        grid   = x0 + np.arange(n) * step
+        vals   = np.interp(grid, self.rpms, self.torques)
+
+        self._lut_x0    = x0
+        self._lut_inv   = 1.0 / step
+        self._lut_last  = n - 2
+        self._lut_y     = array("d", vals)
+        self._lut_d     = array("d", np.diff(vals))
+        self._lut_yv    = self._readonly(self._lut_y)
+        self._lut_dv    = self._readonly(self._lut_d)
+        self.lut_step   = step
+
+        # piecewise-linear resampling error peaks at the original knots
+        probe = np.concatenate([self.rpms, (grid[:-1] + grid[1:]) / 2])
+        err   = np.max(np.abs(self.torque_at_many(probe)
+                              - np.interp(probe, self.rpms, self.torques)))
+        if err > tolerance:
+            self.lut_step = None
+            raise ValueError(f"LUT step {step} RPM deviates {err:.3g} from the "
+                             f"source curve (tolerance {tolerance:.3g}).")
 
     # ───────────────────────── lookup ──
     def torque_at(self, rpm: float) -> float:
-        pts = self.curve
-        if rpm <= pts[0][0]:
-            return pts[0][1]
-        if rpm >= pts[-1][0]:
-            return pts[-1][1]
+        xs = self._xs
+        if rpm <= xs[0]:
+            return self._ys[0]
+        if rpm >= xs[-1]:
+            return self._ys[-1]
+
+        if self.lut_step is not None:
+            u = (rpm - self._lut_x0) * self._lut_inv
+            i = min(int(u), self._lut_last)
+            return self._lut_y[i] + (u - i) * self._lut_d[i]
+
+        i = bisect_right(xs, rpm) - 1
+        return self._ys[i] + (rpm - xs[i]) * self._ks[i]
+
+    def torque_at_many(self, rpms) -> np.ndarray:
+        """Vectorised `torque_at` for an array of RPMs."""
+        rpms = np.asarray(rpms, dtype=np.float64)
+        if self.lut_step is None:
+            # np.interp clamps to the end points exactly like torque_at
+            return np.interp(rpms, self.rpms, self.torques)
 
-        i = bisect_right([p[0] for p in pts], rpm) - 1
-        x0, y0 = pts[i]
-        x1, y1 = pts[i + 1]
-        return y0 + (rpm - x0) * (y1 - y0) / (x1 - x0)
+        u = (np.clip(rpms, self._xs[0], self._xs[-1]) - self._lut_x0) \
+            * self._lut_inv
+        i = np.minimum(u.astype(np.intp), self._lut_last)
+        out = self._lut_yv[i] + (u - i) * self._lut_dv[i]
+        out = np.where(rpms <= self._xs[0], self._ys[0], out)
+        return np.where(rpms >= self._xs[-1], self._ys[-1], out)
 
     # ───────────────────────── loading ──
     @staticmethod
-    def _load(path: Path | None) -> List[Tuple[float, float]]:
+    def _load(path: Path | None, channel: str | None = None,
+              max_error: float | None = None,
+              strict: bool = False) -> Tuple[array, array]:
         if path is None or not path.exists():
             # no file – use default
-            return _DEFAULT_CURVE
+            return (array("d", (p[0] for p in _DEFAULT_CURVE)),
+                    array("d", (p[1] for p in _DEFAULT_CURVE)))
 
         try:
-            with path.open() as fp:
-                reader = csv.reader(fp)
-                header = next(reader)
-                # expect RPM,Torque
-                pairs = [(float(rpm), float(tq)) for rpm, tq in reader]
-            pairs.sort()
-            return pairs
-        except Exception as err:
-            # malformed CSV – log & fall back
-            print(f"[TorqueModel] Warning: failed to read '{path}': {err}. "
-                  "Using built-in default curve.")
-            return _DEFAULT_CURVE
+            return read_curve(path, torque_channel=channel, max_error=max_error)
+        except (CurveFormatError, OSError, UnicodeDecodeError) as err:
+            if strict:
+                raise
+            # malformed CSV – say exactly where, then fall back
+            print(f"[TorqueModel] Warning: {err}. Using built-in default curve.")
+            return TorqueModel._load(None)
@@ -0,0 +1,254 @@
+"""
+engine.watcher  –  hot-reload engine folders while simulators keep running.
+
+`EngineWatcher` follows an engine root (default ENGINE_ROOT) on a daemon
+thread and reacts only to the engine folders that changed:
+
+    • the registry index is updated for that folder (`_EngineIndex.update`),
+      no rescan of the others;
+    • its cached torque curves are dropped from `CURVE_CACHE`;
+    • every attached simulator gets a new `_engines` dict (copy-on-write,
+      one reference store), and those running that engine reload it – the
+      new curve is parsed on the watcher thread and swapped in with a single
+      attribute assignment, so the tick loop never waits.
+
+On Linux the watcher uses inotify through ctypes (root + one watch per
+engine folder); changes are debounced for `settle` s so an editor's
+write-rename sequence is handled once.  Elsewhere, or if inotify is
+unavailable, it polls: one `scandir` of the root plus three `stat` calls
+per engine every `interval` s, compared against the last stamps.
+
+Simulators are held by weak reference; `attach()` is all a caller needs.
+"""
+
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Set
+
+from engine.curve_cache import CURVE_CACHE
+from engine.engine_registry import ENGINE_ROOT, _EngineIndex, _index
+
+WATCHED_FILES = ("meta.json", "torque_curve.csv")
+
+# inotify(7)
+IN_MODIFY      = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM  = 0x00000040
+IN_MOVED_TO    = 0x00000080
+IN_CREATE      = 0x00000100
+IN_DELETE      = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_IGNORED     = 0x00008000
+IN_ISDIR       = 0x40000000
+IN_ONLYDIR     = 0x01000000
+_ROOT_MASK   = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+_FOLDER_MASK = (IN_CLOSE_WRITE | IN_MODIFY | IN_CREATE | IN_DELETE
+                | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE_SELF | IN_ONLYDIR)
+_EVENT = struct.Struct("iIII")      # wd, mask, cookie, len
+
+
+def _is_engine_name(name: str) -> bool:
+    # dot entries are ours: .registry_index.json / .tmp
+    return bool(name) and not name.startswith(".")
+
+
+# ───────────────────────────────────────── backends ──
+class _Inotify:
+    name = "inotify"
+
+    def __init__(self, root: Path) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.root = root
+        self._wds: Dict[int, str] = {}      # wd → folder name ("" = root)
+        self._add("", _ROOT_MASK)
+        with os.scandir(root) as it:
+            for d in it:
+                if d.is_dir() and _is_engine_name(d.name):
+                    self._add(d.name, _FOLDER_MASK)
+
+    def _add(self, name: str, mask: int):
+        path = str(self.root / name) if name else str(self.root)
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd >= 0:
+            self._wds[wd] = name
+        elif not name:
+            raise OSError(ctypes.get_errno(), f"cannot watch {path}")
+
+    def wait(self, timeout: float) -> Set[str]:
+        """Names of engine folders touched within `timeout` s."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed: Set[str] = set()
+        pos = 0
+        while pos + _EVENT.size <= len(buf):
+            wd, mask, _, n = _EVENT.unpack_from(buf, pos)
+            raw = buf[pos + _EVENT.size:pos + _EVENT.size + n]
+            pos += _EVENT.size + n
+            name = os.fsdecode(raw.rstrip(b"\0"))
+            folder = self._wds.get(wd)
+            if mask & IN_IGNORED:
+                self._wds.pop(wd, None)
+            elif folder == "" and _is_engine_name(name):
+                if not mask & IN_ISDIR:
+                    continue            # root-level files (index, temp files)
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add(name, _FOLDER_MASK)
+                changed.add(name)
+            elif folder and (name in WATCHED_FILES or mask & IN_DELETE_SELF):
+                changed.add(folder)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class _Poller:
+    name = "poll"
+
+    def __init__(self, root: Path, interval: float) -> None:
+        self.root, self.interval = root, interval
+        self._stamps = self._scan()
+
+    def _scan(self) -> Dict[str, Any]:
+        stamps: Dict[str, Any] = {}
+        try:
+            with os.scandir(self.root) as it:
+                for d in it:
+                    if d.is_dir() and _is_engine_name(d.name):
+                        stamps[d.name] = _EngineIndex._stamp(Path(d.path))
+        except FileNotFoundError:
+            pass                    # root not created yet
+        return stamps
+
+    def wait(self, timeout: float) -> Set[str]:
+        time.sleep(min(timeout, self.interval))
+        stamps = self._scan()
+        old, self._stamps = self._stamps, stamps
+        return {name for name in old.keys() | stamps.keys()
+                if old.get(name) != stamps.get(name)}
+
+    def close(self):
+        pass
+
+
+# ───────────────────────────────────────── watcher ──
+class EngineWatcher:
+    def __init__(self, root: Path | None = None, interval: float = 0.5,
+                 settle: float = 0.05, backend: str = "auto") -> None:
+        self.root     = root or ENGINE_ROOT
+        self.interval = interval
+        self.settle   = settle
+        self.reloads  = 0
+        self._sims: "weakref.WeakSet" = weakref.WeakSet()
+        self._listeners: List[Callable[[str, Dict[str, Any] | None], Any]] = []
+        self._lock    = threading.Lock()
+        self._stop    = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._backend = self._open(backend)
+
+    def _open(self, backend: str):
+        if backend in ("auto", "inotify") and sys.platform.startswith("linux"):
+            try:
+                return _Inotify(self.root)
+            except (OSError, AttributeError) as exc:
+                if backend == "inotify":
+                    raise
+                print(f"[EngineWatcher] inotify unavailable ({exc}); polling.")
+        elif backend == "inotify":
+            raise OSError("inotify is only available on Linux")
+        return _Poller(self.root, self.interval)
+
+    @property
+    def backend(self) -> str:
+        return self._backend.name
+
+    # ───────────────── subscribers ──
+    def attach(self, sim) -> None:
+        """Keep `sim` (weakly referenced) in sync with the engine folders."""
+        with self._lock:
+            self._sims.add(sim)
+
+    def on_change(self, callback: Callable[[str, Dict[str, Any] | None], Any]):
+        """`callback(key, meta or None)` on the watcher thread after a reload."""
+        self._listeners.append(callback)
+
+    # ───────────────── lifecycle ──
+    def start(self) -> "EngineWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="engine-watch",
+                                            daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float | None = 1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._backend.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            changed = self._backend.wait(self.interval)
+            if not changed:
+                continue
+            # let the rest of a save sequence arrive before reloading
+            while True:
+                more = self._backend.wait(self.settle)
+                if not more:
+                    break
+                changed |= more
+            try:
+                self.apply(changed)
+            except Exception as exc:
+                print(f"[EngineWatcher] Reload failed: {exc}")
+
+    # ───────────────── reload ──
+    def apply(self, names: Set[str]) -> Dict[str, Dict[str, Any] | None]:
+        """Re-index `names` and push the result to attached simulators."""
+        idx = _index(self.root)
+        metas: Dict[str, Dict[str, Any] | None] = {}
+        with idx.lock:                  # shared with scan_engines callers
+            for name in sorted(n for n in names if _is_engine_name(n)):
+                CURVE_CACHE.invalidate(self.root / name / "torque_curve.csv")
+                metas[name] = idx.meta(name) if idx.update(name) else None
+            idx.save()
+
+        with self._lock:
+            sims = list(self._sims)
+        for sim in sims:
+            engines = dict(sim._engines)
+            for name, meta in metas.items():
+                if meta is None:
+                    engines.pop(name, None)
+                else:
+                    engines[name] = meta
+            sim._engines = engines                       # one reference swap
+            if sim.engine_key in metas:
+                # parses here; the tick keeps the old curve until the swap
+                sim.load_engine(sim.engine_key)
+
+        self.reloads += len(metas)
+        for name, meta in metas.items():
+            for callback in self._listeners:
+                callback(name, meta)
+        return metas
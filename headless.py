@@ -0,0 +1,121 @@
+"""
+Headless entry point – run scripted pulls without a display.
+
+    python headless.py --list
+    python headless.py --engine k20 --gear 3 --duration 8 --dt 0.001
+    python headless.py --engine coyote --trace pull.csv --out run.csv
+    python headless.py --repeat 1000            # throughput check for CI
+    python headless.py --dt 0.001 --telemetry runs/pull.tlm
+    python headless.py --duration 600 --dt 0.001 --kernel auto
+"""
+
+import argparse
+import math
+import sys
+import time
+from pathlib import Path
+
+from engine.engine_registry import scan_engines
+from engine.kernel import run_trace_kernel
+from engine.profiling import PROFILER, enable_profiling
+from engine.runner import InputTrace, run_trace, wot_pull
+from engine.simulator import EngineSimulator
+from engine.telemetry import TelemetryRecorder
+
+
+def _positive_int(text: str) -> int:
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def _positive_float(text: str) -> float:
+    value = float(text)
+    if not math.isfinite(value) or value <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {text}")
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Run engine pulls headlessly.")
+    p.add_argument("--list", action="store_true", help="list engines and exit")
+    p.add_argument("--engine", help="engine key (default: first found)")
+    p.add_argument("--trace", type=Path, help="input trace CSV")
+    p.add_argument("--dt", type=_positive_float, default=0.01,
+                   help="fixed step in s")
+    p.add_argument("--duration", type=_positive_float, default=8.0,
+                   help="WOT pull length in s (ignored with --trace)")
+    p.add_argument("--gear", default="3", help="WOT pull gear")
+    p.add_argument("--timing", type=float, default=10.0)
+    p.add_argument("--boost", type=float, default=None, help="boost cmd PSI")
+    p.add_argument("--afr", type=float, default=None)
+    p.add_argument("--repeat", type=_positive_int, default=1,
+                   help="number of pulls")
+    p.add_argument("--out", type=Path, help="write last run's time series CSV")
+    p.add_argument("--telemetry", type=Path,
+                   help="stream every tick of every run to this log folder")
+    p.add_argument("--kernel", choices=["auto", "numba", "python"],
+                   help="run through the fused kernel (no telemetry/profile)")
+    p.add_argument("--profile", action="store_true",
+                   help="print per-stage step timings after the runs")
+    return p
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.list:
+        for key, meta in scan_engines().items():
+            print(f"{key:20s} {meta['display']}")
+        return 0
+
+    trace = (InputTrace.from_csv(args.trace) if args.trace else
+             wot_pull(args.duration, args.gear, args.timing,
+                      args.boost, args.afr))
+
+    sim = EngineSimulator()
+    if args.engine:
+        if args.engine not in sim._engines:
+            print(f"Unknown engine '{args.engine}'.", file=sys.stderr)
+            return 2
+        sim.load_engine(args.engine)
+
+    if args.profile:
+        enable_profiling(sim)
+
+    recorder = TelemetryRecorder(args.telemetry) if args.telemetry else None
+    t0 = time.perf_counter()
+    span = round(trace.duration / args.dt) * args.dt     # simulated s per run
+    for run in range(args.repeat):
+        sim._boost = sim._rpm_target = 0.0
+        if args.kernel:
+            result = run_trace_kernel(sim, trace, args.dt, backend=args.kernel)
+        else:
+            # runs follow each other in the log, so its time stays monotonic
+            result = run_trace(sim, trace, args.dt, recorder=recorder,
+                               t_offset=run * span)
+    elapsed = time.perf_counter() - t0
+    if recorder is not None:
+        recorder.close()
+
+    summary = result.summary()
+    ticks   = summary["ticks"] * args.repeat
+    print(f"peak {summary['peak_hp']:.1f} hp @ {summary['peak_rpm']:.0f} rpm, "
+          f"avg {summary['avg_mpg']:.1f} mpg, knock L/M/H "
+          f"{summary['knock_low']:.0f}/{summary['knock_med']:.0f}/"
+          f"{summary['knock_high']:.0f}")
+    print(f"{args.repeat} run(s), {ticks:.0f} ticks in {elapsed:.3f}s "
+          f"({ticks / max(elapsed, 1e-9):,.0f} ticks/s, "
+          f"{trace.duration * args.repeat / max(elapsed, 1e-9):,.0f}x real time)")
+
+    if args.profile:
+        print("\n".join(PROFILER.lines()))
+
+    if args.out:
+        result.to_csv(args.out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
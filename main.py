@@ -1,10 +1,43 @@
-import customtkinter as ctk
-from ui.tuner_window import TunerWindow
+import argparse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulated Engine Tuner")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print time-to-first-frame and the slowest imports")
+    parser.add_argument("--record-session", metavar="PATH",
+                        help="log UI inputs for `python -m engine.session PATH`")
+    args = parser.parse_args(argv)
+
+    report = None
+    if args.startup_report:
+        from engine.profiling import StartupReport
+        report = StartupReport()
+
+    # imported here so the report can time them
+    import customtkinter as ctk
+    from ui.tuner_window import TunerWindow
+    if report:
+        report.mark("imports")
 
-def main():
     root = ctk.CTk()
-    app = TunerWindow(root)
+    app = TunerWindow(root, session_path=args.record_session)
+    if report:
+        report.mark("window built")
+
+        def engine_loaded(_future):
+            report.mark("engine registry loaded")
+            report.emit()
+
+        def first_frame():
+            report.mark("first frame")
+            app.sim_ready.add_done_callback(engine_loaded)
+
+        root.after_idle(first_frame)
     root.mainloop()
+    if app.session is not None:
+        app.session.close()
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,193 @@
+"""
+Benchmark fixtures and baseline gating for the simulator hot paths.
+
+Benchmarks carry the `bench` marker and are deselected unless the `-m`
+expression selects that marker (`-m "not slow"` alone does not):
+
+    pytest -m bench tests/benchmarks                       # compare to baseline
+    BENCH_RECORD=1 pytest -m bench tests/benchmarks        # add a baseline sample
+    BENCH_THRESHOLD=0.10 pytest -m bench tests/benchmarks  # tolerance floor +10 %
+    BENCH_BASELINE=ci.json pytest -m bench tests/benchmarks
+
+Each benchmark's median round is divided by the median of a fixed reference
+workload (pure-Python loop plus a numpy sort) timed right after it, so
+baseline.json holds machine-independent ratios.  A record run appends one
+ratio per benchmark (the last `KEEP` are kept; delete the entry to start
+over).  The gate compares against the median of those samples and allows
+the larger of the threshold (default 25 %) and twice the spread seen while
+recording, so a benchmark that is noisy on its own gets a wider band.  A
+ratio past that band is re-timed (benchmark and reference) up to `CONFIRM`
+more times and fails only if every attempt regresses, so a burst of load
+on a shared machine does not fail the gate.  A benchmark with no baseline
+entry is skipped rather than passed.  Requires
+pytest-benchmark (see requirements-dev.txt) – skipped without it.
+"""
+
+from pathlib import Path
+import importlib.util
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+if importlib.util.find_spec("pytest_benchmark") is None:
+    collect_ignore_glob = ["test_*.py"]
+
+BASELINE  = Path(os.environ.get("BENCH_BASELINE",
+                                Path(__file__).with_name("baseline.json")))
+RECORD    = os.environ.get("BENCH_RECORD", "") not in ("", "0")
+THRESHOLD = float(os.environ.get("BENCH_THRESHOLD", "0.25"))
+KEEP      = 7
+CONFIRM   = 2
+
+
+HERE = Path(__file__).parent
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "bench: hot-path benchmark (opt-in)")
+
+
+def _selects_bench(markexpr: str) -> bool:
+    """True if `-m markexpr` depends on the bench marker being present."""
+    if not markexpr:
+        return False
+    try:
+        from _pytest.mark.expression import Expression
+    except ImportError:                  # private API moved – best effort
+        return "bench" in markexpr.replace("not bench", "")
+    expr = Expression.compile(markexpr)
+    return (expr.evaluate(lambda name, **_: name == "bench")
+            and not expr.evaluate(lambda name, **_: False))
+
+
+def pytest_collection_modifyitems(config, items):
+    mine = [it for it in items if HERE in Path(str(it.fspath)).parents]
+    for item in mine:
+        item.add_marker(pytest.mark.bench)
+    if mine and not _selects_bench(config.getoption("markexpr")):
+        config.hook.pytest_deselected(items=mine)
+        items[:] = [it for it in items if it not in mine]
+
+
+def _reference_workload():
+    total = 0
+    for i in range(200_000):
+        total += i * i
+    np.sort(np.random.default_rng(0).random(200_000))
+    return total
+
+
+def _reference_s(runs: int = 5) -> float:
+    """Median wall time of the reference workload on this machine."""
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        _reference_workload()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+class _Timed:
+    """`benchmark` that remembers the call it timed, so it can be re-timed."""
+
+    def __init__(self, benchmark) -> None:
+        self._benchmark = benchmark
+        self.call = None
+
+    def __call__(self, fn, *args, **kwargs):
+        self.call = (fn, args, kwargs)
+        return self._benchmark(fn, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._benchmark, name)
+
+
+def _retime(call, rounds: int) -> float:
+    """Median wall time of `rounds` more calls."""
+    fn, args, kwargs = call
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        fn(*args, **kwargs)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times))
+
+
+def _summarise(samples) -> dict:
+    mid = float(np.median(samples))
+    return {"samples": samples, "relative": mid,
+            "spread": max(samples) / mid - 1 if len(samples) > 1 else 0.0}
+
+
+@pytest.fixture(scope="session")
+def baseline():
+    data = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    yield data
+    if RECORD:
+        BASELINE.write_text(json.dumps(data, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture
+def bench(baseline, request):
+    """`benchmark` plus baseline recording / regression check."""
+    name = request.node.nodeid.split("::", 1)[-1]
+    ref  = baseline.get(name)
+    if (not RECORD and ref is None
+            and not request.config.getoption("benchmark_disable")):
+        pytest.skip(f"no baseline for {name} in {BASELINE.name} "
+                    f"(record one with BENCH_RECORD=1)")
+    benchmark = _Timed(request.getfixturevalue("benchmark"))
+    yield benchmark
+    if benchmark.stats is None:          # --benchmark-disable
+        return
+    median   = benchmark.stats.stats.median
+    relative = median / _reference_s()
+    if RECORD:
+        samples = ((ref or {}).get("samples", []) + [relative])[-KEEP:]
+        baseline[name] = {**_summarise(samples), "median_s": median,
+                          **benchmark.extra_info}
+        return
+    allowed = max(THRESHOLD, 2 * ref.get("spread", 0.0))
+    limit   = ref["relative"] * (1 + allowed)
+    rounds  = min(benchmark.stats.stats.rounds, max(5, int(0.5 / median)))
+    for _ in range(CONFIRM):
+        if relative <= limit:
+            return
+        # confirm before failing: one loaded moment is not a regression
+        median   = _retime(benchmark.call, rounds)
+        relative = min(relative, median / _reference_s())
+    if relative > limit:
+        pytest.fail(f"{name}: {relative:.4f} × reference regressed past "
+                    f"{ref['relative']:.4f} + {allowed:.0%} "
+                    f"(median {median * 1e6:.1f} µs)")
+
+
+# ───────────────────────────────────────── synthetic data ──
+def write_curve(path: Path, rows: int, step: float = 1.0) -> Path:
+    rpm = 800 + step * np.arange(rows)
+    tq  = 150 + 100 * np.sin(rpm / 1500)
+    with path.open("w") as fp:
+        fp.write("RPM,Torque\n")
+        fp.writelines(f"{r:.1f},{t:.4f}\n" for r, t in zip(rpm, tq))
+    return path
+
+
+@pytest.fixture(scope="session")
+def big_curve(tmp_path_factory) -> Path:
+    return write_curve(tmp_path_factory.mktemp("curves") / "big.csv", 200_000,
+                       step=0.05)
+
+
+@pytest.fixture(scope="session")
+def engine_root(tmp_path_factory) -> Path:
+    root = tmp_path_factory.mktemp("engines")
+    for i in range(300):
+        folder = root / f"engine-{i:03d}"
+        folder.mkdir()
+        (folder / "meta.json").write_text(json.dumps(
+            {"name": f"Engine {i}", "idle": 900, "redline": 7000 + i}))
+        write_curve(folder / "torque_curve.csv", 30, step=250)
+    return root
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from engine import engine_registry
+from engine.engine_registry import INDEX_NAME, scan_engines
+from engine.simulator import EngineSimulator
+from engine.torque_model import TorqueModel
+
+LOOKUPS = np.random.default_rng(0).uniform(500, 9000, 1000).tolist()
+
+
+def _lookup_all(model):
+    torque_at = model.torque_at
+    for rpm in LOOKUPS:
+        torque_at(rpm)
+
+
+@pytest.fixture(scope="module")
+def models(big_curve):
+    return {
+        "small":   TorqueModel(None),
+        "large":   TorqueModel(big_curve),
+        "uniform": TorqueModel(big_curve, lut_step=1, tolerance=1.0),
+    }
+
+
+@pytest.mark.parametrize("kind", ["small", "large", "uniform"])
+def test_torque_at(bench, models, kind):
+    bench.extra_info["lookups"] = len(LOOKUPS)
+    bench(_lookup_all, models[kind])
+
+
+def test_torque_at_many(bench, models):
+    rpms = np.asarray(LOOKUPS)
+    bench(models["large"].torque_at_many, rpms)
+
+
+def test_step_throughput(bench):
+    sim = EngineSimulator()
+    sim.engine_on, sim.throttle, sim.gear = True, 100.0, "3"
+    ticks = 10_000
+
+    def run():
+        sim._rpm = sim.idle_rpm
+        step = sim.step
+        for _ in range(ticks):
+            step(0.001)
+
+    bench(run)
+    if bench.stats is not None:            # None with --benchmark-disable
+        bench.extra_info["ticks_per_s"] = ticks / bench.stats.stats.median
+
+
+def test_scan_engines_warm(bench, engine_root):
+    scan_engines(engine_root)
+    result = bench(scan_engines, engine_root)
+    assert len(result) == 300
+
+
+def test_scan_engines_cold(bench, engine_root):
+    def cold():
+        engine_registry._INDEXES.pop(engine_root, None)
+        (engine_root / INDEX_NAME).unlink(missing_ok=True)
+        return scan_engines(engine_root)
+
+    assert len(bench(cold)) == 300
+
+
+def test_load_big_csv(bench, big_curve):
+    rpms, torques = bench(TorqueModel._load, big_curve)
+    assert len(rpms) == len(torques) == 200_000
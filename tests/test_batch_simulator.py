@@ -0,0 +1,62 @@
+import random
+
+import numpy as np
+import pytest
+
+from engine.batch import BatchEngineSimulator, knock_labels
+from engine.simulator import EngineSimulator
+
+
+def _random_sims(n, seed=7):
+    rnd = random.Random(seed)
+    sims = []
+    for _ in range(n):
+        sim = EngineSimulator()
+        sim.engine_on = rnd.random() > 0.1
+        sim.throttle  = rnd.choice([0.0, 0.5, rnd.uniform(0, 100)])
+        sim.timing    = rnd.uniform(0, 35)
+        sim.boost_cmd = rnd.uniform(0, 25)
+        sim.afr       = rnd.uniform(11, 15)
+        sim.gear      = rnd.choice(sim._gearbox.order)
+        sim._rpm      = rnd.uniform(0, 8000)
+        sims.append(sim)
+    return sims
+
+
+def test_from_simulators_keeps_the_engine_and_rejects_mixed_ones():
+    a, b = EngineSimulator(), EngineSimulator()
+    keys = list(a._engines)
+    a.load_engine(keys[0])
+    b.load_engine(keys[0])
+    assert BatchEngineSimulator.from_simulators([a, b]).engine_key == keys[0]
+
+    b.load_engine(keys[1])
+    with pytest.raises(ValueError, match="share one engine"):
+        BatchEngineSimulator.from_simulators([a, b])
+
+
+def test_batch_matches_scalar_lane_for_lane():
+    sims  = _random_sims(64)
+    batch = BatchEngineSimulator.from_simulators(sims)
+    rnd   = random.Random(3)
+
+    for tick in range(120):
+        if tick % 17 == 5:
+            up = np.array([rnd.random() > 0.5 for _ in sims])
+            for sim, flag in zip(sims, up):
+                if flag:
+                    sim.upshift()
+            batch.upshift(up)
+        if tick % 23 == 11:
+            for sim in sims:
+                sim.downshift()
+            batch.downshift()
+
+        hp, knock, mpg, rpm = batch.step(0.05)
+        expected = [sim.step(0.05) for sim in sims]
+
+        assert np.allclose(hp,  [e[0] for e in expected], rtol=1e-12, atol=1e-9)
+        assert knock_labels(knock) == tuple(e[1] for e in expected)
+        assert np.allclose(mpg, [e[2] for e in expected], rtol=1e-12)
+        assert np.allclose(rpm, [e[3] for e in expected], rtol=1e-12)
+        assert batch.gears() == tuple(sim.gear for sim in sims)
@@ -0,0 +1,48 @@
+import os
+
+from engine.curve_cache import CurveCache
+from engine.simulator import EngineSimulator
+
+
+def _curve(path, peak):
+    path.write_text(f"RPM,Torque\n1000,100\n4000,{peak}\n7000,150\n")
+    return path
+
+
+def test_simulators_share_one_model():
+    a, b = EngineSimulator(), EngineSimulator()
+    assert a._torque_model is b._torque_model
+    assert not a._torque_model.torques.flags.writeable
+
+
+def test_hits_misses_and_mtime_invalidation(tmp_path):
+    cache = CurveCache()
+    path  = _curve(tmp_path / "c.csv", 300)
+
+    first = cache.get(path)
+    assert cache.get(path) is first
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+    _curve(path, 320)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    fresh = cache.get(path)
+    assert fresh is not first and fresh.torque_at(4000) == 320
+    assert cache.stats()["entries"] == 1         # stale entry dropped
+
+
+def test_lru_eviction_respects_byte_budget(tmp_path):
+    paths = [_curve(tmp_path / f"c{i}.csv", 300 + i) for i in range(4)]
+    one   = CurveCache().get(paths[0]).nbytes
+    cache = CurveCache(max_bytes=2 * one)
+
+    for p in paths[:3]:
+        cache.get(p)
+    cache.get(paths[1])                          # touch → most recent
+    cache.get(paths[3])
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 2 * one and stats["evictions"] == 2
+    before = stats["hits"]
+    cache.get(paths[1])
+    assert cache.stats()["hits"] == before + 1
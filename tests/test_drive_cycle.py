@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from engine.drive_cycle import DriveCycle, DriveCycleSimulator, Vehicle
+from engine.simulator import EngineSimulator
+
+CYCLE = DriveCycle(time=np.array([0.0, 20.0, 600.0, 640.0, 700.0, 760.0, 1200.0]),
+                   speed_kmh=np.array([0.0, 50.0, 50.0, 100.0, 100.0, 0.0, 0.0]))
+
+
+def _run(fast_forward):
+    return DriveCycleSimulator(EngineSimulator()).run(CYCLE, dt=0.1,
+                                                      fast_forward=fast_forward)
+
+
+def test_follows_cycle_and_shifts():
+    out = _run(fast_forward=False)
+    speed, target = np.asarray(out.speed_kmh), np.asarray(out.target)
+    assert np.abs(speed - target).max() < 5.0
+    assert speed[-1] == 0.0
+    assert {"1", "2", "3"} <= set(out.gear)
+    # ~0.5·20·50 + 580·50 + 0.5·40·150 + 60·100 + 0.5·60·100 (km/h·s)
+    assert out.distance_km == pytest.approx(11.53, rel=0.01)
+
+
+def test_fast_forward_skips_steady_segments():
+    full, fast = _run(fast_forward=False), _run(fast_forward=True)
+    assert fast.steps < full.steps / 5
+    assert fast.distance_km == pytest.approx(full.distance_km, rel=1e-3)
+    assert fast.time[-1] == pytest.approx(CYCLE.duration)
+
+
+def test_heavier_vehicle_needs_more_throttle():
+    def mean_throttle(mass):
+        drive = DriveCycleSimulator(EngineSimulator(), Vehicle(mass=mass))
+        out = drive.run(CYCLE, fast_forward=False)
+        return np.mean(out.throttle)
+    assert mean_throttle(2500.0) > mean_throttle(1200.0)
+
+
+def test_cycle_from_csv(tmp_path):
+    path = tmp_path / "cycle.csv"
+    path.write_text("time,speed_kmh\n0,0\n10,36\n30,36\n")
+    cycle = DriveCycle.from_csv(path)
+    assert cycle.duration == 30.0
+    assert cycle.target(5.0) == pytest.approx(18.0)
+
+
+def test_no_drive_force_never_pushes_the_car():
+    drive = DriveCycleSimulator(EngineSimulator())
+    drive.sim.gear, drive.speed = "N", 10.0
+    drive.step(0.1, 60.0)
+    assert drive.speed < 10.0
+
+
+def test_cruise_falls_back_when_gear_cannot_hold_target():
+    drive = DriveCycleSimulator(EngineSimulator())
+    drive.speed = 100 / 3.6               # first gear: past the upshift point
+    assert drive._cruise(10.0, 100.0) is None
+    assert drive.speed == pytest.approx(100 / 3.6)
+    assert drive.distance == 0.0
+    drive.sim.gear = "4"
+    assert drive._cruise(10.0, 100.0) is not None
+    assert drive.distance == pytest.approx(100 / 3.6 * 10.0)
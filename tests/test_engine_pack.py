@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from engine.batch import BatchEngineSimulator
+from engine.engine_pack import write_pack
+from engine.engine_registry import export_pack, import_pack, scan_engines
+from engine.simulator import EngineSimulator
+
+
+def test_pack_round_trip_matches_loose_folders(tmp_path):
+    pack  = tmp_path / "engines.etpk"
+    loose = scan_engines()
+    assert export_pack(pack) == len(loose)
+
+    packed = scan_engines(pack)
+    assert set(packed) == set(loose)
+    for key, meta in loose.items():
+        assert packed[key]["display"] == meta["display"]
+        assert packed[key]["redline"] == meta["redline"]
+
+    for key in loose:
+        a, b = EngineSimulator(), EngineSimulator(pack)
+        a.load_engine(key)
+        b.load_engine(key)
+        rpms = np.linspace(0, 9000, 301)
+        assert np.array_equal(a._torque_model.torque_at_many(rpms),
+                              b._torque_model.torque_at_many(rpms))
+        assert b._torque_model.torque_at(4321.0) == a._torque_model.torque_at(4321.0)
+        # zero-copy: the curve is a view on the mapped file
+        assert not b._torque_model.rpms.flags.owndata
+
+
+def test_batch_accepts_pack_and_import_restores_folders(tmp_path):
+    pack = tmp_path / "engines.etpk"
+    export_pack(pack)
+    batch = BatchEngineSimulator(4, "coyote", source=pack)
+    assert batch.redline == scan_engines()["coyote"]["redline"]
+
+    written = import_pack(pack, tmp_path / "authoring")
+    restored = scan_engines(tmp_path / "authoring")
+    assert sorted(written) == sorted(restored)
+    assert restored["coyote"]["display"] == scan_engines()["coyote"]["display"]
+
+
+def test_import_restores_curves_exactly(tmp_path):
+    src = tmp_path / "src" / "odd"
+    src.mkdir(parents=True)
+    (src / "meta.json").write_text('{"name": "Odd", "redline": 7000, '
+                                   '"curve": "torque_curve.csv"}')
+    (src / "torque_curve.csv").write_text(
+        "RPM,Torque\n1000.123456789,201.98765432101\n6999.5,333.3333333333333\n")
+    pack = tmp_path / "odd.etpk"
+    export_pack(pack, tmp_path / "src")
+    import_pack(pack, tmp_path / "back")
+    a, b = EngineSimulator(tmp_path / "src"), EngineSimulator(tmp_path / "back")
+    a.load_engine("odd")
+    b.load_engine("odd")
+    assert np.array_equal(a._torque_model.rpms, b._torque_model.rpms)
+    assert np.array_equal(a._torque_model.torques, b._torque_model.torques)
+
+
+def test_long_keys_are_rejected(tmp_path):
+    key = "k" * 33
+    with pytest.raises(ValueError, match="32 bytes"):
+        write_pack(tmp_path / "x.etpk", {key: {"curve": None}})
+
+
+def test_malformed_curve_fails_the_write(tmp_path):
+    src = tmp_path / "src" / "broken"
+    src.mkdir(parents=True)
+    (src / "meta.json").write_text('{"name": "Broken", "curve": "torque_curve.csv"}')
+    (src / "torque_curve.csv").write_text("RPM,Torque\n1000,200\n2000,abc\n")
+    with pytest.raises(ValueError, match="Engine 'broken'"):
+        export_pack(tmp_path / "x.etpk", tmp_path / "src")
+    assert not (tmp_path / "x.etpk").exists()
+
+
+def test_idle_round_trips_as_float_and_missing_stays_missing(tmp_path):
+    pack = tmp_path / "x.etpk"
+    write_pack(pack, {"frac": {"curve": None, "idle": 850.5},
+                      "zero": {"curve": None, "idle": 0},
+                      "none": {"curve": None}})
+    packed = scan_engines(pack)
+    assert packed["frac"]["idle"] == 850.5
+    assert packed["zero"]["idle"] == 0.0
+    assert "idle" not in packed["none"]
@@ -0,0 +1,95 @@
+import json
+import os
+
+from engine import engine_registry
+from engine.engine_registry import INDEX_NAME, add_engine, scan_engines
+
+
+def _make_engine(root, key, redline=7000):
+    folder = root / key
+    folder.mkdir(parents=True)
+    (folder / "meta.json").write_text(json.dumps({"name": key.upper(),
+                                                  "redline": redline}))
+    (folder / "torque_curve.csv").write_text("RPM,Torque\n1000,100\n7000,200\n")
+    return folder
+
+
+def test_unchanged_engines_are_not_reparsed(tmp_path, monkeypatch):
+    for i in range(5):
+        _make_engine(tmp_path, f"e{i}")
+    assert len(scan_engines(tmp_path)) == 5
+    assert (tmp_path / INDEX_NAME).exists()
+
+    reads = []
+    real_loads = json.loads
+    monkeypatch.setattr(engine_registry.json, "loads",
+                        lambda raw, *a, **k: reads.append(raw) or
+                        real_loads(raw, *a, **k))
+    engine_registry._INDEXES.clear()          # fresh process: index from disk
+    engines = scan_engines(tmp_path)
+
+    assert len(reads) == 1                    # the index file only
+    assert engines["e3"]["redline"] == 7000
+    assert engines["e3"]["curve"] == tmp_path / "e3" / "torque_curve.csv"
+
+
+def test_changed_and_removed_engines_are_picked_up(tmp_path):
+    folder = _make_engine(tmp_path, "a")
+    _make_engine(tmp_path, "b")
+    scan_engines(tmp_path)
+
+    (folder / "meta.json").write_text(json.dumps({"name": "A", "redline": 9000}))
+    st = (folder / "meta.json").stat()
+    os.utime(folder / "meta.json", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    for f in (tmp_path / "b").iterdir():
+        f.unlink()
+    (tmp_path / "b").rmdir()
+
+    engines = scan_engines(tmp_path)
+    assert list(engines) == ["a"]
+    assert engines["a"]["redline"] == 9000
+
+
+def test_add_engine_updates_index_incrementally(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine_registry, "ENGINE_ROOT", tmp_path)
+    src = _make_engine(tmp_path / "src", "x") / "torque_curve.csv"
+    key = add_engine("My Engine", 800, 6500, src)
+
+    index = json.loads((tmp_path / INDEX_NAME).read_text())
+    assert index["engines"][key]["meta"]["redline"] == 6500
+    assert scan_engines()[key]["display"] == "My Engine"
+
+
+def test_index_survives_concurrent_refresh_and_update(tmp_path):
+    import threading
+
+    for i in range(20):
+        _make_engine(tmp_path, f"e{i}")
+    idx = engine_registry._index(tmp_path)
+    errors = []
+
+    def scanner():
+        try:
+            for _ in range(30):
+                assert len(scan_engines(tmp_path)) >= 19
+        except Exception as exc:              # pragma: no cover - failure path
+            errors.append(exc)
+
+    def churn():
+        try:
+            for n in range(30):
+                folder = tmp_path / "e0"
+                (folder / "meta.json").write_text(json.dumps({"name": f"v{n}"}))
+                with idx.lock:
+                    idx.update("e0")
+                    idx.save()
+        except Exception as exc:              # pragma: no cover - failure path
+            errors.append(exc)
+
+    threads = [threading.Thread(target=f) for f in (scanner, scanner, churn)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert json.loads((tmp_path / INDEX_NAME).read_text())["version"] == 1
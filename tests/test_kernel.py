@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from engine.kernel import HAVE_NUMBA, run_trace_kernel
+from engine.runner import InputTrace, run_trace
+from engine.simulator import EngineSimulator
+
+TRACE = InputTrace(
+    time=np.array([0.0, 2.0, 2.5, 4.0, 5.0, 6.5, 8.0]),
+    throttle=np.array([100.0, 0.0, 100.0, 60.0, 0.5, 100.0, 100.0]),
+    gear=("1", "2", "2", "3", "N", "4", "4"),
+    timing=np.array([10.0, 12.0, 24.0, 24.0, 18.0, 30.0, 30.0]),
+    boost_cmd=np.array([5.0, 5.0, 15.0, 22.0, 0.0, 25.0, 25.0]),
+    afr=np.array([13.5, 13.5, 12.0, 11.0, 14.7, 11.5, 11.5]),
+)
+
+
+def _assert_equivalent(a, b):
+    assert np.allclose(a.hp, b.hp, rtol=1e-9, atol=1e-9)
+    assert np.allclose(a.rpm, b.rpm, rtol=1e-12)
+    assert np.allclose(a.mpg, b.mpg, rtol=1e-12)
+    assert np.allclose(a.boost, b.boost, rtol=1e-12)
+    assert np.array_equal(a.knock, b.knock)
+    assert np.array_equal(a.gear, b.gear)
+
+
+@pytest.mark.parametrize("engine", ["k20", "coyote"])
+def test_python_kernel_matches_runner(engine):
+    ref_sim, sim = EngineSimulator(), EngineSimulator()
+    ref_sim.load_engine(engine)
+    sim.load_engine(engine)
+
+    ref = run_trace(ref_sim, TRACE, dt=0.001)
+    out = run_trace_kernel(sim, TRACE, dt=0.001, backend="python")
+
+    _assert_equivalent(out, ref)
+    assert len(set(out.knock.tolist())) == 3
+    assert sim._rpm == pytest.approx(ref_sim._rpm)
+    assert sim.gear == ref_sim.gear
+
+
+@pytest.mark.skipif(not HAVE_NUMBA, reason="numba not installed")
+def test_numba_kernel_matches_python_kernel():
+    py  = run_trace_kernel(EngineSimulator(), TRACE, dt=0.001, backend="python")
+    jit = run_trace_kernel(EngineSimulator(), TRACE, dt=0.001, backend="numba")
+    _assert_equivalent(jit, py)
+
+
+def test_numba_backend_requires_numba():
+    if HAVE_NUMBA:
+        pytest.skip("numba installed")
+    with pytest.raises(RuntimeError):
+        run_trace_kernel(EngineSimulator(), TRACE, backend="numba")
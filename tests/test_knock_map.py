@@ -0,0 +1,75 @@
+import numpy as np
+
+from engine.batch import knock_code, knock_score
+from engine.knock_map import KnockMap, knock_map
+from engine.simulator import EngineSimulator
+
+
+def _points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.uniform(0, 30, n), rng.uniform(0, 40, n), rng.uniform(10, 16, n))
+
+
+def test_matches_simulator_on_grid_and_never_under_reports():
+    m = knock_map()
+    boost, timing, afr = _points(20_000)
+    exact = knock_code(knock_score(timing, boost, afr))
+    assert np.all(m.level(boost, timing, afr) >= exact)
+
+    on_grid = np.round(boost * 2) / 2, timing, np.round(afr * 10) / 10
+    assert np.array_equal(m.level(*on_grid),
+                          knock_code(knock_score(on_grid[1], on_grid[0],
+                                                 on_grid[2])))
+
+    sim = EngineSimulator()
+    sim.timing, sim._boost, sim.afr = 24.0, 14.0, 12.0
+    assert m.level(14.0, 24.0, 12.0) == ["LOW", "MED", "HIGH"].index(
+        sim._calc_knock())
+
+
+def test_scalar_and_vector_queries_agree():
+    m = knock_map()
+    boost, timing, afr = _points(2_000, seed=1)
+    vec = m.safe(boost, timing, afr, max_knock="MED")
+    assert [m.is_safe(b, t, a, "MED") for b, t, a in zip(boost, timing, afr)] \
+        == vec.tolist()
+    assert m.is_safe(30.0, 40.0, 10.0, max_knock="HIGH")
+
+
+def test_margin_lands_on_the_boundary():
+    m = knock_map()
+    # 14 psi / AFR 12.8 → 3 points of score from boost, MED above 6
+    assert m.margin(14.0, 18.0, 12.8) == 5.0          # 23° timing is the limit
+    assert m.margin(14.0, 18.0, 12.8, axis="boost") == 2.0
+    assert m.margin(14.0, 26.0, 12.8) == -3.0         # pull 3° to be safe
+    assert m.margin(0.0, 0.0, 15.0, axis="afr") == 4.5
+    assert m.margin(0.0, 0.0, 15.0, axis="afr", max_knock="MED") == np.inf
+
+
+def test_index_is_sparse_and_envelope_is_monotone():
+    m = KnockMap()
+    grid_bytes = np.prod([ax.n for ax in m.axes.values()]) * 8
+    assert m.nbytes < grid_bytes / 5
+
+    xs, ys, safe = m.envelope("timing", "boost", afr=13.0)
+    assert safe.shape == (len(ys), len(xs)) and safe[0, 0] and not safe[-1, -1]
+    # more boost never allows more timing
+    first_unsafe = np.argmin(safe, axis=1)
+    assert np.all(np.diff(first_unsafe[~safe.all(axis=1)]) <= 0)
+
+
+def test_points_outside_the_axes_use_the_exact_score():
+    m = knock_map()
+    # AFR 8 is below the axis: (12.5 - 8) · 3 = 13.5 → HIGH, not the clipped MED
+    assert m.level(0.0, 0.0, 8.0) == 2
+    assert not m.is_safe(0.0, 0.0, 8.0, max_knock="MED")
+    assert not m.safe(0.0, 0.0, 8.0, max_knock="MED")
+    assert m.is_safe(0.0, 0.0, 20.0) and m.safe(0.0, 0.0, 20.0)
+
+    boost, timing, afr = (np.array([40.0, 10.0]), np.array([10.0, 50.0]),
+                          np.array([13.0, 13.0]))
+    exact = knock_code(knock_score(timing, boost, afr))
+    assert np.array_equal(m.level(boost, timing, afr), exact)
+    assert [m.is_safe(b, t, a) for b, t, a in zip(boost, timing, afr)] \
+        == (exact == 0).tolist()
+    assert np.isnan(m.margin(0.0, 0.0, 8.0))
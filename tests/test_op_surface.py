@@ -0,0 +1,103 @@
+import math
+
+import numpy as np
+import pytest
+
+from engine.batch import calc_knock, calc_mpg, calc_power
+from engine.engine_registry import ENGINE_ROOT
+from engine.op_surface import CACHE_DIR, OperatingSurface, user_cache_dir
+from engine.simulator import EngineSimulator
+
+
+@pytest.fixture
+def sim():
+    sim = EngineSimulator()
+    sim.load_engine("coyote")
+    return sim
+
+
+def _direct(sim, rpm, boost, timing, afr, throttle):
+    torque = sim._torque_model.torque_at_many(rpm)
+    return (calc_power(torque, rpm, boost, afr, timing, throttle),
+            calc_knock(timing, boost, afr), calc_mpg(afr, throttle))
+
+
+def test_matches_direct_model(sim, tmp_path):
+    surf = OperatingSurface.for_simulator(sim, cache_dir=tmp_path)
+    rng = np.random.default_rng(3)
+    n = 500
+    pts = (rng.uniform(sim.idle_rpm, sim.redline, n), rng.uniform(0, 30, n),
+           rng.uniform(0, 40, n), rng.uniform(10, 16, n),
+           rng.uniform(0, 100, n))
+    hp, knock, mpg = surf.sample_many(*pts)
+    ref_hp, ref_knock, ref_mpg = _direct(sim, *pts)
+
+    assert np.allclose(hp, ref_hp, rtol=0.02)
+    assert np.array_equal(knock, ref_knock)
+    assert np.allclose(mpg, ref_mpg)
+
+    one = surf.sample(*(p[0] for p in pts))
+    assert one[0] == pytest.approx(hp[0])
+    assert one[1] == ("LOW", "MED", "HIGH")[knock[0]]
+
+
+def test_afr_steps_are_exact(sim):
+    surf = OperatingSurface.for_simulator(sim, cache_dir=None)
+    afr  = np.array([11.9, 11.99, 12.0, 12.01, 13.0, 13.59, 13.6, 13.61, 13.7])
+    rpm  = surf.axes["rpm"].nodes()[12]             # on-node → exact torque
+    hp, _, _ = surf.sample_many(rpm, 10.0, 15.0, afr, 100.0)
+    ref, _, _ = _direct(sim, np.full(afr.shape, rpm), 10.0, 15.0, afr, 100.0)
+    assert np.allclose(hp, ref)
+    assert [surf.sample(rpm, 10.0, 15.0, a, 100.0)[0] for a in afr] \
+        == pytest.approx(ref.tolist())
+
+
+def test_closed_throttle_mpg_step_is_exact(sim):
+    surf = OperatingSurface.for_simulator(sim, cache_dir=None)
+    thr  = np.array([0.0, 0.5, 0.99, 1.0, 2.0, 5.0, 10.0])
+    _, _, mpg = surf.sample_many(4000, 10.0, 15.0, 13.0, thr)
+    _, _, ref = _direct(sim, np.full(thr.shape, 4000.0), 10.0, 15.0, 13.0, thr)
+    assert np.allclose(mpg, ref)
+    assert [surf.sample(4000, 10.0, 15.0, 13.0, t)[2] for t in thr] \
+        == pytest.approx(ref.tolist())
+
+
+def test_default_cache_is_per_user(monkeypatch, tmp_path):
+    monkeypatch.setenv("ENGINE_TUNER_CACHE", str(tmp_path))
+    assert user_cache_dir() == tmp_path / "surfaces"
+    assert ENGINE_ROOT not in CACHE_DIR.parents
+
+
+def test_tiles_are_lazy_and_cached_on_disk(sim, tmp_path):
+    surf = OperatingSurface.for_simulator(sim, cache_dir=tmp_path)
+    surf.sample(4000, 10, 15, 13, 100)
+    assert surf.tiles_built == 1
+    assert len(list((tmp_path / surf.key).glob("*.npy"))) == 1
+
+    again = OperatingSurface.for_simulator(sim, cache_dir=tmp_path)
+    assert again.sample(4000, 10, 15, 13, 100) == surf.sample(4000, 10, 15, 13, 100)
+    assert again.tiles_built == 0
+
+    other = EngineSimulator()
+    other.load_engine("k20")
+    assert OperatingSurface.for_simulator(other, cache_dir=tmp_path).key != surf.key
+
+
+def test_best_timing_respects_knock(sim):
+    surf = OperatingSurface.for_simulator(sim, cache_dir=None)
+    # boost 14 contributes 3 to the score, so LOW allows timing up to 23
+    timing, hp = surf.best_timing(5000, 14)
+    assert timing == pytest.approx(23.0)
+    assert surf.sample(5000, 14, timing, 13.0, 100.0)[1] == "LOW"
+    assert surf.best_timing(5000, 14, max_knock="MED")[0] == pytest.approx(29.0)
+    assert math.isnan(surf.best_timing(5000, 30, afr=10.5)[0])
+
+
+def test_heatmap(sim):
+    surf = OperatingSurface.for_simulator(sim, cache_dir=None)
+    rpm = surf.axes["rpm"].nodes()[20]          # on-node → exact
+    xs, ys, hp = surf.heatmap("boost", "timing", rpm=rpm, afr=13, throttle=100)
+    assert hp.shape == (ys.size, xs.size)
+    ref, _, _ = _direct(sim, np.full(hp.shape, rpm), xs[None, :], ys[:, None],
+                        13.0, 100.0)
+    assert np.allclose(hp, ref)
@@ -0,0 +1,39 @@
+import math
+
+from engine.optimizer import TuneOptimizer, pareto_front
+from engine.sweep import PullSpec
+
+
+def test_pareto_front_drops_dominated_rows():
+    rows = [{"peak_hp": 300, "avg_mpg": 10}, {"peak_hp": 280, "avg_mpg": 12},
+            {"peak_hp": 270, "avg_mpg": 11}, {"peak_hp": 250, "avg_mpg": 15}]
+    assert pareto_front(rows) == [rows[0], rows[1], rows[3]]
+
+
+def test_optimizer_finds_clean_tune_and_caches():
+    opt = TuneOptimizer("coyote", PullSpec(duration=3.0, dt=0.02, throttle=90.0))
+    result = opt.run(population=24, generations=6, seed=4)
+
+    assert result.best is not None
+    assert result.best["knock_med"] == result.best["knock_high"] == 0
+    assert result.pruned > 0
+    assert not any(math.isnan(h) for h in result.history)
+    assert result.best["peak_hp"] >= max(result.history)
+
+    for a, b in zip(result.front, result.front[1:]):
+        assert a["peak_hp"] >= b["peak_hp"] and a["avg_mpg"] < b["avg_mpg"]
+
+    runs = opt.evaluations
+    point = {k: result.best[k] for k in ("timing", "boost_cmd", "afr")}
+    assert opt.evaluate([point]) == [result.best]
+    assert opt.evaluations == runs
+
+
+def test_pool_and_in_process_agree():
+    points = [{"timing": 18.0, "boost_cmd": 10.0, "afr": 13.0},
+              {"timing": 30.0, "boost_cmd": 20.0, "afr": 11.5}]
+    pull = PullSpec(duration=1.0, dt=0.02)
+    local = TuneOptimizer("k20", pull, workers=0).evaluate(points)
+    pool  = TuneOptimizer("k20", pull, workers=2, chunk_size=1).evaluate(points)
+    assert local == pool
+    assert [r["pruned"] for r in local] == [0, 1]
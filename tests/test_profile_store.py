@@ -0,0 +1,124 @@
+import json
+import os
+
+from engine.config_loader import ConfigLoader
+from engine.profile_store import INDEX_NAME, ProfileStore
+
+
+def _profile(boost=12.0):
+    return {"boost_level": boost, "turbo_map": "Balanced",
+            "gear_ratios": {"1": 3.82, "2": 2.20}}
+
+
+def test_save_load_roundtrip_is_atomic_and_cached(tmp_path):
+    store = ProfileStore(tmp_path)
+    assert store.save("Track Day", _profile(18.0)).result() == "track-day"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [INDEX_NAME,
+                                                          "track-day.json"]
+
+    loaded = store.load("track day").result()
+    assert loaded == _profile(18.0)
+    loaded["boost_level"] = 0.0                  # caller owns its copy
+    assert store.load("Track Day").result()["boost_level"] == 18.0
+    assert store.stats()["reads"] == 0           # served from the cache
+    store.close()
+
+    fresh = ProfileStore(tmp_path)
+    assert fresh.load("Track Day").result() == _profile(18.0)
+    assert fresh.stats()["misses"] == 1
+    fresh.close()
+
+
+def test_list_uses_index_and_picks_up_outside_edits(tmp_path):
+    store = ProfileStore(tmp_path)
+    for i in range(5):
+        store.save(f"Map {i}", _profile(10.0 + i))
+    store.close()
+
+    store = ProfileStore(tmp_path)
+    rows = store.list().result()
+    assert [r["name"] for r in rows] == [f"Map {i}" for i in range(5)]
+    assert rows[3]["boost_level"] == 13.0 and "gear_ratios" not in rows[3]
+    assert store.stats()["reads"] == 0           # no profile opened
+
+    path = tmp_path / "map-2.json"
+    path.write_text(json.dumps(_profile(21.5)))
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    (tmp_path / "map-4.json").unlink()
+    rows = {r["key"]: r for r in store.list().result()}
+    assert rows["map-2"]["boost_level"] == 21.5 and "map-4" not in rows
+    assert store.stats()["reads"] == 1
+    assert store.delete("Map 0").result() and not store.delete("Map 0").result()
+    store.close()
+
+
+def test_lru_keeps_recent_profiles(tmp_path):
+    store = ProfileStore(tmp_path, cache_size=2)
+    for name in ("a", "b", "c"):
+        store.save(name, _profile()).result()     # cached once written
+    store.load("b").result()
+    assert store.stats()["cached"] == 2
+    store.load("a").result()                     # evicted → disk
+    assert store.stats()["reads"] == 1
+    store.close()
+
+
+def test_cache_is_checked_against_the_file_stamp(tmp_path):
+    store = ProfileStore(tmp_path)
+    store.save("a", _profile(12.0)).result()
+    path = tmp_path / "a.json"
+    path.write_text(json.dumps(_profile(19.5)))       # edited outside the store
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert store.load("a").result()["boost_level"] == 19.5
+    assert store.load("a").result()["boost_level"] == 19.5
+    assert store.stats()["reads"] == 1 and store.stats()["hits"] == 1
+    path.unlink()
+    assert store.load("a").exception() is not None
+    store.close()
+
+
+def test_non_object_index_is_ignored(tmp_path):
+    for raw in ("[1, 2]", "null", '"x"', '{"version": 1, "profiles": []}'):
+        (tmp_path / INDEX_NAME).write_text(raw)
+        store = ProfileStore(tmp_path)
+        store.save("a", _profile()).result()
+        assert [r["name"] for r in store.list().result()] == ["a"]
+        store.close()
+
+
+def test_config_loader_save_leaves_no_temp_files(tmp_path):
+    dest = tmp_path / "preset.json"
+    ConfigLoader.save({"boost": 1}, dest)
+    ConfigLoader.save({"boost": 2}, dest)
+    assert ConfigLoader.load(dest) == {"boost": 2}
+    assert [p.name for p in tmp_path.iterdir()] == ["preset.json"]
+
+
+def test_failed_save_is_not_served_from_cache(tmp_path):
+    store = ProfileStore(tmp_path / "file")
+    (tmp_path / "file").write_text("not a folder")
+    assert store.save("a", _profile()).exception() is not None
+    assert store.stats()["cached"] == 0
+    assert store.load("a").exception() is not None   # went to disk, not memory
+    store.close()
+
+
+def test_legacy_profile_is_imported_once(tmp_path):
+    legacy = tmp_path / "profiles" / "custom_profile.json"
+    legacy.parent.mkdir()
+    legacy.write_text(json.dumps(_profile(17.0)))
+    root = tmp_path / "maps"
+    root.mkdir()
+
+    store = ProfileStore(root, legacy=legacy)
+    assert [r["name"] for r in store.list().result()] == ["Custom Profile"]
+    assert store.load("Custom Profile").result() == _profile(17.0)
+    store.delete("Custom Profile").result()
+    store.close()
+
+    again = ProfileStore(root, legacy=legacy)
+    assert again.list().result() == []              # not re-imported
+    again.close()
+    assert legacy.exists()
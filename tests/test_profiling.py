@@ -0,0 +1,67 @@
+from engine.profiling import (Profiler, disable_profiling, enable_profiling,
+                              instrument_methods)
+from engine.simulator import EngineSimulator
+
+
+def _run(sim, ticks=50):
+    sim.engine_on, sim.throttle, sim.gear = True, 100.0, "3"
+    return [sim.step(0.01) for _ in range(ticks)]
+
+
+def test_profiling_records_stages_and_keeps_results():
+    plain, profiled = EngineSimulator(), EngineSimulator()
+    prof = Profiler()
+    enable_profiling(profiled, prof)
+
+    assert _run(profiled) == _run(plain)
+    snap = prof.snapshot()
+    for stage in ("step", "_update_rpm", "_update_boost", "_calc_power",
+                  "_calc_knock", "_calc_mpg", "torque_at"):
+        assert snap[stage]["calls"] == 50
+    assert snap["step"]["total_ms"] >= snap["_calc_power"]["total_ms"]
+
+    profiled.load_engine("k20")                # proxy survives engine swaps
+    _run(profiled, 1)
+    assert prof.snapshot()["torque_at"]["calls"] == 51
+
+
+def test_disable_restores_plain_class():
+    sim = EngineSimulator()
+    model = sim._torque_model
+    enable_profiling(sim, Profiler())
+    disable_profiling(sim)
+    assert type(sim) is EngineSimulator and sim._torque_model is model
+
+
+def test_instrument_methods_and_log_line():
+    class Widget:
+        def redraw(self, x):
+            return x * 2
+
+    w, prof, lines = Widget(), Profiler(), []
+    restore = instrument_methods(w, ["redraw"], prof, prefix="ui.")
+    assert w.redraw(4) == 8
+    assert prof.maybe_log(0.0, lines.append) and "ui.redraw" in lines[0]
+    restore()
+    assert "redraw" not in vars(w)
+
+
+def test_startup_report_times_nested_imports(tmp_path, monkeypatch):
+    from engine.profiling import StartupReport
+
+    (tmp_path / "st_outer.py").write_text("import st_inner\nVALUE = st_inner.VALUE\n")
+    (tmp_path / "st_inner.py").write_text("VALUE = 42\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    report = StartupReport()
+    import st_outer
+    report.mark("imports")
+    lines = []
+    report.emit(log=lines.append)
+
+    assert st_outer.VALUE == 42
+    records = {name: (s, c, d) for name, s, c, d in report.imports.records}
+    assert records["st_inner"][2] == records["st_outer"][2] + 1
+    assert records["st_outer"][1] >= records["st_inner"][1]
+    assert lines[0].startswith("[Startup] imports")
+    assert any(line.endswith("  st_inner") for line in lines)
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from engine.realtime import SimulationThread, SnapshotBuffer
+from engine.simulator import EngineSimulator
+
+
+def test_snapshot_buffer_returns_last_published():
+    buf = SnapshotBuffer()
+    assert buf.latest() is None
+    for i in range(5):
+        buf.publish((i, i * 2))
+    assert buf.latest() == (4, 8)
+
+
+def test_simulation_thread_ticks_at_fixed_rate():
+    sim = EngineSimulator()
+    sim.engine_on, sim.throttle, sim.gear = True, 100.0, "2"
+
+    thread = SimulationThread(sim.step, rate_hz=1000)
+    thread.start()
+    time.sleep(0.2)
+    thread.stop()
+
+    hp, knock, mpg, rpm = thread.buffer.latest()
+    assert 50 <= thread.ticks <= 400
+    assert hp > 0 and rpm > 0
+    assert not thread.running
+
+
+def test_tick_error_stops_the_thread_and_is_kept():
+    calls = []
+
+    def tick(dt):
+        calls.append(dt)
+        if len(calls) == 3:
+            raise ZeroDivisionError("bad tick")
+        return len(calls)
+
+    thread = SimulationThread(tick, rate_hz=1000)
+    thread.start()
+    deadline = time.perf_counter() + 1.0
+    while thread.running and time.perf_counter() < deadline:
+        time.sleep(0.005)
+
+    assert not thread.running
+    assert isinstance(thread.error, ZeroDivisionError)
+    assert thread.ticks == 2 and thread.buffer.latest() == 2
+    thread.stop()
+    thread.tick = lambda dt: 0
+    thread.start()
+    assert thread.error is None
+    thread.stop()
+
+
+def test_start_waits_for_a_loop_that_outlived_stop():
+    release = threading.Event()
+    lock    = threading.Lock()
+    loops   = set()
+
+    def tick(dt):
+        with lock:
+            loops.add(threading.current_thread())
+        release.wait()
+        return 0
+
+    thread = SimulationThread(tick, rate_hz=1000)
+    thread.start()
+    while not loops:
+        time.sleep(0.001)
+    assert thread.stop(timeout=0.01) is False      # stuck in tick()
+    assert thread.running
+    with pytest.raises(RuntimeError, match="has not exited"):
+        thread.start(timeout=0.01)
+
+    release.set()
+    thread.start()                                 # joins the old loop first
+    time.sleep(0.02)
+    assert thread.stop() is True
+    assert not thread.running
+    # the stuck loop never resumed next to its replacement
+    assert len(loops) == 2 and not any(t.is_alive() for t in loops)
@@ -0,0 +1,61 @@
+import re
+
+import numpy as np
+import pytest
+
+import headless
+from engine.runner import InputTrace, run_trace, wot_pull
+from engine.simulator import EngineSimulator
+
+
+def test_wot_pull_matches_manual_stepping():
+    result = run_trace(EngineSimulator(), wot_pull(2.0, gear="2"), dt=0.01)
+
+    sim = EngineSimulator()
+    sim.engine_on, sim.throttle, sim.gear = True, 100.0, "2"
+    sim._rpm = sim.idle_rpm
+    expected = np.array([sim.step(0.01)[0] for _ in range(200)])
+
+    assert len(result.hp) == 200
+    assert np.allclose(result.hp, expected)
+    assert result.summary()["peak_hp"] == result.hp.max()
+
+
+def test_trace_csv_shifts_gears(tmp_path):
+    path = tmp_path / "trace.csv"
+    path.write_text("time,throttle,gear,timing\n"
+                    "0,100,2,10\n1,100,3,12\n2,0,3,12\n")
+    result = run_trace(EngineSimulator(), InputTrace.from_csv(path), dt=0.1)
+
+    gears = [result.gear_order[g] for g in result.gear]
+    assert gears[:10] == ["2"] * 10 and gears[10:] == ["3"] * 10
+    assert result.rpm[10] < result.rpm[9]          # up-shift drops rpm
+
+
+@pytest.mark.parametrize("text, message", [
+    ("time,throttle,gear\n0,100,2\n", "missing column(s) timing"),
+    ("time,throttle,gear,timing\n", "no rows"),
+    ("time,throttle,gear,timing\n0,100,2,10\n1,,3,12\n", "line 3: 'throttle' is blank"),
+    ("time,throttle,gear,timing\n0,100,2,10\n1,100,,12\n", "line 3: 'gear' is blank"),
+    ("time,throttle,gear,timing\n0,100,2,ten\n", "line 2: 'timing' is not a number"),
+    ("time,throttle,gear,timing\n,100,2,10\n1,100,2,10\n", "line 2: 'time' is blank"),
+    ("time,throttle,gear,timing\n0,100,2,\n", "line 2: 'timing' is blank"),
+    ("time,throttle,gear,timing\n0,100,2,10\n2,100,3,10\n1,0,3,10\n",
+     "line 4: 'time' must be strictly increasing"),
+    ("time,throttle,gear,timing\n0,100,2,10\n0,100,3,10\n",
+     "line 3: 'time' must be strictly increasing"),
+])
+def test_trace_csv_errors_name_the_problem(tmp_path, text, message):
+    path = tmp_path / "trace.csv"
+    path.write_text(text)
+    with pytest.raises(ValueError, match=re.escape(message)):
+        InputTrace.from_csv(path)
+
+
+@pytest.mark.parametrize("args", [["--repeat", "0"], ["--dt", "0"],
+                                  ["--dt", "-0.01"], ["--duration", "0"],
+                                  ["--duration", "nan"]])
+def test_headless_rejects_non_positive_arguments(capsys, args):
+    with pytest.raises(SystemExit):
+        headless.build_parser().parse_args(args)
+    assert args[0] in capsys.readouterr().err
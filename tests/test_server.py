@@ -0,0 +1,119 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from engine.batch import BatchEngineSimulator
+from engine.server import MAX_BODY, SimServer, fetch
+from engine.simulator import EngineSimulator
+from engine.sweep import PullSpec, evaluate_points
+
+
+def _serve(scenario, **kwargs):
+    async def main():
+        server = await SimServer(window=0.02, **kwargs).start()
+        try:
+            return await scenario(server, lambda *a: fetch(*a, port=server.port))
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_concurrent_points_are_coalesced_and_match_simulator():
+    points = [{"engine": "coyote", "rpm": 1500.0 + 100 * i, "boost": 10.0,
+               "timing": 14.0 + i % 10, "afr": 12.8, "throttle": 80.0}
+              for i in range(40)]
+
+    async def scenario(server, call):
+        replies = await asyncio.gather(*(call("POST", "/point", p) for p in points))
+        return replies, (await call("GET", "/metrics"))[1]
+
+    replies, metrics = _serve(scenario)
+    sim = EngineSimulator()
+    sim.load_engine("coyote")
+    for p, (status, reply) in zip(points, replies):
+        assert status == 200
+        sim._boost, sim.timing, sim.afr, sim.throttle, sim._rpm = (
+            p["boost"], p["timing"], p["afr"], p["throttle"], p["rpm"])
+        assert reply["hp"] == pytest.approx(sim._calc_power())
+        assert reply["knock"] == sim._calc_knock()
+    assert metrics["requests"]["/point"] == 40
+    assert metrics["batches"]["point"] < 40
+    assert metrics["latency"]["/point"]["p99_ms"] > 0
+
+
+@pytest.mark.parametrize("offload_at", [1000, 2])
+def test_pull_batches_match_evaluate_points(offload_at):
+    spec = {"duration": 1.0, "dt": 0.02, "start_gear": "2"}
+    points = [{"timing": t, "boost_cmd": b, "afr": 13.0}
+              for t in (10.0, 22.0) for b in (5.0, 18.0)]
+
+    async def scenario(server, call):
+        replies = await asyncio.gather(*(call("POST", "/pull",
+                                              {"engine": "k20", **spec, **p})
+                                         for p in points))
+        return replies, server.metrics.snapshot()
+
+    replies, metrics = _serve(scenario, offload_at=offload_at, workers=1)
+    ref = evaluate_points(BatchEngineSimulator(0, "k20"), points, PullSpec(**spec))
+    assert [r for _, r in replies] == ref
+    assert metrics["batches"]["pull"] == 1
+    assert metrics["offloaded"] == (1 if offload_at == 2 else 0)
+
+
+def test_errors_are_reported():
+    point = {"engine": "k20", "rpm": 3000, "boost": 10, "timing": 15,
+             "afr": 12.5, "throttle": 100}
+
+    async def scenario(server, call):
+        return [await call("POST", "/point", {"engine": "nope"}),
+                await call("POST", "/point", {"engine": "k20", "rpm": "fast"}),
+                *[await call("POST", "/point", {**point, "rpm": rpm})
+                  for rpm in (True, "3000", float("nan"), float("-inf"))],
+                await call("GET", "/point"),
+                await call("GET", "/nowhere"),
+                await call("GET", "/engines")]
+
+    (bad_engine, bad_value, *lax, method, missing, engines) = _serve(scenario)
+    assert bad_engine[0] == bad_value[0] == 400
+    assert "rpm" in bad_value[1]["error"]
+    assert [status for status, _ in lax] == [400] * 4
+    assert method[0] == 405 and missing[0] == 404
+    assert engines[0] == 200 and "k20" in engines[1]
+
+
+def test_bad_pull_specs_are_rejected():
+    bad = [{"dt": 0}, {"dt": -0.01}, {"duration": "8"}, {"duration": [1]},
+           {"dt": 0.5, "duration": 0.1}, {"throttle": True},
+           {"start_gear": ["2"]}, {"start_gear": "7"}, {"start_gear": "R"},
+           {"max_knock": "SEVERE"}, {"timing": True}, {"boost_cmd": "12"},
+           {"afr": float("nan")}, {"timing": float("inf")}]
+
+    async def scenario(server, call):
+        replies = [await call("POST", "/pull", {"engine": "k20", **b})
+                   for b in bad]
+        ok = await call("POST", "/pull", {"engine": "k20", "duration": 1,
+                                          "dt": 0.05, "start_gear": 2})
+        return replies, ok, server.metrics.snapshot()
+
+    replies, ok, metrics = _serve(scenario)
+    assert [status for status, _ in replies] == [400] * len(bad)
+    assert ok[0] == 200
+    assert metrics["batches"]["pull"] == 1
+
+
+def test_oversized_body_gets_413_and_the_connection_closes():
+    async def scenario(server, call):
+        reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+        body = b"x" * (MAX_BODY + 10)
+        writer.write(b"POST /point HTTP/1.1\r\nHost: x\r\n"
+                     b"Content-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        reply = await reader.read()               # until the server closes
+        writer.close()
+        return reply, await call("GET", "/engines")
+
+    reply, after = _serve(scenario)
+    assert reply.startswith(b"HTTP/1.1 413 ")
+    assert b"Connection: close" in reply and b"too large" in reply
+    assert after[0] == 200
@@ -0,0 +1,105 @@
+import pytest
+
+from engine.session import Session, SessionRecorder, replay
+from engine.simulator import EngineSimulator
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+def _record(path, clock=None):
+    clock = clock or _Clock()
+    header = {"gear_ratios": {"1": 3.8, "2": 2.2, "3": 1.5}, "boost": 8.0,
+              "turbo_map": "Balanced", "dt": 0.001, "frame_dt": 0.016}
+    script = [(0.01, "shift", +1), (0.02, "shift", +1), (0.03, "shift", -1),
+              (0.05, "drive", True), (0.20, "boost", 15.5),
+              (0.30, "turbo_map", "Fast Spool"), (0.40, "shift", +1),
+              (0.50, "turbo_map", "High-End"), (0.55, "turbo_map", "Fast Spool")]
+    with SessionRecorder(path, header, flush_every=2, clock=clock) as rec:
+        for t, kind, value in script:
+            clock.t = t
+            getattr(rec, kind)(value)
+        clock.t = 0.60
+    return path
+
+
+def test_roundtrip_interns_labels_and_tolerates_truncation(tmp_path):
+    path = _record(tmp_path / "s.etsn")
+    session = Session.load(path)
+    assert session.header["boost"] == 8.0
+    assert [(e.kind, e.value) for e in session.events] == [
+        ("shift", 1.0), ("shift", 1.0), ("shift", -1.0), ("drive", 1.0), ("boost", 15.5), ("turbo_map", "Fast Spool"),
+        ("shift", 1.0), ("turbo_map", "High-End"),
+        ("turbo_map", "Fast Spool"), ("end", 0.0)]
+    assert session.duration == 0.6
+
+    raw = path.read_bytes()
+    path.write_bytes(raw[:-5])                   # killed mid-write
+    assert [e.kind for e in Session.load(path).events][-1] == "turbo_map"
+
+
+def test_replay_is_deterministic_and_reports_percentiles(tmp_path):
+    session = Session.load(_record(tmp_path / "s.etsn"))
+    a = replay(session)
+    b = replay(session)
+    assert a.final == b.final
+    assert a.final["boost_cmd"] == 15.5 and a.final["turbo_map"] == "Fast Spool"
+    assert a.final["speed_kmh"] > 0
+    # ticks only from the drive start (t = 0.05 s) on, like the UI
+    assert a.ticks == 550 and a.frames == 35
+    assert set(a.tick_us) == {"p50", "p90", "p99", "max"}
+    assert a.tick_us["p50"] <= a.tick_us["max"]
+
+
+def test_realtime_replay_is_paced(tmp_path):
+    session = Session.load(_record(tmp_path / "s.etsn"))
+    report = replay(session, dt=0.004, realtime=True)
+    assert report.wall_s >= 0.55
+
+
+def test_replay_shifts_only_while_parked(tmp_path):
+    clock = _Clock()
+    header = {"gear_ratios": {"1": 3.8, "2": 2.2, "3": 1.5}}
+    with SessionRecorder(tmp_path / "p.etsn", header, clock=clock) as rec:
+        for t in (0.01, 0.02, 0.03, 0.04):
+            clock.t = t
+            rec.shift(+1)
+        clock.t = 0.05
+    report = replay(Session.load(tmp_path / "p.etsn"))
+    assert report.final["gear"] == 3                # clamped to the 3 ratios
+    assert report.ticks == report.frames == 0       # never drove
+    assert report.final["speed_kmh"] == 0.0
+
+
+def test_unknown_record_kind_is_an_error(tmp_path):
+    path = _record(tmp_path / "s.etsn")
+    raw = bytearray(path.read_bytes())
+    raw[-9] = 200                                 # kind byte of the last record
+    path.write_bytes(bytes(raw))
+    with pytest.raises(ValueError, match="unknown record kind 200"):
+        Session.load(path)
+
+
+def test_gear_ratio_events_apply_at_the_next_drive(tmp_path):
+    clock = _Clock()
+    header = {"gear_ratios": {"1": 3.8, "2": 2.2, "3": 1.5}}
+    with SessionRecorder(tmp_path / "g.etsn", header, clock=clock) as rec:
+        clock.t = 0.01
+        rec.shift(+1)
+        rec.shift(+1)
+        clock.t = 0.02
+        rec.gear_ratios({1: 3.0, 2: 1.9})
+        clock.t = 0.03
+        rec.drive(True)
+        clock.t = 0.05
+    session = Session.load(tmp_path / "g.etsn")
+    assert (session.events[2].kind, session.events[2].value) == \
+        ("gear_ratios", {"1": 3.0, "2": 1.9})
+    sim = EngineSimulator()
+    replay(session, sim=sim)
+    assert sim._gearbox.ratio("1") == 3.0 and sim._gearbox.ratio("2") == 1.9
@@ -2,8 +2,53 @@ from engine.simulator import EngineSimulator
 
 def test_power_increases_with_rpm():
     sim = EngineSimulator()
-    sim.rpm = 3000
+    sim.engine_on = True
+    sim.throttle = 100.0
+    sim.gear = "3"
+    sim._rpm = 3000
     low_hp, *_ = sim.step()
-    sim.rpm = 6000
+    sim._rpm = 6000
     high_hp, *_ = sim.step()
     assert high_hp > low_hp
+
+
+def test_simulator_state_is_slotted():
+    from engine.simulator import Gearbox
+    sim = EngineSimulator()
+    assert not hasattr(sim, "__dict__")
+    assert not hasattr(Gearbox(), "__dict__")
+
+
+def test_gear_is_index_backed():
+    sim = EngineSimulator()
+    sim.gear = "3"
+    assert sim._gear_idx == sim._gearbox.order.index("3")
+    sim.upshift()
+    assert sim.gear == "4"
+    sim.gear = "R"                       # unknown → neutral
+    assert sim.gear == "N"
+    sim._gearbox.update({"4": 1.1})
+    assert sim._gearbox.ratio("4") == 1.1 and sim._gearbox.ratios["4"] == 1.1
+
+
+def test_snapshot_restore_and_fork_replay_identically():
+    import numpy as np
+    from engine.simulator import STATE_SIZE
+
+    sim = EngineSimulator()
+    sim.engine_on, sim.throttle, sim.gear, sim.boost_cmd = True, 100.0, "2", 15.0
+    for _ in range(100):
+        sim.step(0.01)
+
+    fleet = np.zeros((3, STATE_SIZE))
+    sim.snapshot(fleet[1])               # written in place into the row
+    assert fleet[1].any() and not fleet[0].any() and not fleet[2].any()
+    ahead = [sim.step(0.01) for _ in range(50)]
+
+    sim.restore(fleet[1])
+    assert [sim.step(0.01) for _ in range(50)] == ahead
+
+    twin = sim.fork(fleet[1])
+    assert twin._torque_model is sim._torque_model
+    assert [twin.step(0.01) for _ in range(50)] == ahead
+    assert np.array_equal(twin.snapshot(), sim.snapshot())
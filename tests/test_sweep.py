@@ -0,0 +1,93 @@
+import csv
+
+import numpy as np
+
+from engine.batch import BatchEngineSimulator
+from engine.runner import run_trace, InputTrace
+from engine.simulator import EngineSimulator
+from engine.sweep import PullSpec, evaluate_points, grid, iter_sweep, run_sweep
+
+
+def test_grid_is_full_product():
+    points = list(grid(timing=[8, 12], boost_cmd=[5, 10, 15],
+                       ratios={"3": [1.4, 1.6]}))
+    assert len(points) == 12
+    assert points[0] == {"timing": 8.0, "boost_cmd": 5.0, "afr": 13.5,
+                         "ratio_3": 1.4}
+
+
+def test_single_gear_pull_matches_scalar_runner():
+    pull   = PullSpec(duration=3.0, dt=0.01, start_gear="3", shift_rpm=1e9)
+    point  = {"timing": 14.0, "boost_cmd": 9.0, "afr": 12.8}
+    result = evaluate_points(BatchEngineSimulator(0), [point], pull)[0]
+
+    sim = EngineSimulator()
+    sim.boost_cmd, sim.afr = point["boost_cmd"], point["afr"]
+    trace = InputTrace(time=np.array([0.0, 3.0]), throttle=np.array([100.0] * 2),
+                       gear=("3", "3"), timing=np.array([14.0] * 2))
+    ref = run_trace(sim, trace, dt=0.01).summary()
+
+    assert np.isclose(result["peak_hp"], ref["peak_hp"])
+    assert np.isclose(result["avg_mpg"], ref["avg_mpg"])
+    assert result["knock_low"] == ref["knock_low"]
+
+
+def test_sweep_streams_to_csv_in_process_and_pool(tmp_path):
+    points = list(grid(timing=[10, 25], boost_cmd=[5, 20], afr=[11.5, 13.0]))
+    pull   = PullSpec(duration=1.0, dt=0.02)
+
+    serial = {r["index"]: r for r in iter_sweep("k20", points, pull,
+                                                workers=0, chunk_size=3)}
+    count  = run_sweep("k20", iter(points), tmp_path / "out.csv", pull,
+                       workers=2, chunk_size=3)
+    with (tmp_path / "out.csv").open() as fp:
+        rows = {int(r["index"]): r for r in csv.DictReader(fp)}
+
+    assert count == len(points) == len(rows) == len(serial)
+    for i, row in rows.items():
+        assert np.isclose(float(row["peak_hp"]), serial[i]["peak_hp"])
+    assert serial[6]["knock_med"] > 0        # timing 25, afr 11.5
+
+
+def test_knocking_lanes_are_pruned_mid_pull():
+    clean  = {"timing": 12.0, "boost_cmd": 8.0, "afr": 13.0}
+    knocky = {"timing": 26.0, "boost_cmd": 20.0, "afr": 13.0}   # MED once boost > 12
+    pull   = PullSpec(duration=6.0, dt=0.01)
+    full   = evaluate_points(BatchEngineSimulator(0), [clean, knocky], pull)
+    pruned = evaluate_points(BatchEngineSimulator(0), [knocky, clean],
+                             PullSpec(duration=6.0, dt=0.01, max_knock="LOW"))
+
+    assert pruned[0]["pruned"] == 1
+    assert 4.0 < pruned[0]["pruned_at"] < 6.0
+    assert pruned[1]["pruned_at"] is None
+    assert pruned[0]["knock_med"] == 1 and pruned[0]["knock_high"] == 0
+    assert pruned[1]["pruned"] == 0
+    for key in ("peak_hp", "avg_mpg", "knock_low"):
+        assert np.isclose(pruned[1][key], full[0][key])
+
+
+def test_ratio_overrides_may_differ_between_points():
+    pull   = PullSpec(duration=2.0, dt=0.02, start_gear="3", shift_rpm=1e9)
+    points = [{"timing": 14.0, "boost_cmd": 9.0},
+              {"timing": 14.0, "boost_cmd": 9.0, "ratio_3": 1.2},
+              {"timing": 14.0, "boost_cmd": 9.0, "ratio_4": 0.9}]
+    mixed = evaluate_points(BatchEngineSimulator(0), points, pull)
+    alone = [evaluate_points(BatchEngineSimulator(0), [p], pull)[0]
+             for p in points]
+    assert mixed == alone
+    assert mixed[0] == mixed[2] != mixed[1]        # 4th gear never engaged
+
+
+def test_sweep_csv_header_covers_every_ratio_override(tmp_path):
+    points = [{"timing": 12.0, "boost_cmd": 8.0, "afr": 13.0, "ratio_4": 0.9},
+              {"timing": 12.0, "boost_cmd": 8.0, "afr": 13.0, "ratio_2": 2.0}]
+    pull   = PullSpec(duration=0.5, dt=0.05)
+    assert run_sweep("k20", points, tmp_path / "out.csv", pull,
+                     workers=0, chunk_size=1) == 2
+    with (tmp_path / "out.csv").open() as fp:
+        reader = csv.DictReader(fp)
+        rows   = list(reader)
+    assert reader.fieldnames[:6] == ["index", "timing", "boost_cmd", "afr",
+                                     "ratio_2", "ratio_4"]
+    assert (rows[0]["ratio_2"], rows[0]["ratio_4"]) == ("", "0.9")
+    assert (rows[1]["ratio_2"], rows[1]["ratio_4"]) == ("2.0", "")
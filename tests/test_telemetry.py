@@ -0,0 +1,34 @@
+import numpy as np
+
+import headless
+from engine.runner import run_trace, wot_pull
+from engine.simulator import EngineSimulator
+from engine.telemetry import TelemetryLog, TelemetryRecorder
+
+
+def test_recorded_log_matches_run_and_slices_by_time(tmp_path):
+    with TelemetryRecorder(tmp_path / "run.tlm", chunk_size=64,
+                           buffers=2) as rec:
+        result = run_trace(EngineSimulator(), wot_pull(3.0, gear="2"),
+                           dt=0.01, recorder=rec)
+
+    log = TelemetryLog(tmp_path / "run.tlm")
+    assert len(log) == len(result.time) == 300        # 4 full chunks + tail
+    assert np.array_equal(log.channel("hp"), result.hp)
+    assert np.array_equal(log.channel("knock"), result.knock)
+    assert set(log.channel("throttle")) == {100.0}
+    assert log.gear_order[log.channel("gear")[0]] == "2"
+
+    part = log.slice(1.0, 1.5)
+    assert len(part["rpm"]) == 50
+    assert np.array_equal(part["rpm"], result.rpm[99:149])
+
+
+def test_repeated_headless_runs_share_a_monotonic_log(tmp_path):
+    dest = tmp_path / "runs.tlm"
+    assert headless.main(["--duration", "0.5", "--dt", "0.01", "--repeat", "3",
+                          "--telemetry", str(dest)]) == 0
+    time = TelemetryLog(dest).channel("time")
+    assert len(time) == 150
+    assert np.all(np.diff(time) > 0)
+    assert np.isclose(time[-1], 1.5)
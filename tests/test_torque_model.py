@@ -0,0 +1,91 @@
+from bisect import bisect_right
+
+import numpy as np
+import pytest
+
+from engine.torque_model import TorqueModel
+
+
+def _reference(pts, rpm):
+    # the original list-rebuilding interpolation
+    if rpm <= pts[0][0]:
+        return pts[0][1]
+    if rpm >= pts[-1][0]:
+        return pts[-1][1]
+    i = bisect_right([p[0] for p in pts], rpm) - 1
+    x0, y0 = pts[i]
+    x1, y1 = pts[i + 1]
+    return y0 + (rpm - x0) * (y1 - y0) / (x1 - x0)
+
+
+def _write_curve(path, pts):
+    path.write_text("RPM,Torque\n" + "".join(f"{r},{t}\n" for r, t in pts))
+    return path
+
+
+PROBE = np.linspace(0, 9000, 2001)
+
+
+def test_compiled_lookup_matches_reference(tmp_path):
+    pts   = [(r, 150 + 60 * np.sin(r / 900)) for r in range(800, 8300, 250)]
+    model = TorqueModel(_write_curve(tmp_path / "c.csv", pts))
+    ref   = [_reference(model.curve, r) for r in PROBE]
+
+    assert np.allclose([model.torque_at(r) for r in PROBE], ref, atol=1e-9)
+    assert np.allclose(model.torque_at_many(PROBE), ref, atol=1e-9)
+    assert not model.rpms.flags.writeable
+
+
+@pytest.mark.parametrize("step", [1, 10])
+def test_uniform_lut_matches_reference(tmp_path, step):
+    pts   = [(r, 100 + r / 50) for r in range(1000, 7000, 500)]
+    model = TorqueModel(_write_curve(tmp_path / "c.csv", pts), lut_step=step)
+    ref   = [_reference(model.curve, r) for r in PROBE]
+
+    assert model.lut_step == step
+    assert np.allclose([model.torque_at(r) for r in PROBE], ref, atol=1e-9)
+    assert np.allclose(model.torque_at_many(PROBE), ref, atol=1e-9)
+
+
+def test_lut_too_coarse_for_tolerance(tmp_path):
+    pts = [(1000, 100), (1005, 200), (7000, 300)]
+    with pytest.raises(ValueError):
+        TorqueModel(_write_curve(tmp_path / "c.csv", pts), lut_step=10)
+
+
+def test_loader_comments_channels_and_unsorted_input(tmp_path):
+    path = tmp_path / "dyno.csv"
+    path.write_text("# dyno export\n"
+                    "Time,rpm,Power_hp,Torque_Nm\n"
+                    "0.2,3000,120,280   # mid\n"
+                    "\n"
+                    "0.1,1000,40,200\n"
+                    "0.3,5000,180,260\n")
+    model = TorqueModel(path, channel="torque_nm", strict=True)
+    assert model.curve == [(1000.0, 200.0), (3000.0, 280.0), (5000.0, 260.0)]
+
+
+def test_malformed_rows_are_reported_with_line(tmp_path, capsys):
+    from engine.curve_loader import CurveFormatError
+
+    path = _write_curve(tmp_path / "bad.csv", [(1000, 100), (2000, 150)])
+    path.write_text(path.read_text() + "3000,lots\n4000,170\n")
+
+    with pytest.raises(CurveFormatError) as err:
+        TorqueModel(path, strict=True)
+    assert err.value.line == 4 and "'lots'" in err.value.message
+
+    fallback = TorqueModel(path)
+    assert fallback.curve == TorqueModel(None).curve
+    assert "bad.csv:4:" in capsys.readouterr().out
+
+
+def test_decimation_stays_within_error(tmp_path):
+    rpm  = np.arange(800, 8000, 1.0)
+    tq   = 150 + 60 * np.sin(rpm / 900)
+    path = _write_curve(tmp_path / "fine.csv", zip(rpm, tq))
+
+    full = TorqueModel(path, strict=True)
+    thin = TorqueModel(path, max_error=0.05, strict=True)
+    assert len(thin.rpms) < len(full.rpms) / 20
+    assert np.max(np.abs(thin.torque_at_many(rpm) - tq)) <= 0.05 + 1e-9
@@ -0,0 +1,103 @@
+import json
+import os
+import sys
+import time
+
+import pytest
+
+from engine import engine_registry
+from engine.simulator import EngineSimulator
+from engine.watcher import EngineWatcher
+
+
+def _make_engine(root, key, peak=200, redline=7000):
+    folder = root / key
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "meta.json").write_text(json.dumps({"name": key.upper(),
+                                                  "redline": redline}))
+    _write_curve(folder, peak)
+    return folder
+
+
+def _write_curve(folder, peak):
+    path = folder / "torque_curve.csv"
+    path.write_text(f"RPM,Torque\n1000,100\n4000,{peak}\n7000,150\n")
+    st = path.stat()                 # make the edit visible at ns granularity
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def _until(cond, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if cond():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_apply_reloads_only_changed_engines(tmp_path, monkeypatch):
+    a = _make_engine(tmp_path, "a")
+    _make_engine(tmp_path, "b")
+    sim = EngineSimulator(tmp_path)
+    sim.load_engine("a")
+    watcher = EngineWatcher(tmp_path, backend="poll")
+    watcher.attach(sim)
+    old_model = sim._torque_model
+
+    updated = []
+    real_update = engine_registry._EngineIndex.update
+    monkeypatch.setattr(engine_registry._EngineIndex, "update",
+                        lambda self, name: updated.append(name) or
+                        real_update(self, name))
+    _write_curve(a, 260)
+    _make_engine(tmp_path, "c", redline=8000)
+    metas = watcher.apply({"a", "c"})
+
+    assert updated == ["a", "c"]
+    assert sim._torque_model is not old_model
+    assert sim._torque_model.torque_at(4000) == 260
+    assert sim._engines["c"]["redline"] == 8000 and "b" in sim._engines
+
+    (a / "meta.json").unlink()
+    watcher.apply({"a"})
+    assert "a" not in sim._engines and metas["c"] is not None
+    watcher.stop()
+
+
+@pytest.mark.parametrize("backend", ["poll", "inotify"])
+def test_watcher_thread_picks_up_edits(tmp_path, backend):
+    if backend == "inotify" and not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux-only")
+    folder = _make_engine(tmp_path, "a")
+    sim = EngineSimulator(tmp_path)
+    sim.load_engine("a")
+    watcher = EngineWatcher(tmp_path, interval=0.05, backend=backend)
+    watcher.attach(sim)
+    watcher.start()
+    try:
+        _write_curve(folder, 280)
+        assert _until(lambda: sim._torque_model.torque_at(4000) == 280)
+        _make_engine(tmp_path, "new")
+        assert _until(lambda: "new" in sim._engines)
+    finally:
+        watcher.stop()
+    assert watcher.backend == backend
+
+
+def test_index_writes_do_not_trigger_reloads(tmp_path):
+    if not sys.platform.startswith("linux"):
+        pytest.skip("inotify is Linux-only")
+    folder = _make_engine(tmp_path, "a")
+    sim = EngineSimulator(tmp_path)
+    watcher = EngineWatcher(tmp_path, interval=0.05, backend="inotify")
+    calls = []
+    watcher.on_change(lambda key, meta: calls.append((key, meta is not None)))
+    watcher.attach(sim)
+    watcher.start()
+    try:
+        _write_curve(folder, 290)
+        assert _until(lambda: calls)
+        time.sleep(0.3)                  # room for a spurious second reload
+    finally:
+        watcher.stop()
+    assert calls == [("a", True)] and watcher.reloads == 1
@@ -0,0 +1,86 @@
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+import numpy as np
+
+
+class DynoGraph:
+    """
+    Torque / hp vs RPM for the loaded engine with a live operating point.
+
+    The curves are drawn once per tune change; the operating-point marker is
+    an animated artist blitted over a cached background, so live updates
+    never re-render the axes.  Curves are decimated to `points` samples.
+    """
+
+    def __init__(self, master, sim, points=200):
+        self.sim = sim
+        self.points = points
+        self.boost = 0.0
+        self._background = None
+
+        self.fig = Figure(figsize=(6, 4))
+        self.ax_tq = self.fig.add_subplot(111)
+        self.ax_hp = self.ax_tq.twinx()
+        self.ax_tq.set_title("Torque / Power vs RPM")
+        self.ax_tq.set_xlabel("RPM")
+        self.ax_tq.set_ylabel("Torque (Nm)")
+        self.ax_hp.set_ylabel("Power (hp)")
+        self.ax_tq.grid(True)
+
+        self.tq_line, = self.ax_tq.plot([], [], color="tab:blue", label="Torque")
+        self.hp_line, = self.ax_hp.plot([], [], color="tab:red", label="Power")
+        self.tq_dot, = self.ax_tq.plot([], [], "o", color="tab:blue", animated=True)
+        self.hp_dot, = self.ax_hp.plot([], [], "o", color="tab:red", animated=True)
+        self.readout = self.ax_tq.text(0.02, 0.95, "", transform=self.ax_tq.transAxes,
+                                       va="top", animated=True)
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        # any full redraw (resize, tune change) refreshes the cached background
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.set_tune()
+
+    def set_tune(self, boost=None):
+        """Recompute both curves for the current engine / tune and redraw."""
+        if boost is not None:
+            self.boost = boost
+        model = self.sim._torque_model
+        rpms = np.linspace(max(model.rpms[0], 1.0),
+                           min(model.rpms[-1], self.sim.redline), self.points)
+        torque = model.torque_at_many(rpms)
+        hp = [self.sim.power_at(r, throttle=100.0, boost=self.boost) for r in rpms]
+
+        self.tq_line.set_data(rpms, torque)
+        self.hp_line.set_data(rpms, hp)
+        for ax in (self.ax_tq, self.ax_hp):
+            ax.relim()
+            ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_animated()
+
+    def update_point(self, rpm):
+        """Move the operating point; blits only the animated artists."""
+        if rpm > 0:
+            tq = self.sim._torque_model.torque_at(rpm)
+            hp = self.sim.power_at(rpm, throttle=100.0, boost=self.boost)
+            self.tq_dot.set_data([rpm], [tq])
+            self.hp_dot.set_data([rpm], [hp])
+            self.readout.set_text(f"{rpm:.0f} rpm  {tq:.0f} Nm  {hp:.0f} hp")
+        else:
+            self.tq_dot.set_data([], [])
+            self.hp_dot.set_data([], [])
+            self.readout.set_text("")
+
+        if self._background is None:
+            return
+        self.canvas.restore_region(self._background)
+        self._draw_animated()
+        self.canvas.blit(self.fig.bbox)
+
+    def _draw_animated(self):
+        self.ax_tq.draw_artist(self.tq_dot)
+        self.ax_tq.draw_artist(self.readout)
+        self.ax_hp.draw_artist(self.hp_dot)
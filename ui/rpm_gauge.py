@@ -1,13 +1,25 @@
 import customtkinter as ctk
 import tkinter as tk
 import math
+import time
 
 class RPMGauge(ctk.CTkFrame):
-    def __init__(self, master, max_rpm=8000, size=250, **kwargs):
+    """
+    Analog RPM dial.  The needle is one persistent canvas item moved with
+    `coords()`; end points come from a table precomputed every
+    `resolution` RPM, moves under `min_move_px` are skipped and, with
+    `max_fps`, redraws are coalesced so high-rate telemetry never queues up.
+    """
+
+    def __init__(self, master, max_rpm=8000, size=250, resolution=10,
+                 min_move_px=0.5, max_fps=None, **kwargs):
         super().__init__(master, **kwargs)
         self.max_rpm = max_rpm
         self.size = size
         self.rpm = 0
+        self.resolution = resolution
+        self.min_move_px = min_move_px
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
 
         self.canvas = tk.Canvas(self, width=size, height=size, bg="black", highlightthickness=0)
         self.canvas.pack()
@@ -15,9 +27,16 @@ class RPMGauge(ctk.CTkFrame):
         self.center = size // 2
         self.radius = size // 2 - 10
 
-        self.needle = None
+        # needle tip for every `resolution` RPM step from 0 to max_rpm
+        self._tips = [self._polar_to_cartesian(self._rpm_to_angle(r), self.radius - 20)
+                      for r in range(0, self.max_rpm + resolution, resolution)]
+        self._drawn = self._tips[0]
+        self._last_draw = 0.0
+        self._flush_pending = False
+
         self.draw_static_elements()
-        self.update_needle(0)
+        x, y = self._drawn
+        self.needle = self.canvas.create_line(self.center, self.center, x, y, fill="red", width=3)
 
     def draw_static_elements(self):
         # Draw outer circle
@@ -39,14 +58,28 @@ class RPMGauge(ctk.CTkFrame):
         rpm = max(0, min(rpm, self.max_rpm))
         self.rpm = rpm
 
-        # Remove old needle
-        if self.needle:
-            self.canvas.delete(self.needle)
+        if self.min_interval:
+            wait = self._last_draw + self.min_interval - time.perf_counter()
+            if wait > 0:
+                # draw the latest value once the frame budget allows
+                if not self._flush_pending:
+                    self._flush_pending = True
+                    self.after(max(1, int(wait * 1000)), self._flush)
+                return
+        self._draw(rpm)
 
-        # Draw new needle
-        angle = self._rpm_to_angle(rpm)
-        x, y = self._polar_to_cartesian(angle, self.radius - 20)
-        self.needle = self.canvas.create_line(self.center, self.center, x, y, fill="red", width=3)
+    def _flush(self):
+        self._flush_pending = False
+        self._draw(self.rpm)
+
+    def _draw(self, rpm):
+        x, y = self._tips[int(rpm / self.resolution + 0.5)]
+        px, py = self._drawn
+        if abs(x - px) < self.min_move_px and abs(y - py) < self.min_move_px:
+            return
+        self.canvas.coords(self.needle, self.center, self.center, x, y)
+        self._drawn = (x, y)
+        self._last_draw = time.perf_counter()
 
     def _rpm_to_angle(self, rpm):
         # Map 0-RPM to -120° to +120° (240° sweep)
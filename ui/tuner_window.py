@@ -1,16 +1,33 @@
 import customtkinter as ctk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
 import random
-import json
-import os
-
+from concurrent.futures import Future
+import threading
+import time
+from typing import NamedTuple
+
+# only the first frame's needs are imported here; the engine model (numpy)
+# loads on a worker thread and each lazy tab imports its own modules
+from engine.realtime import SimulationThread, SnapshotBuffer
 from ui.rpm_gauge import RPMGauge
 
-PROFILE_DIR = "assets/profiles"
+DEFAULT_PROFILE = "Custom Profile"
+SIM_RATE_HZ = 1000      # physics tick rate (background thread)
+UI_REFRESH_MS = 16      # dashboard poll interval (~60 fps)
+GRAPH_REFRESH_S = 1 / 30  # live dyno operating-point refresh (30 fps)
+PROFILE_REFRESH_MS = 1000  # Settings debug-panel refresh
+ENGINE_WATCH_MS = 500   # redraw after an engine folder was hot-reloaded
+DEMO_TOP_KMH = 120      # demo drive: full pull to this speed, then restart
+
+
+class DashboardSnapshot(NamedTuple):
+    rpm: int
+    gear: int
+    boost: float
+    knock: bool
+
 
 class TunerWindow:
-    def __init__(self, root):
+    def __init__(self, root, session_path=None):
         ctk.set_appearance_mode("Dark")
         ctk.set_default_color_theme("blue")
 
@@ -38,6 +55,30 @@ class TunerWindow:
         }
 
         self.simulation_running = False
+        # engine model for the drive loop + dyno graph; the registry scan runs
+        # on a worker thread once the first frame is up (see `sim`)
+        self.sim_ready = Future()
+        self._sim_loading = False
+        self._knock_map = None      # shared knock envelope, set with the sim
+        self._watcher = None
+        self._engine_changes = 0    # bumped by the watcher thread
+        self._engine_changes_shown = 0
+        self.dyno = None
+        self._graph_drawn_at = 0.0
+        self._snapshots = SnapshotBuffer()
+        self._sim_thread = SimulationThread(self._drive_tick, SIM_RATE_HZ,
+                                            self._snapshots)
+        self._shown = DashboardSnapshot(0, self.current_gear, 0.0, False)
+        # named profiles (Tuning tab); file I/O runs on the store's worker thread
+        self.profiles = None
+        # optional input log for `python -m engine.session` replays
+        self.session = None
+        if session_path is not None:
+            from engine.session import SessionRecorder
+            self.session = SessionRecorder(session_path, {
+                "gear_ratios": self.gear_ratios, "boost": self.boost_level,
+                "turbo_map": self.turbo_map, "dt": 1 / SIM_RATE_HZ,
+                "frame_dt": UI_REFRESH_MS / 1000, "top_kmh": DEMO_TOP_KMH})
 
         # Sidebar
         self.sidebar = ctk.CTkFrame(root, width=200)
@@ -52,17 +93,74 @@ class TunerWindow:
         self.main_frame = ctk.CTkFrame(root)
         self.main_frame.pack(side="left", fill="both", expand=True, padx=10, pady=10)
 
-        self.tabs = ctk.CTkTabview(self.main_frame)
+        self.tabs = ctk.CTkTabview(self.main_frame, command=self._on_tab_change)
         self.tabs.pack(fill="both", expand=True)
 
-        # Initialize tabs
-        self._init_dashboard_tab()
-        self._init_tuning_tab()
-        self._init_graph_tab()
-        self._init_settings_tab()
+        # Tabs are created empty and filled on first selection
+        self._tab_builders = {"Dashboard": self._init_dashboard_tab,
+                              "Tuning": self._init_tuning_tab,
+                              "Graph": self._init_graph_tab,
+                              "Settings": self._init_settings_tab}
+        self._built_tabs = set()
+        for name in self._tab_builders:
+            self.tabs.add(name)
+        self._ensure_tab("Dashboard")
+
+        root.after_idle(self._load_engine_async)
+        self.main_frame.after(ENGINE_WATCH_MS, self._refresh_engine)
+
+    @property
+    def sim(self):
+        # blocks only if something needs the engine before the load finished
+        self._load_engine_async()
+        return self.sim_ready.result()
+
+    def _load_engine_async(self):
+        if self._sim_loading:
+            return
+        self._sim_loading = True
+        future = self.sim_ready
+
+        def load():
+            try:
+                from engine.knock_map import knock_map
+                from engine.simulator import EngineSimulator
+                from engine.watcher import EngineWatcher
+
+                sim = EngineSimulator()
+                self._knock_map = knock_map()   # shared knock envelope, ~ms
+                # hot-reload edited / new engine folders into the live sim
+                self._watcher = EngineWatcher()
+                self._watcher.attach(sim)
+                self._watcher.on_change(self._on_engine_change)
+                self._watcher.start()
+                future.set_result(sim)
+            except BaseException as exc:
+                future.set_exception(exc)
+
+        threading.Thread(target=load, name="engine-load", daemon=True).start()
+
+    def _on_engine_change(self, key, meta):
+        # watcher thread: only flag it, the Tk loop redraws
+        self._engine_changes += 1
+
+    def _refresh_engine(self):
+        if self._engine_changes != self._engine_changes_shown:
+            self._engine_changes_shown = self._engine_changes
+            if self.dyno is not None:
+                self.dyno.set_tune()
+        self.main_frame.after(ENGINE_WATCH_MS, self._refresh_engine)
+
+    def _on_tab_change(self):
+        self._ensure_tab(self.tabs.get())
+
+    def _ensure_tab(self, name):
+        if name not in self._built_tabs:
+            self._built_tabs.add(name)
+            self._tab_builders[name]()
 
     def _init_dashboard_tab(self):
-        dashboard = self.tabs.add("Dashboard")
+        dashboard = self.tabs.tab("Dashboard")
 
         self.rpm_gauge = RPMGauge(dashboard, max_rpm=8000)
         self.rpm_gauge.pack(pady=10)
@@ -78,8 +176,12 @@ class TunerWindow:
 
         gear_frame = ctk.CTkFrame(dashboard)
         gear_frame.pack(pady=5)
-        ctk.CTkButton(gear_frame, text="Shift -", command=self.shift_down).pack(side="left", padx=5)
-        ctk.CTkButton(gear_frame, text="Shift +", command=self.shift_up).pack(side="left", padx=5)
+        # manual shifting only while parked; the drive loop auto-shifts
+        self.shift_buttons = (
+            ctk.CTkButton(gear_frame, text="Shift -", command=self.shift_down),
+            ctk.CTkButton(gear_frame, text="Shift +", command=self.shift_up))
+        for button in self.shift_buttons:
+            button.pack(side="left", padx=5)
 
         self.knock_label = ctk.CTkLabel(dashboard, text="⚠ Knock Detected!", text_color="red", font=("Arial", 20))
         self.knock_label.pack(pady=10)
@@ -89,11 +191,15 @@ class TunerWindow:
         ctk.CTkButton(dashboard, text="Start Driving Simulation", command=self.toggle_driving_simulation).pack(pady=10)
 
     def _init_tuning_tab(self):
-        tuning = self.tabs.add("Tuning")
+        from engine.profile_store import ProfileStore
+
+        tuning = self.tabs.tab("Tuning")
+        self.profiles = ProfileStore()
 
         def update_boost(val):
-            self.boost_level = val
-            self.boost_value.configure(text=f"{val:.1f} PSI")
+            if self.session is not None:
+                self.session.boost(val)
+            self._set_boost(val)
 
         ctk.CTkLabel(tuning, text="Boost Level").pack(pady=5)
         self.boost_slider = ctk.CTkSlider(tuning, from_=0, to=30, command=update_boost)
@@ -101,45 +207,98 @@ class TunerWindow:
         self.boost_slider.pack()
         self.boost_value = ctk.CTkLabel(tuning, text=f"{self.boost_level:.1f} PSI")
         self.boost_value.pack(pady=5)
+        self.knock_margin = ctk.CTkLabel(tuning, text="")
+        self.knock_margin.pack(pady=5)
 
         ctk.CTkLabel(tuning, text="Turbo Map").pack(pady=10)
         self.turbo_selector = ctk.CTkOptionMenu(tuning, values=list(self.turbo_maps.keys()), command=self.set_turbo_map)
         self.turbo_selector.set(self.turbo_map)
         self.turbo_selector.pack(pady=5)
 
+        ctk.CTkLabel(tuning, text="Profile").pack(pady=(10, 0))
+        self.profile_selector = ctk.CTkComboBox(tuning, values=[DEFAULT_PROFILE])
+        self.profile_selector.set(DEFAULT_PROFILE)
+        self.profile_selector.pack(pady=5)
+        self._refresh_profile_list()
         ctk.CTkButton(tuning, text="Save Profile", command=self.save_profile).pack(pady=5)
         ctk.CTkButton(tuning, text="Load Profile", command=self.load_profile).pack(pady=5)
 
     def _init_graph_tab(self):
-        graph = self.tabs.add("Graph")
-
-        fig, ax = plt.subplots()
-        ax.set_title("Torque vs RPM")
-        ax.set_xlabel("RPM")
-        ax.set_ylabel("Torque (Nm)")
-        ax.grid(True)
-        ax.plot([1000, 2000, 3000, 4000, 5000], [200, 350, 420, 400, 360])
+        from ui.dyno_graph import DynoGraph     # matplotlib: first Graph visit only
 
-        canvas = FigureCanvasTkAgg(fig, master=graph)
-        canvas.get_tk_widget().pack(fill="both", expand=True)
-        canvas.draw()
+        graph = self.tabs.tab("Graph")
+        self.dyno = DynoGraph(graph, self.sim)
+        self.dyno.set_tune(boost=self.boost_level)
 
     def _init_settings_tab(self):
-        settings = self.tabs.add("Settings")
+        settings = self.tabs.tab("Settings")
         ctk.CTkLabel(settings, text="Appearance Mode").pack(pady=5)
         appearance_menu = ctk.CTkOptionMenu(settings, values=["System", "Light", "Dark"],
                                             command=ctk.set_appearance_mode)
         appearance_menu.pack(pady=5)
 
+        # debug panel: opt-in per-stage timings
+        self._profiling_restore = None
+        self.profiling_switch = ctk.CTkSwitch(settings, text="Profiling",
+                                              command=self.toggle_profiling)
+        self.profiling_switch.pack(pady=(20, 5))
+        self.profiling_label = ctk.CTkLabel(settings, text="", font=("Consolas", 11),
+                                            justify="left", anchor="w")
+        self.profiling_label.pack(pady=5, fill="x", padx=10)
+
+    def toggle_profiling(self):
+        from engine.profiling import (PROFILER, disable_profiling,
+                                      enable_profiling, instrument_methods)
+
+        if self._profiling_restore is None:
+            restore_ui = instrument_methods(
+                self, ["update_engine_display", "_poll_snapshots"], PROFILER, "ui.")
+            restore_dyno = (instrument_methods(self.dyno, ["update_point", "set_tune"],
+                                               PROFILER, "ui.dyno.")
+                            if self.dyno is not None else lambda: None)
+            plain_tick = self._sim_thread.tick
+            self._sim_thread.tick = PROFILER.timed("ui._drive_tick", plain_tick)
+            enable_profiling(self.sim)
+
+            def restore():
+                restore_ui()
+                restore_dyno()
+                self._sim_thread.tick = plain_tick
+                disable_profiling(self.sim)
+
+            self._profiling_restore = restore
+            self._refresh_profiling_panel()
+        else:
+            self._profiling_restore()
+            self._profiling_restore = None
+
+    def _refresh_profiling_panel(self):
+        from engine.profiling import PROFILER
+
+        if self._profiling_restore is None:
+            return
+        self.profiling_label.configure(text="\n".join(PROFILER.lines()) or "(no samples yet)")
+        PROFILER.maybe_log()
+        self.main_frame.after(PROFILE_REFRESH_MS, self._refresh_profiling_panel)
+
     def select_tab(self, name):
         self.tabs.set(name)
+        self._ensure_tab(name)
 
     def shift_up(self):
+        if self.simulation_running:
+            return
+        if self.session is not None:
+            self.session.shift(+1)
         if self.current_gear < self.max_gear:
             self.current_gear += 1
             self.update_gear_display()
 
     def shift_down(self):
+        if self.simulation_running:
+            return
+        if self.session is not None:
+            self.session.shift(-1)
         if self.current_gear > 1:
             self.current_gear -= 1
             self.update_gear_display()
@@ -147,75 +306,178 @@ class TunerWindow:
     def update_gear_display(self):
         self.gear_label.configure(text=f"Gear: {self.current_gear}")
 
+    def _set_boost(self, val):
+        # one path for the slider and profile loads: label, sim and dyno.
+        # The sim may still be loading; never block the Tk thread on it.
+        self.boost_level = val
+        self.boost_value.configure(text=f"{val:.1f} PSI")
+        if self.dyno is not None:
+            self.dyno.set_tune(boost=val)
+        self._load_engine_async()
+        self._when_done(self.sim_ready, self._push_boost)
+
+    def _push_boost(self, future):
+        # latest value wins: queued calls from a fast slider all apply it
+        if future.exception() is not None:
+            return
+        future.result().boost_cmd = self.boost_level
+        self._show_knock_margin()
+
     def set_turbo_map(self, map_name):
+        if self.session is not None:
+            self.session.turbo_map(map_name)
         self.turbo_map = map_name
 
-    def check_knock(self, rpm):
-        if rpm > 6500 and self.boost_level > 20:
-            self.knock_label.pack()
-        else:
-            self.knock_label.pack_forget()
+    def check_knock(self, sim):
+        # same knock model as the simulator, via the precomputed envelope
+        return not self._knock_map.is_safe(sim._boost, sim.timing, sim.afr)
+
+    def _show_knock_margin(self):
+        sim = self.sim
+        timing = self._knock_map.margin(sim.boost_cmd, sim.timing, sim.afr)
+        boost = self._knock_map.margin(sim.boost_cmd, sim.timing, sim.afr, axis="boost")
+        self.knock_margin.configure(
+            text=f"Knock margin: {float(timing):+.1f}° timing  {float(boost):+.1f} PSI")
 
     def toggle_driving_simulation(self):
         self.simulation_running = not self.simulation_running
+        if self.session is not None:
+            self.session.drive(self.simulation_running)
+        state = "disabled" if self.simulation_running else "normal"
+        for button in self.shift_buttons:
+            button.configure(state=state)
         if self.simulation_running:
             self.vehicle_speed = 0
+            self.drive = self._new_drive()
             self.simulate_driving()
+        else:
+            self._sim_thread.stop()
 
     def simulate_driving(self):
-        if not self.simulation_running:
+        # physics runs on its own thread; the Tk loop only polls snapshots
+        try:
+            self._sim_thread.start()
+        except RuntimeError as err:
+            print(f"[TunerWindow] Warning: {err}")
+            self.toggle_driving_simulation()         # back to parked
             return
+        self._poll_snapshots()
+
+    def _new_drive(self):
+        from engine.drive_cycle import DriveCycleSimulator
+
+        # vehicle dynamics run on the engine simulator with the UI's ratios
+        self.sim._gearbox.update(
+            {str(g): float(r) for g, r in self.gear_ratios.items()})
+        self.sim.boost_cmd = self.boost_level
+        return DriveCycleSimulator(self.sim)
+
+    # ── physics tick (simulation thread, SIM_RATE_HZ) ──
+    def _drive_tick(self, dt):
+        drive = self.drive
+        if drive.speed_kmh >= DEMO_TOP_KMH:
+            drive.speed = 0.0
+        drive.sim.boost_cmd = self.boost_level
+        drive.step(dt, DEMO_TOP_KMH + 5)
+
+        self.vehicle_speed = drive.speed_kmh
+        self.current_gear = int(drive.sim.gear) if drive.sim.gear.isdigit() else 0
+        engine_rpm = int(drive.sim._rpm)
+        return DashboardSnapshot(engine_rpm, self.current_gear,
+                                 self.boost_level, self.check_knock(drive.sim))
+
+    # ── rendering (Tk thread, UI_REFRESH_MS) ──
+    def _poll_snapshots(self):
+        error = self._sim_thread.error
+        if error is not None and self.simulation_running:
+            print(f"[TunerWindow] Driving simulation stopped: {error!r}")
+            self.toggle_driving_simulation()         # back to parked
+            return
+        snapshot = self._snapshots.latest()
+        if snapshot is not None:
+            self.update_engine_display(snapshot)
+            now = time.perf_counter()
+            if (self.dyno is not None and self.tabs.get() == "Graph"
+                    and now - self._graph_drawn_at >= GRAPH_REFRESH_S):
+                self.dyno.update_point(snapshot.rpm)
+                self._graph_drawn_at = now
+        if self.simulation_running:
+            self.main_frame.after(UI_REFRESH_MS, self._poll_snapshots)
 
-        self.vehicle_speed += 2  # accelerate
-        if self.vehicle_speed > 120:
-            self.vehicle_speed = 0
-            self.current_gear = 1
-        elif self.vehicle_speed > 20 * self.current_gear and self.current_gear < self.max_gear:
-            self.current_gear += 1
-        self.update_gear_display()
-
-        self.update_engine_display()
-        self.main_frame.after(300, self.simulate_driving)
-
-    def update_engine_display(self):
-        speed_mps = self.vehicle_speed * 1000 / 3600
-        final_drive = 3.73
-        tire_circumference = 2.1
+    def update_engine_display(self, snapshot):
+        shown = self._shown
+        if snapshot == shown:
+            return
 
-        gear_ratio = self.gear_ratios[self.current_gear]
-        wheel_rpm = speed_mps / tire_circumference * 60
-        engine_rpm = wheel_rpm * gear_ratio * final_drive
-        engine_rpm = int(min(engine_rpm, 8000))
+        if snapshot.rpm != shown.rpm:
+            self.rpm_gauge.update_needle(snapshot.rpm)
+            self.rpm_label.configure(text=f"RPM: {snapshot.rpm}")
+        if snapshot.gear != shown.gear:
+            self.gear_label.configure(text=f"Gear: {snapshot.gear}")
+        if snapshot.boost != shown.boost:
+            self.boost_label.configure(text=f"Boost: {snapshot.boost:.1f} PSI")
+        if snapshot.knock != shown.knock:
+            if snapshot.knock:
+                self.knock_label.pack()
+            else:
+                self.knock_label.pack_forget()
+        self._shown = snapshot
+
+    # ── profiles (ProfileStore futures, polled from the Tk loop) ──
+    def _when_done(self, future, callback):
+        # Tk must only be touched from its own thread, so poll instead of
+        # using add_done_callback (which fires on the I/O thread)
+        if future.done():
+            callback(future)
+        else:
+            self.main_frame.after(UI_REFRESH_MS, self._when_done, future, callback)
 
-        torque = self.turbo_maps[self.turbo_map](engine_rpm)
+    def _profile_name(self):
+        return self.profile_selector.get().strip() or DEFAULT_PROFILE
 
-        self.rpm_gauge.update_needle(engine_rpm)
-        self.rpm_label.configure(text=f"RPM: {engine_rpm}")
-        self.gear_label.configure(text=f"Gear: {self.current_gear}")
-        self.boost_label.configure(text=f"Boost: {self.boost_level:.1f} PSI")
+    def _refresh_profile_list(self):
+        def show(future):
+            names = [row["name"] for row in future.result()] or [DEFAULT_PROFILE]
+            self.profile_selector.configure(values=names)
 
-        self.check_knock(engine_rpm)
+        self._when_done(self.profiles.list(), show)
 
     def save_profile(self):
-        os.makedirs(PROFILE_DIR, exist_ok=True)
         profile_data = {
             "boost_level": self.boost_level,
             "gear_ratios": self.gear_ratios,
             "turbo_map": self.turbo_map
         }
-        with open(os.path.join(PROFILE_DIR, "custom_profile.json"), "w") as f:
-            json.dump(profile_data, f, indent=4)
+
+        def saved(future):
+            if future.exception() is not None:
+                print(f"[TunerWindow] Warning: could not save profile: {future.exception()}")
+            else:
+                self._refresh_profile_list()
+
+        self._when_done(self.profiles.save(self._profile_name(), profile_data), saved)
 
     def load_profile(self):
-        filepath = os.path.join(PROFILE_DIR, "custom_profile.json")
-        if os.path.exists(filepath):
-            with open(filepath, "r") as f:
-                profile = json.load(f)
-                self.boost_level = profile.get("boost_level", self.boost_level)
-                self.gear_ratios = profile.get("gear_ratios", self.gear_ratios)
-                self.turbo_map = profile.get("turbo_map", self.turbo_map)
-
-                self.boost_slider.set(self.boost_level)
-                self.boost_value.configure(text=f"{self.boost_level:.1f} PSI")
-                self.turbo_selector.set(self.turbo_map)
-                self.update_gear_display()
+        self._when_done(self.profiles.load(self._profile_name()), self._apply_profile)
+
+    def _apply_profile(self, future):
+        if future.exception() is not None:
+            print(f"[TunerWindow] Warning: could not load profile: {future.exception()}")
+            return
+        profile = future.result()
+        boost = profile.get("boost_level", self.boost_level)
+        self.gear_ratios = {int(g): float(r) for g, r in
+                            profile.get("gear_ratios", self.gear_ratios).items()}
+        self.turbo_map = profile.get("turbo_map", self.turbo_map)
+        self.max_gear = len(self.gear_ratios) or self.max_gear
+        self.current_gear = min(self.current_gear, self.max_gear)
+        if self.session is not None:
+            # slider/menu .set() don't fire their commands, so log here
+            self.session.boost(boost)
+            self.session.turbo_map(self.turbo_map)
+            self.session.gear_ratios(self.gear_ratios)
+
+        self.boost_slider.set(boost)
+        self._set_boost(boost)
+        self.turbo_selector.set(self.turbo_map)
+        self.update_gear_display()